@@ -207,32 +207,6 @@ development, testing, production]};
      (substitute-keyword-arguments (package-arguments python-pytest-asyncio)
        ((#:tests? _ #f) #f)))))
 
-(define-public python-markdownify
-  (package
-    (name "python-markdownify")
-    (version "0.9.2")
-    (source
-     (origin
-       (method url-fetch)
-       (uri (pypi-uri "markdownify" version))
-       (sha256
-        (base32
-         "0zfpzdwkf34spmfr2iwkqch3fi0nnll2v5nghvgnrmazjn4rcxdr"))))
-    (build-system python-build-system)
-    (arguments
-     `(#:tests? #f))
-    (native-inputs
-     `(("python-pytest" ,python-pytest-6)))
-    (propagated-inputs
-     `(("python-flake8" ,python-flake8)
-       ("python-beautifulsoup4" ,python-beautifulsoup4)
-       ("python-six" ,python-six)))
-    (home-page
-     "http://github.com/matthewwithanm/python-markdownify")
-    (synopsis "Convert HTML to markdown.")
-    (description "Convert HTML to markdown.")
-    (license license:expat)))
-
 (define-public python-ipaddress
   (package
     (name "python-ipaddress")
@@ -435,7 +409,6 @@ Facebook authentication.")
          ("python-dynaconf" ,python-dynaconf)
          ("python-facebook-sdk" ,python-facebook-sdk.git)
          ("python-jinja2" ,python-jinja2)
-         ("python-markdownify" ,python-markdownify)
          ("python-requests" ,python-requests)
          ("python-tweepy" ,python-tweepy)
          ("python-tortoise-orm" ,python-tortoise-orm-0.17)))
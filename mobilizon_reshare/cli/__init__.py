@@ -2,10 +2,14 @@ import asyncio
 import logging
 import traceback
 from logging.config import dictConfig
-from pathlib import Path
 
 from mobilizon_reshare.config.config import get_settings
-from mobilizon_reshare.storage.db import tear_down, MoReDB
+from mobilizon_reshare.publishers import get_active_publishers
+from mobilizon_reshare.publishers.platforms.platform_mapping import get_formatter_class
+from mobilizon_reshare.publishers.registry import platforms_run
+from mobilizon_reshare.publishers.templating import precompile_templates
+from mobilizon_reshare.storage.db import tear_down, MoReDB, get_db_url, snapshot
+from mobilizon_reshare.storage.instrumentation import collect_query_stats
 
 logger = logging.getLogger(__name__)
 
@@ -15,25 +19,40 @@ async def graceful_exit(code):
     exit(code)
 
 
-async def init(settings_file):
+async def init(settings_file, read_only=False):
     settings = get_settings(settings_file)
     dictConfig(settings["logging"])
-    db_path = Path(settings.db_path)
-    db = MoReDB(db_path)
+    precompile_templates(
+        path
+        for name in get_active_publishers()
+        for path in get_formatter_class(name)().get_template_paths()
+    )
+    db = MoReDB(
+        get_db_url(settings),
+        settings.get("db_pool"),
+        slow_query_threshold=settings["db_instrumentation"]["slow_query_threshold"],
+        read_only=read_only,
+    )
     await db.setup()
 
 
-async def _safe_execution(f, settings_file):
-    await init(settings_file)
-    return_code = 1
-    try:
-        return_code = await f()
-    except Exception:
-        traceback.print_exc()
-    finally:
-        logger.debug("Closing")
-        await graceful_exit(return_code)
-
-
-def safe_execution(f, settings_file):
-    asyncio.run(_safe_execution(f, settings_file))
+async def _safe_execution(f, settings_file, read_only=False):
+    with collect_query_stats() as stats, platforms_run():
+        await init(settings_file, read_only)
+        return_code = 1
+        try:
+            if read_only:
+                async with snapshot():
+                    return_code = await f()
+            else:
+                return_code = await f()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            logger.info(f"Database usage: {stats}")
+            logger.debug("Closing")
+            await graceful_exit(return_code)
+
+
+def safe_execution(f, settings_file, read_only=False):
+    asyncio.run(_safe_execution(f, settings_file, read_only))
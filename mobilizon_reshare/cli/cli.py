@@ -6,13 +6,17 @@ from arrow import Arrow
 from click import pass_context
 
 from mobilizon_reshare.cli import safe_execution
+from mobilizon_reshare.cli.commands.archive.main import main as archive_main
 from mobilizon_reshare.cli.commands.format.format import format_event
 from mobilizon_reshare.cli.commands.inspect.inspect_event import inspect_events
 from mobilizon_reshare.cli.commands.start.main import main as start_main
+from mobilizon_reshare.cli.commands.stats.main import main as stats_main
 from mobilizon_reshare.cli.commands.recap.main import main as recap_main
+from mobilizon_reshare.cli.commands.transfer.main import export_main, import_main
 from mobilizon_reshare.config.publishers import publisher_names
 
 from mobilizon_reshare.event.event import EventPublicationStatus
+from mobilizon_reshare.main.transfer import FORMATS
 
 status_name_to_enum = {
     "waiting": EventPublicationStatus.WAITING,
@@ -41,6 +45,15 @@ to_date_option = click.option(
     help="Include only events that begin before this datetime",
 )
 
+format_option = click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(FORMATS),
+    default="ndjson",
+    show_default=True,
+    help="NDJSON files hold an event for each line, CSV files a publication for each row",
+)
+
 
 class InspectTarget(Enum):
     ALL = "all"
@@ -56,9 +69,14 @@ def mobilizon_reshare():
 
 
 @mobilizon_reshare.command(help="Synchronize and publish events")
+@click.option(
+    "--revalidate",
+    is_flag=True,
+    help="Validate the credentials of every publisher, even if they were validated recently",
+)
 @settings_file_option
-def start(settings_file):
-    safe_execution(start_main, settings_file=settings_file)
+def start(revalidate, settings_file):
+    safe_execution(functools.partial(start_main, revalidate), settings_file)
 
 
 @mobilizon_reshare.command(help="Publish a recap of already published events")
@@ -67,6 +85,20 @@ def recap(settings_file):
     safe_execution(recap_main, settings_file=settings_file)
 
 
+@mobilizon_reshare.command(
+    help="Move events that ended more than the configured retention days ago to a compressed archive"
+)
+@click.option(
+    "--days",
+    type=click.IntRange(min=0),
+    help="Archive events that ended more than DAYS days ago. "
+    "Overrides the retention.days setting.",
+)
+@settings_file_option
+def archive(days, settings_file):
+    safe_execution(functools.partial(archive_main, days), settings_file)
+
+
 @mobilizon_reshare.command(help="Print events in the database that are in STATUS")
 @from_date_option
 @to_date_option
@@ -85,6 +117,7 @@ def inspect(ctx, status, begin, end, settings_file):
             inspect_events, status_name_to_enum[status], frm=begin, to=end,
         ),
         settings_file,
+        read_only=True,
     )
 
 
@@ -97,9 +130,52 @@ def inspect(ctx, status, begin, end, settings_file):
 @click.argument("publisher", type=click.Choice(publisher_names))
 def format(settings_file, event_id, publisher):
     safe_execution(
-        functools.partial(format_event, event_id, publisher), settings_file,
+        functools.partial(format_event, event_id, publisher),
+        settings_file,
+        read_only=True,
     )
 
 
+@mobilizon_reshare.command(
+    help="Print how many publications succeeded and failed, for each publisher and day"
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "json"]),
+    default="table",
+    show_default=True,
+)
+@settings_file_option
+def stats(output_format, settings_file):
+    safe_execution(
+        functools.partial(stats_main, output_format), settings_file, read_only=True,
+    )
+
+
+@mobilizon_reshare.command(
+    name="export", help="Write all the events and their publications to FILE"
+)
+@format_option
+@click.argument("file", type=click.File("w", encoding="utf-8", lazy=True), default="-")
+@settings_file_option
+def export_events(file_format, file, settings_file):
+    safe_execution(
+        functools.partial(export_main, file, file_format),
+        settings_file,
+        read_only=True,
+    )
+
+
+@mobilizon_reshare.command(
+    name="import", help="Store the events written to FILE by the export command"
+)
+@format_option
+@click.argument("file", type=click.File("r", encoding="utf-8"))
+@settings_file_option
+def import_events(file_format, file, settings_file):
+    safe_execution(functools.partial(import_main, file, file_format), settings_file)
+
+
 if __name__ == "__main__":
     mobilizon_reshare()
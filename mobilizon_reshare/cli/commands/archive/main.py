@@ -0,0 +1,11 @@
+from typing import Optional
+
+import click
+
+from mobilizon_reshare.main.archive import archive
+
+
+async def main(retention_days: Optional[int] = None):
+    report = await archive(retention_days)
+    click.echo(str(report))
+    return 0
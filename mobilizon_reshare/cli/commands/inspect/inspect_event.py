@@ -1,4 +1,6 @@
-from typing import Iterable
+import asyncio
+import contextvars
+from typing import AsyncIterator, Iterable
 
 import click
 from arrow import Arrow
@@ -8,9 +10,8 @@ from mobilizon_reshare.event.event import MobilizonEvent
 from mobilizon_reshare.event.event_selection_strategies import select_unpublished_events
 from mobilizon_reshare.storage.query.read import (
     get_published_events,
-    events_with_status,
-    get_all_events,
     events_without_publications,
+    iter_events,
 )
 
 status_to_color = {
@@ -21,8 +22,32 @@ status_to_color = {
 }
 
 
-def show_events(events: Iterable[MobilizonEvent]):
-    click.echo_via_pager("\n".join(map(pretty, events)))
+async def show_events(first_event: MobilizonEvent, events: AsyncIterator[MobilizonEvent]):
+    """
+    Shows the events in the pager while they are read from the DB. The pager blocks on the terminal, so it runs in a
+    separate thread and pulls events from the event loop one at a time.
+    """
+    loop = asyncio.get_running_loop()
+    # the thread has to see the current context, i.e. to run its queries inside the current transaction
+    context = contextvars.copy_context()
+
+    def lines():
+        yield pretty(first_event)
+        while True:
+            try:
+                event = asyncio.run_coroutine_threadsafe(
+                    events.__anext__(), loop
+                ).result()
+            except StopAsyncIteration:
+                return
+            yield "\n" + pretty(event)
+
+    await loop.run_in_executor(None, context.run, click.echo_via_pager, lines())
+
+
+async def _as_async_iterator(events: Iterable[MobilizonEvent]):
+    for event in events:
+        yield event
 
 
 def pretty(event: MobilizonEvent):
@@ -42,14 +67,17 @@ async def inspect_unpublished_events(frm: Arrow = None, to: Arrow = None):
 async def inspect_events(
     status: EventPublicationStatus = None, frm: Arrow = None, to: Arrow = None
 ):
-    if status is None:
-        events = await get_all_events(from_date=frm, to_date=to)
-    elif status == EventPublicationStatus.WAITING:
-        events = await inspect_unpublished_events(frm=frm, to=to)
+    if status == EventPublicationStatus.WAITING:
+        events = _as_async_iterator(await inspect_unpublished_events(frm=frm, to=to))
     else:
-        events = await events_with_status([status], from_date=frm, to_date=to)
+        events = iter_events(
+            status=[status] if status else None, from_date=frm, to_date=to
+        )
 
-    if events:
-        show_events(events)
-    else:
+    try:
+        first_event = await events.__anext__()
+    except StopAsyncIteration:
         click.echo(f"No event found with status: {status}")
+        return
+
+    await show_events(first_event, events)
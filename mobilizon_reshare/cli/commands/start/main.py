@@ -1,10 +1,10 @@
 from mobilizon_reshare.main.start import start
 
 
-async def main():
+async def main(revalidate: bool = False):
     """
     STUB
     :return:
     """
-    reports = await start()
+    reports = await start(revalidate)
     return 0 if reports and reports.successful else 1
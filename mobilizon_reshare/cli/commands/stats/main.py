@@ -0,0 +1,65 @@
+import json
+
+import click
+
+from mobilizon_reshare.storage.query.stats import (
+    count_publications_by_day,
+    count_publications_by_publisher,
+    median_time_to_publication,
+    top_failure_reasons,
+)
+
+
+def format_table(title: str, rows: list[dict], columns: list[str]) -> str:
+    if not rows:
+        return f"{title}\nNo publication found.\n"
+    cells = [columns] + [
+        ["" if row[column] is None else str(row[column]) for column in columns]
+        for row in rows
+    ]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+        for line in cells
+    ]
+    return "\n".join([title, *lines]) + "\n"
+
+
+async def main(output_format: str = "table"):
+    stats = {
+        "publishers": await count_publications_by_publisher(),
+        "days": await count_publications_by_day(),
+        "failure_reasons": await top_failure_reasons(),
+        "median_seconds_to_publication": await median_time_to_publication(),
+    }
+    if output_format == "json":
+        click.echo(json.dumps(stats, indent=2))
+        return 0
+
+    click.echo(
+        format_table(
+            "Publications by publisher",
+            stats["publishers"],
+            ["publisher", "count", "completed", "success_rate"],
+        )
+    )
+    click.echo(
+        format_table(
+            "Publications by day",
+            stats["days"],
+            ["day", "publisher", "status", "count"],
+        )
+    )
+    click.echo(
+        format_table(
+            "Top failure reasons",
+            stats["failure_reasons"],
+            ["publisher", "reason", "count"],
+        )
+    )
+    median = stats["median_seconds_to_publication"]
+    click.echo(
+        "Median time to first publication: "
+        + (f"{median / 3600:.1f} hours" if median is not None else "unknown")
+    )
+    return 0
@@ -0,0 +1,23 @@
+from typing import TextIO
+
+import click
+
+from mobilizon_reshare.main.transfer import export_database, import_database
+
+
+async def export_main(file: TextIO, format: str):
+    report = await export_database(file, format)
+    # the events themselves could be written to stdout
+    click.echo(
+        f"Exported {report.events} events and {report.publications} publications",
+        err=True,
+    )
+    return 0
+
+
+async def import_main(file: TextIO, format: str):
+    report = await import_database(file, format)
+    click.echo(
+        f"Imported {report.events} new events and {report.publications} new publications"
+    )
+    return 0
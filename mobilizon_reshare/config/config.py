@@ -22,9 +22,51 @@ base_validators = [
         lte=24,
     ),
     Validator("publishing.window.end", must_exist=True, is_type_of=int, gte=0, lte=24),
+    # how many platforms are published to at the same time, and for how many seconds at most
+    Validator("publishing.max_workers", default=5, is_type_of=int, gte=1),
+    Validator("publishing.timeout", default=60, is_type_of=(int, float), gt=0),
+    Validator("publishing.credentials_ttl", default=86400, is_type_of=int, gte=0),
+    Validator(
+        "publishing.pending_timeout", default=3600, is_type_of=(int, float), gt=0
+    ),
+    Validator("publishing.retry.max_attempts", default=5, is_type_of=int, gte=1),
+    Validator("publishing.retry.backoff", default=600, is_type_of=(int, float), gt=0),
+    Validator("recap.max_fragments", default=50, is_type_of=int, gte=1),
+    Validator("circuit_breaker.failure_threshold", default=3, is_type_of=int, gte=1),
+    Validator("circuit_breaker.cooldown", default=3600, is_type_of=(int, float), gt=0),
+    Validator("rate_limit.max_wait", default=30, is_type_of=(int, float), gte=0),
+    Validator("templates.cache_dir", default=None),
+    Validator("templates.auto_reload", default=False, is_type_of=bool),
+    Validator("media.active", default=False, is_type_of=bool),
+    Validator("media.cache_dir", default=None),
+    Validator("media.max_size", default=1280, is_type_of=int, gte=1),
+    Validator("media.max_bytes", default=10485760, is_type_of=int, gte=1),
+    Validator("media.max_workers", default=4, is_type_of=int, gte=1),
+    Validator("media.timeout", default=30, is_type_of=(int, float), gt=0),
     # url of the main Mobilizon instance to download events from
     Validator("source.mobilizon.url", must_exist=True, is_type_of=str),
     Validator("source.mobilizon.group", must_exist=True, is_type_of=str),
+    # optional database url, SQLite on db_path is used otherwise
+    Validator("db_url", is_type_of=str),
+    Validator("db_pool.min_size", "db_pool.max_size", is_type_of=int, gte=1),
+    # events are archived this many days after their end
+    Validator("retention.days", default=365, is_type_of=int, gte=0),
+    Validator("retention.archive_on_start", default=False, is_type_of=bool),
+    Validator("retention.archive_dir", default=None),
+    # statements taking longer than this many milliseconds are logged as warnings
+    Validator(
+        "db_instrumentation.slow_query_threshold", default=200, is_type_of=(int, float)
+    ),
+    # failure notifications that couldn't be sent are retried at every run until this many attempts
+    Validator("notifications.max_attempts", default=5, is_type_of=int, gte=1),
+] + [
+    # optional, platforms without a limit are only limited by what they tell in their responses
+    validator
+    for name in sorted(set(publisher_names) | set(notifier_names))
+    for validator in (
+        Validator(f"rate_limit.{name}.requests", is_type_of=int, gte=1),
+        Validator(f"rate_limit.{name}.period", is_type_of=(int, float), gt=0),
+    )
 ]
 
 activeness_validators = [
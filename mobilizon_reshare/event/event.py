@@ -65,12 +65,14 @@ class MobilizonEvent:
 
     @staticmethod
     def compute_status(publications: list[Publication]) -> EventPublicationStatus:
-        if not publications:
-            return EventPublicationStatus.WAITING
-
+        # publications still in progress have no outcome yet
         unique_statuses: Set[PublicationStatus] = set(
-            pub.status for pub in publications
+            pub.status
+            for pub in publications
+            if pub.status != PublicationStatus.WAITING
         )
+        if not unique_statuses:
+            return EventPublicationStatus.WAITING
 
         if unique_statuses == {
             PublicationStatus.COMPLETED,
@@ -103,7 +105,7 @@ class MobilizonEvent:
                     tortoise.timezone.localtime(value=pub.timestamp, timezone=tz)
                 ).to("local")
                 for pub in event.publications
-                if publication_status != EventPublicationStatus.WAITING
+                if pub.status != PublicationStatus.WAITING
             },
             status=publication_status,
         )
@@ -0,0 +1,368 @@
+import importlib.util
+import re
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import PreformattedString
+
+# lxml is an optional dependency: it's several times faster than the parser of the standard library
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# the same descriptions are converted for every publisher and every recap they appear in
+CACHE_SIZE = 256
+
+TEXT = "text"
+BREAK = "break"
+BOLD = "bold"
+ITALIC = "italic"
+STRIKE = "strike"
+CODE = "code"
+LINK = "link"
+ROOT = "root"
+PARAGRAPH = "paragraph"
+HEADING = "heading"
+QUOTE = "quote"
+LIST = "list"
+ORDERED_LIST = "ordered_list"
+ITEM = "item"
+PREFORMATTED = "preformatted"
+RULE = "rule"
+
+BLOCKS = {PARAGRAPH, HEADING, QUOTE, LIST, ORDERED_LIST, ITEM, PREFORMATTED, RULE}
+
+TAGS = {
+    "b": BOLD,
+    "strong": BOLD,
+    "em": ITALIC,
+    "i": ITALIC,
+    "del": STRIKE,
+    "s": STRIKE,
+    "strike": STRIKE,
+    "code": CODE,
+    "a": LINK,
+    "p": PARAGRAPH,
+    "div": PARAGRAPH,
+    "h1": HEADING,
+    "h2": HEADING,
+    "h3": HEADING,
+    "h4": HEADING,
+    "h5": HEADING,
+    "h6": HEADING,
+    "blockquote": QUOTE,
+    "ul": LIST,
+    "ol": ORDERED_LIST,
+    "li": ITEM,
+    "pre": PREFORMATTED,
+    "hr": RULE,
+    "br": BREAK,
+}
+# dropped with their content, while the other unknown tags are replaced by their content
+IGNORED_TAGS = {"head", "img", "script", "style", "template"}
+
+HTML_WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+MULTIPLE_SPACES = re.compile(" {2,}")
+URL_UNSAFE = re.compile(r"[\s()\\]")
+
+
+@dataclass(frozen=True)
+class Node:
+    """
+    An element of the intermediate tree an HTML document is parsed into, only keeping what the
+    dialects can express.
+    """
+
+    kind: str
+    children: Tuple["Node", ...] = ()
+    # the content of text nodes
+    text: str = ""
+    # the target of links
+    href: Optional[str] = None
+    # the level of headings
+    level: int = 0
+
+
+def parse_html(content) -> BeautifulSoup:
+    return BeautifulSoup(content, HTML_PARSER)
+
+
+def _build_nodes(element) -> Tuple[Node, ...]:
+    nodes = []
+    for child in element.children:
+        if isinstance(child, NavigableString):
+            # comments, doctypes and the like
+            if not isinstance(child, PreformattedString):
+                nodes.append(Node(TEXT, text=str(child)))
+            continue
+        if child.name in IGNORED_TAGS:
+            continue
+        kind = TAGS.get(child.name)
+        children = _build_nodes(child)
+        if kind is None:
+            nodes.extend(children)
+        else:
+            nodes.append(
+                Node(
+                    kind,
+                    children,
+                    href=child.get("href") if kind == LINK else None,
+                    level=int(child.name[1]) if kind == HEADING else 0,
+                )
+            )
+    return tuple(nodes)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(content: str) -> Node:
+    """
+    Parses an HTML document into the intermediate tree every dialect is rendered from.
+    """
+    return Node(ROOT, _build_nodes(parse_html(content)))
+
+
+def get_raw_text(node: Node) -> str:
+    if node.kind == TEXT:
+        return node.text
+    if node.kind == BREAK:
+        return "\n"
+    return "".join(get_raw_text(child) for child in node.children)
+
+
+def quote_url(url: str) -> str:
+    return URL_UNSAFE.sub(lambda match: quote(match.group(0)), url)
+
+
+def _wrap(text: str, style: Callable[[str], str]) -> str:
+    # markers have to be next to the text they mark
+    stripped = text.strip()
+    if not stripped:
+        return text
+    start = len(text) - len(text.lstrip())
+    return f"{text[:start]}{style(stripped)}{text[start + len(stripped):]}"
+
+
+class Renderer:
+    """
+    Renders the intermediate tree as plaintext. Subclasses render the markup of the other dialects.
+    """
+
+    line_break = "\n"
+    bullet = "- "
+    quote_prefix = ""
+    rule = "---"
+
+    def escape(self, text: str) -> str:
+        return text
+
+    def bold(self, text: str) -> str:
+        return text
+
+    def italic(self, text: str) -> str:
+        return text
+
+    def strike(self, text: str) -> str:
+        return text
+
+    def code(self, text: str) -> str:
+        return self.escape(text)
+
+    def link(self, text: str, href: Optional[str]) -> str:
+        return text or self.escape(href or "")
+
+    def heading(self, text: str, level: int) -> str:
+        return text
+
+    def numbered_bullet(self, number: int) -> str:
+        return f"{number}. "
+
+    def preformatted(self, text: str) -> str:
+        return self.escape(text)
+
+    def render(self, root: Node) -> str:
+        return "\n\n".join(self._render_blocks(root.children))
+
+    def _render_inline(self, nodes: Iterable[Node]) -> str:
+        return "".join(self._render_inline_node(node) for node in nodes)
+
+    def _render_inline_node(self, node: Node) -> str:
+        if node.kind == TEXT:
+            return self.escape(HTML_WHITESPACE.sub(" ", node.text))
+        if node.kind == BREAK:
+            return "\n"
+        if node.kind == CODE:
+            return _wrap(HTML_WHITESPACE.sub(" ", get_raw_text(node)), self.code)
+        text = self._render_inline(node.children)
+        if node.kind == LINK:
+            if not text.strip():
+                return self.link("", node.href)
+            return _wrap(text, lambda stripped: self.link(stripped, node.href))
+        if node.kind == BOLD:
+            return _wrap(text, self.bold)
+        if node.kind == ITALIC:
+            return _wrap(text, self.italic)
+        if node.kind == STRIKE:
+            return _wrap(text, self.strike)
+        # blocks inside inline elements
+        return text
+
+    def _normalize(self, text: str) -> str:
+        # the whitespace left between inline elements, and around line breaks
+        lines = [MULTIPLE_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+        return "\n".join(lines).strip("\n").replace("\n", self.line_break)
+
+    def _render_blocks(self, nodes: Iterable[Node]) -> List[str]:
+        """
+        Renders a sequence of nodes as blocks of text, grouping consecutive inline nodes in paragraphs. Empty
+        blocks are left out.
+        """
+        blocks = []
+        inline = []
+
+        def add_paragraph():
+            text = self._normalize(self._render_inline(inline))
+            if text:
+                blocks.append(text)
+            inline.clear()
+
+        for node in nodes:
+            if node.kind in BLOCKS:
+                add_paragraph()
+                block = self._render_block(node)
+                if block:
+                    blocks.append(block)
+            else:
+                inline.append(node)
+        add_paragraph()
+        return blocks
+
+    def _render_list(self, node: Node) -> str:
+        items = []
+        for child in node.children:
+            item_nodes = child.children if child.kind == ITEM else (child,)
+            content = "\n".join(self._render_blocks(item_nodes))
+            if not content:
+                continue
+            if node.kind == ORDERED_LIST:
+                bullet = self.numbered_bullet(len(items) + 1)
+            else:
+                bullet = self.bullet
+            items.append(bullet + content.replace("\n", "\n" + " " * len(bullet)))
+        return "\n".join(items)
+
+    def _render_block(self, node: Node) -> str:
+        if node.kind == HEADING:
+            text = self._normalize(self._render_inline(node.children))
+            return self.heading(text, node.level) if text else ""
+        if node.kind == QUOTE:
+            content = "\n\n".join(self._render_blocks(node.children))
+            return "\n".join(
+                self.quote_prefix + line if line else self.quote_prefix.rstrip()
+                for line in content.split("\n")
+            ).strip("\n")
+        if node.kind in (LIST, ORDERED_LIST):
+            return self._render_list(node)
+        if node.kind == PREFORMATTED:
+            text = get_raw_text(node).strip("\n")
+            return self.preformatted(text) if text.strip() else ""
+        if node.kind == RULE:
+            return self.rule
+        return "\n\n".join(self._render_blocks(node.children))
+
+
+class MarkdownRenderer(Renderer):
+    line_break = "  \n"
+    bullet = "* "
+    quote_prefix = "> "
+    _reserved = re.compile(r"([\\`*_\[\]>])")
+
+    def escape(self, text: str) -> str:
+        return self._reserved.sub(r"\\\1", text)
+
+    def bold(self, text: str) -> str:
+        return f"**{text}**"
+
+    def italic(self, text: str) -> str:
+        return f"*{text}*"
+
+    def strike(self, text: str) -> str:
+        return f"~~{text}~~"
+
+    def code(self, text: str) -> str:
+        return f"`{text}`" if "`" not in text else self.escape(text)
+
+    def link(self, text: str, href: Optional[str]) -> str:
+        if not href:
+            return text
+        return f"[{text or self.escape(href)}]({quote_url(href)})"
+
+    def heading(self, text: str, level: int) -> str:
+        return f"{'#' * level} {text}"
+
+    def preformatted(self, text: str) -> str:
+        return f"```\n{text}\n```" if "```" not in text else self.escape(text)
+
+
+class ZulipRenderer(MarkdownRenderer):
+    # Zulip breaks lines where the text does
+    line_break = "\n"
+
+
+class TelegramRenderer(Renderer):
+    """
+    Renders the markup kept by ``TelegramFormatter.escape_message``, that escapes what's left when the whole
+    message is sent.
+    """
+
+    bullet = "• "
+    quote_prefix = "\\> "
+    rule = "\\-\\-\\-"
+    # https://core.telegram.org/bots/api#markdownv2-style
+    _reserved = re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])")
+
+    def escape(self, text: str) -> str:
+        return self._reserved.sub(r"\\\1", text)
+
+    def bold(self, text: str) -> str:
+        return f"*{text}*"
+
+    def italic(self, text: str) -> str:
+        return f"_{text}_"
+
+    def link(self, text: str, href: Optional[str]) -> str:
+        if not href:
+            return text
+        return f"[{text or self.escape(href)}]({quote_url(href)})"
+
+    def heading(self, text: str, level: int) -> str:
+        return self.bold(text)
+
+    def numbered_bullet(self, number: int) -> str:
+        return f"{number}\\. "
+
+
+class Dialect(Enum):
+    PLAINTEXT = "plaintext"
+    MARKDOWN = "markdown"
+    TELEGRAM = "telegram"
+    ZULIP = "zulip"
+
+
+RENDERERS = {
+    Dialect.PLAINTEXT: Renderer(),
+    Dialect.MARKDOWN: MarkdownRenderer(),
+    Dialect.TELEGRAM: TelegramRenderer(),
+    Dialect.ZULIP: ZulipRenderer(),
+}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert_html(content: Optional[str], dialect: Dialect) -> Optional[str]:
+    """
+    Converts an HTML document to the text format of a dialect. The document is parsed once for all the dialects.
+    """
+    if not content:
+        return content
+    return RENDERERS[dialect].render(parse(content))
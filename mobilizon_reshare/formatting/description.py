@@ -1,11 +1,4 @@
-from typing import List
-
-from bs4 import BeautifulSoup, Tag
-import markdownify
-
-
-def get_bottom_paragraphs(soup: BeautifulSoup) -> List[Tag]:
-    return [d for d in soup.findAll("p") if not d.find("p")]
+from mobilizon_reshare.formatting.converter import Dialect, convert_html
 
 
 def html_to_plaintext(content):
@@ -15,14 +8,8 @@ def html_to_plaintext(content):
     :param content:
     :return:
     """
-    # TODO: support links and quotes
-    soup = BeautifulSoup(content)
-    return "\n".join(
-        " ".join(tag.stripped_strings) for tag in get_bottom_paragraphs(soup)
-    )
+    return convert_html(content, Dialect.PLAINTEXT)
 
 
 def html_to_markdown(content):
-    markdown = markdownify.markdownify(content)
-    escaped_markdown = markdown.replace(">", "\\>")
-    return escaped_markdown.strip()
+    return convert_html(content, Dialect.MARKDOWN)
@@ -0,0 +1,95 @@
+import gzip
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import arrow
+
+from mobilizon_reshare.config.config import get_settings
+from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.storage.db import compact, get_db_file_size
+from mobilizon_reshare.storage.query.read import iter_event_model_pages
+from mobilizon_reshare.storage.query.write import delete_events
+from mobilizon_reshare.storage.serialization import event_to_dict
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveReport:
+    path: Optional[Path]
+    events: int = 0
+    publications: int = 0
+    # None when the database size can't be measured, i.e. for PostgreSQL databases
+    reclaimed_bytes: Optional[int] = None
+
+    def __str__(self):
+        if not self.events:
+            return "No event to archive."
+        reclaimed = (
+            f"{self.reclaimed_bytes} bytes"
+            if self.reclaimed_bytes is not None
+            else "unknown"
+        )
+        return (
+            f"Archived {self.events} events and {self.publications} publications to {self.path}.\n"
+            f"Space reclaimed: {reclaimed}"
+        )
+
+
+def get_archive_dir() -> Path:
+    settings = get_settings()
+    return Path(
+        settings["retention"]["archive_dir"]
+        or Path(settings.local_state_dir, "archive")
+    )
+
+
+async def archive(
+    retention_days: Optional[int] = None, page_size: int = 100
+) -> ArchiveReport:
+    """
+    Moves the events that ended more than ``retention_days`` days ago, together with their publications, from the
+    database to a compressed NDJSON file. Every page of events is written to the archive before being deleted.
+    """
+    if retention_days is None:
+        retention_days = get_settings()["retention"]["days"]
+    threshold = arrow.now().shift(days=-retention_days)
+
+    path = (
+        get_archive_dir() / f"events-{arrow.now().format('YYYYMMDDTHHmmss')}.ndjson.gz"
+    )
+    report = ArchiveReport(path=None)
+    size_before = get_db_file_size()
+
+    archive_file = None
+    try:
+        async for page in iter_event_model_pages(
+            Event.filter(end_datetime__lt=threshold.to("utc").datetime),
+            page_size=page_size,
+        ):
+            if archive_file is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                archive_file = gzip.open(path, "wt", encoding="utf-8")
+                report.path = path
+            for event in page:
+                archive_file.write(json.dumps(event_to_dict(event)) + "\n")
+                report.publications += len(event.publications)
+            archive_file.flush()
+
+            await delete_events(page)
+            report.events += len(page)
+    finally:
+        if archive_file is not None:
+            archive_file.close()
+
+    if report.events:
+        await compact()
+        size_after = get_db_file_size()
+        if size_before is not None and size_after is not None:
+            report.reclaimed_bytes = size_before - size_after
+
+    logger.info(str(report))
+    return report
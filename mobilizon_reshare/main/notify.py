@@ -0,0 +1,43 @@
+import logging
+from typing import Iterable, Optional
+
+from mobilizon_reshare.config.config import get_settings
+from mobilizon_reshare.publishers import get_active_notifiers
+from mobilizon_reshare.publishers.coordinator import (
+    BasePublicationReport,
+    StoredNotificationsCoordinator,
+)
+from mobilizon_reshare.publishers.rate_limit import RateLimiter
+from mobilizon_reshare.storage.query.read import get_pending_notifications
+from mobilizon_reshare.storage.query.write import (
+    create_failure_notifications,
+    save_notification_attempts,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def store_failure_notifications(reports: Iterable[BasePublicationReport]):
+    await create_failure_notifications(reports, get_active_notifiers())
+
+
+async def send_pending_notifications(
+    rate_limiter: Optional[RateLimiter] = None,
+) -> None:
+    """
+    Sends the stored notifications that are still waiting, i.e. the ones created by the current run and the ones
+    that previous runs failed to send.
+    """
+    notifications = await get_pending_notifications()
+    if not notifications:
+        return
+
+    logger.info(f"Sending {len(notifications)} notifications")
+    sent, failed = await StoredNotificationsCoordinator(
+        notifications, rate_limiter
+    ).run()
+    await save_notification_attempts(
+        sent, failed, get_settings()["notifications"]["max_attempts"]
+    )
+    if failed:
+        logger.warning(f"{len(failed)} notifications couldn't be sent")
@@ -3,18 +3,24 @@ from typing import Optional, List
 
 from arrow import now
 
+from mobilizon_reshare.config.config import get_settings
 from mobilizon_reshare.event.event import EventPublicationStatus, MobilizonEvent
+from mobilizon_reshare.main.notify import (
+    send_pending_notifications,
+    store_failure_notifications,
+)
 from mobilizon_reshare.publishers import get_active_publishers
 from mobilizon_reshare.publishers.abstract import RecapPublication
 from mobilizon_reshare.publishers.coordinator import (
     RecapCoordinator,
-    PublicationFailureNotifiersCoordinator,
     BaseCoordinatorReport,
 )
 from mobilizon_reshare.publishers.platforms.platform_mapping import (
     get_publisher_class,
     get_formatter_class,
 )
+from mobilizon_reshare.publishers.rate_limit import get_rate_limiter
+from mobilizon_reshare.publishers.registry import get_platform
 from mobilizon_reshare.storage.query.read import events_with_status
 
 logger = logging.getLogger(__name__)
@@ -31,22 +37,27 @@ async def select_events_to_recap() -> List[MobilizonEvent]:
 async def recap() -> Optional[BaseCoordinatorReport]:
     # I want to recap only the events that have been succesfully published and that haven't happened yet
     events_to_recap = await select_events_to_recap()
+    rate_limiter = get_rate_limiter()
 
     if events_to_recap:
         logger.info(f"Found {len(events_to_recap)} events to recap.")
         recap_publications = [
             RecapPublication(
-                get_publisher_class(publisher)(),
+                get_platform(get_publisher_class(publisher)),
                 get_formatter_class(publisher)(),
                 events_to_recap,
             )
             for publisher in get_active_publishers()
         ]
-        reports = RecapCoordinator(recap_publications).run()
-
-        for report in reports.reports:
-            if report.status == EventPublicationStatus.FAILED:
-                PublicationFailureNotifiersCoordinator(report).notify_failure()
+        reports = await RecapCoordinator(
+            recap_publications,
+            rate_limiter,
+            max_fragments=get_settings()["recap"]["max_fragments"],
+        ).run()
+
+        await store_failure_notifications(reports.reports)
+        await send_pending_notifications(rate_limiter)
         return reports
     else:
         logger.info("Found no events")
+        await send_pending_notifications(rate_limiter)
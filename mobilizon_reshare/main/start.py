@@ -1,24 +1,40 @@
 import logging.config
 
+import arrow
+
+from mobilizon_reshare.config.config import get_settings
 from mobilizon_reshare.event.event_selection_strategies import select_event_to_publish
-from mobilizon_reshare.mobilizon.events import get_unpublished_events
-from mobilizon_reshare.publishers.coordinator import (
-    PublicationFailureNotifiersCoordinator,
+from mobilizon_reshare.main.archive import archive
+from mobilizon_reshare.main.notify import (
+    send_pending_notifications,
+    store_failure_notifications,
 )
+from mobilizon_reshare.mobilizon.events import get_unpublished_events
+from mobilizon_reshare.publishers import get_active_notifiers
+from mobilizon_reshare.publishers.circuit_breaker import get_circuit_breaker
 from mobilizon_reshare.publishers.coordinator import PublisherCoordinator
+from mobilizon_reshare.publishers.credentials import CredentialsCache
+from mobilizon_reshare.publishers.media import get_media_cache
+from mobilizon_reshare.publishers.rate_limit import get_rate_limiter
+from mobilizon_reshare.publishers.retry import get_retry_policy
 from mobilizon_reshare.storage.query.read import (
     get_published_events,
-    build_publications,
+    build_retry_publications,
 )
 from mobilizon_reshare.storage.query.write import (
+    create_pending_publications,
     create_unpublished_events,
+    recover_interrupted_publications,
+    save_published_publication,
     save_publication_report,
+    save_retry_report,
+    set_publications_pending,
 )
 
 logger = logging.getLogger(__name__)
 
 
-async def start():
+async def start(revalidate: bool = False):
     """
     STUB
     :return:
@@ -28,6 +44,14 @@ async def start():
     # We need a simpler way to bring together events from mobilizon, unpublished events from the db
     # and published events from the DB
 
+    settings = get_settings()["publishing"]
+    interrupted = await recover_interrupted_publications(
+        arrow.utcnow().shift(seconds=-settings["pending_timeout"]),
+        get_active_notifiers(),
+    )
+    if interrupted:
+        logger.warning(f"{interrupted} publications were interrupted")
+
     # Load past events
     published_events = list(await get_published_events())
 
@@ -42,15 +66,56 @@ async def start():
         db_unpublished_events,
     )
 
-    if event:
-        logger.info(f"Event to publish found: {event.name}")
+    credentials_cache = CredentialsCache(
+        settings["credentials_ttl"], revalidate=revalidate
+    )
+    retry_policy = get_retry_policy()
+    rate_limiter = get_rate_limiter()
+    circuit_breaker = get_circuit_breaker()
+    media_cache = get_media_cache()
+
+    def build_coordinator(publications):
+        return PublisherCoordinator(
+            publications,
+            max_workers=settings["max_workers"],
+            timeout=settings["timeout"],
+            credentials_cache=credentials_cache,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            media_cache=media_cache,
+            # stored right away, so that a crash can't cause a second post
+            on_published=lambda publication, result: save_published_publication(
+                publication.id, result.remote_id
+            ),
+        )
+
+    try:
+        if event:
+            logger.info(f"Event to publish found: {event.name}")
+
+            publications = await create_pending_publications(event)
+            reports = await build_coordinator(publications).run()
+
+            await save_publication_report(reports, retry_policy)
+            await store_failure_notifications(reports.reports)
+        else:
+            logger.info("No event to publish found")
+
+        # only the platforms that failed are published to again
+        retry_publications = await build_retry_publications(arrow.now())
+        if retry_publications:
+            logger.info(f"Retrying {len(retry_publications)} failed publications")
+            await set_publications_pending(retry_publications)
+            retry_reports = await build_coordinator(retry_publications).run()
+            exhausted = await save_retry_report(retry_reports, retry_policy)
+            # failures were notified at the first attempt, only giving up is notified again
+            await store_failure_notifications(exhausted)
+    finally:
+        if media_cache:
+            media_cache.close()
 
-        publications = await build_publications(event)
-        reports = PublisherCoordinator(publications).run()
+    # sent after publishing, so that a slow notifier can't delay it
+    await send_pending_notifications(rate_limiter)
 
-        await save_publication_report(reports)
-        for report in reports.reports:
-            if not report.succesful:
-                PublicationFailureNotifiersCoordinator(report,).notify_failure()
-    else:
-        logger.info("No event to publish found")
+    if get_settings()["retention"]["archive_on_start"]:
+        await archive()
@@ -0,0 +1,93 @@
+import csv
+import itertools
+import json
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Iterator, TextIO
+
+from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.storage.query.read import iter_event_models
+from mobilizon_reshare.storage.query.write import import_events
+from mobilizon_reshare.storage.serialization import (
+    CSV_FIELDS,
+    event_dict_to_rows,
+    event_to_dict,
+    rows_to_event_dicts,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ["ndjson", "csv"]
+
+
+@dataclass
+class TransferReport:
+    events: int = 0
+    publications: int = 0
+
+
+class _EventWriter:
+    def __init__(self, file: TextIO, format: str):
+        self.file = file
+        if format == "csv":
+            self.csv_writer = csv.DictWriter(file, CSV_FIELDS, lineterminator="\n")
+            self.csv_writer.writeheader()
+        else:
+            self.csv_writer = None
+
+    def write(self, event: dict) -> None:
+        if self.csv_writer:
+            self.csv_writer.writerows(event_dict_to_rows(event))
+        else:
+            self.file.write(json.dumps(event) + "\n")
+
+
+def _read_events(file: TextIO, format: str) -> Iterator[dict]:
+    if format == "csv":
+        return rows_to_event_dicts(csv.DictReader(file))
+    return (json.loads(line) for line in file if line.strip())
+
+
+def _batches(events: Iterable[dict], batch_size: int) -> Iterator[list[dict]]:
+    events = iter(events)
+    while batch := list(itertools.islice(events, batch_size)):
+        yield batch
+
+
+async def export_database(
+    file: TextIO, format: str = "ndjson", page_size: int = 100
+) -> TransferReport:
+    """
+    Writes every event, together with its publications, to ``file``. Events are read one page at a time, so memory
+    usage doesn't depend on the size of the database.
+    NDJSON files hold an event for each line, CSV files a publication for each row, see ``event_dict_to_rows``.
+    """
+    report = TransferReport()
+    writer = _EventWriter(file, format)
+    async for event in iter_event_models(Event.all(), page_size=page_size):
+        event = event_to_dict(event)
+        writer.write(event)
+        report.events += 1
+        report.publications += len(event["publications"])
+    logger.info(
+        f"Exported {report.events} events and {report.publications} publications"
+    )
+    return report
+
+
+async def import_database(
+    file: TextIO, format: str = "ndjson", batch_size: int = 100
+) -> TransferReport:
+    """
+    Reads events written by ``export_database`` and stores the new ones, a transaction for each batch of events.
+    Importing the same file more than once has no effect.
+    """
+    report = TransferReport()
+    for batch in _batches(_read_events(file, format), batch_size):
+        events, publications = await import_events(batch)
+        report.events += events
+        report.publications += publications
+    logger.info(
+        f"Imported {report.events} new events and {report.publications} new publications"
+    )
+    return report
@@ -0,0 +1,17 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class CircuitBreakerState(Model):
+    # name of the platform
+    key = fields.CharField(pk=True, max_length=128)
+    # failures in a row of the platform
+    failures = fields.IntField(default=0)
+    # set while the platform is skipped after too many failures
+    opened_until = fields.DatetimeField(null=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.failures} failures"
+
+    class Meta:
+        table = "circuit_breaker"
@@ -0,0 +1,17 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class CredentialValidation(Model):
+    id = fields.IntField(pk=True)
+    platform = fields.CharField(max_length=256)
+    # hash of the platform's settings: changing the credentials makes previous validations irrelevant
+    fingerprint = fields.CharField(max_length=64)
+    validated_at = fields.DatetimeField()
+
+    def __str__(self):
+        return f"{self.platform} validated at {self.validated_at}"
+
+    class Meta:
+        table = "credential_validation"
+        unique_together = (("platform", "fingerprint"),)
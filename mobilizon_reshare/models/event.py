@@ -19,6 +19,9 @@ class Event(Model):
     begin_datetime = fields.DatetimeField()
     end_datetime = fields.DatetimeField()
 
+    # when the event was first seen, unknown for events stored before it was recorded
+    created_at = fields.DatetimeField(null=True)
+
     publications: fields.ReverseRelation["Publication"]
 
     def __str__(self):
@@ -34,6 +37,11 @@ class Event(Model):
         self, publisher_name: str, status: PublicationStatus = PublicationStatus.FAILED
     ) -> Publication:
         publisher = await Publisher.filter(name=publisher_name).first()
+        return self.build_publication(publisher, status)
+
+    def build_publication(
+        self, publisher: Publisher, status: PublicationStatus = PublicationStatus.FAILED
+    ) -> Publication:
         return Publication(
             status=status,
             event_id=self.id,
@@ -0,0 +1,13 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class Metadata(Model):
+    key = fields.CharField(pk=True, max_length=64)
+    value = fields.TextField()
+
+    def __str__(self):
+        return f"{self.key}={self.value}"
+
+    class Meta:
+        table = "metadata"
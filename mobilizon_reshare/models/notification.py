@@ -17,6 +17,10 @@ class Notification(Model):
 
     message = fields.TextField()
 
+    # notifications that couldn't be sent are retried until they reach the maximum number of attempts
+    attempts = fields.IntField(default=0)
+    last_attempt = fields.DatetimeField(null=True)
+
     target = fields.ForeignKeyField(
         "models.Publisher", related_name="notifications", null=True
     )
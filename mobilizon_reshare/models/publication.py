@@ -7,6 +7,8 @@ from tortoise.models import Model
 class PublicationStatus(IntEnum):
     FAILED = 0
     COMPLETED = 1
+    # stored before publishing, so that an interrupted publication isn't mistaken for one that never happened
+    WAITING = 2
 
 
 class Publication(Model):
@@ -18,6 +20,12 @@ class Publication(Model):
     timestamp = fields.DatetimeField(null=True)
     reason = fields.TextField(null=True)
 
+    # failed publications are retried at ``next_attempt``, until they reach the maximum number of attempts
+    attempts = fields.IntField(default=1)
+    next_attempt = fields.DatetimeField(null=True)
+    # id of the post on the platform, once published
+    remote_id = fields.CharField(max_length=256, null=True)
+
     event = fields.ForeignKeyField("models.Event", related_name="publications")
     publisher = fields.ForeignKeyField("models.Publisher", related_name="publications")
 
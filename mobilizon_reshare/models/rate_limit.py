@@ -0,0 +1,18 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class RateLimitState(Model):
+    # platform and account the limit applies to
+    key = fields.CharField(pk=True, max_length=128)
+    # requests that can be made right away, unknown for platforms without a configured limit
+    tokens = fields.FloatField(null=True)
+    updated_at = fields.DatetimeField()
+    # set when the platform asked to wait before the next request
+    blocked_until = fields.DatetimeField(null=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens} tokens"
+
+    class Meta:
+        table = "rate_limit"
@@ -1,23 +1,45 @@
+import dataclasses
 import inspect
+import json
 import logging
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
 from uuid import UUID
 
+import requests
 from dynaconf.utils.boxing import DynaBox
-from jinja2 import Environment, FileSystemLoader, Template
+from jinja2 import Template
 
 from mobilizon_reshare.config.config import get_settings
 from mobilizon_reshare.event.event import MobilizonEvent
+from mobilizon_reshare.formatting.converter import Dialect, convert_html
 from mobilizon_reshare.models.publication import Publication as PublicationModel
-from .exceptions import PublisherError, InvalidAttribute
-
-JINJA_ENV = Environment(loader=FileSystemLoader("/"))
+from .concurrency import run_in_thread
+from .exceptions import (
+    PublisherError,
+    InvalidAttribute,
+    InvalidMessage,
+    PlatformUnavailable,
+    RateLimited,
+)
+from .media import Media
+from .rate_limit import RateLimitHint, parse_rate_limit_headers
+from .templating import get_template
+
+# HTTP statuses telling that the credentials of a platform were rejected
+AUTH_ERROR_STATUS_CODES = (401, 403)
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SendResult:
+    # id of the post or message on the platform, if the platform tells it
+    remote_id: Optional[str] = None
+    rate_limit: Optional[RateLimitHint] = None
+
+
 class LoggerMixin:
     def _log_debug(self, msg, *args, **kwargs):
         self.__log(logging.DEBUG, msg, *args, **kwargs)
@@ -75,9 +97,48 @@ class AbstractPlatform(ABC, LoggerMixin, ConfLoaderMixin):
     # first element is the type of class (either 'notifier' or 'publisher') and
     # the second the name of its service (ie: 'facebook', 'telegram')
 
+    _session: Optional[requests.Session] = None
+    # settings identifying the account the platform acts as: rate limits are shared by everything using it
+    _account_fields: tuple = tuple()
+    # whether ``_send`` accepts an ``idempotency_key``, that the platform uses to ignore repeated requests
+    idempotent = False
+    # whether ``_send`` accepts a ``media``, the image to attach to the message
+    supports_media = False
+
     def __repr__(self):
         return self.name
 
+    @property
+    def session(self) -> requests.Session:
+        """
+        HTTP session owned by the platform: its connections are kept open and reused by every call until the
+        platform is closed.
+        """
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def open(self) -> "AbstractPlatform":
+        """
+        Opens the session up front, so that threads sharing the platform don't race to create it.
+        """
+        self.session
+        return self
+
+    def close(self) -> None:
+        """
+        Releases the connections of the platform. A closed platform can be used again: it opens new connections.
+        """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     @property
     @abstractmethod
     def name(self):
@@ -87,13 +148,47 @@ class AbstractPlatform(ABC, LoggerMixin, ConfLoaderMixin):
     def _send(self, message: str, event: Optional[MobilizonEvent] = None):
         raise NotImplementedError  # pragma: no cover
 
-    def send(self, message: str, event: Optional[MobilizonEvent] = None):
+    def send(
+        self,
+        message: str,
+        event: Optional[MobilizonEvent] = None,
+        idempotency_key: Optional[str] = None,
+        media: Optional[Media] = None,
+    ) -> SendResult:
         """
-        Sends a message to the target channel
+        Sends a message to the target channel. Sending again with the same ``idempotency_key`` doesn't post the
+        message twice on platforms that support it. ``media`` is ignored by the platforms that can't attach it.
         """
         message = self._preprocess_message(message)
-        response = self._send(message, event)
+        kwargs = {"idempotency_key": idempotency_key} if self.idempotent else {}
+        if media is not None and self.supports_media:
+            kwargs["media"] = media
+        try:
+            response = self._send(message, event, **kwargs)
+        except requests.RequestException as e:
+            raise PlatformUnavailable(f"Can't reach {self.name}: {e}") from e
+        hint = self._get_rate_limit_hint(response)
+        if hint and hint.retry_after is not None:
+            raise RateLimited(
+                f"Rate limited by {self.name}, retry in {hint.retry_after:.0f} seconds",
+                hint,
+            )
         self._validate_response(response)
+        try:
+            remote_id = self._get_remote_id(response)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            # the message was sent all the same
+            self._log_warning("Can't find the id of the message in the response")
+            remote_id = None
+        return SendResult(remote_id=remote_id, rate_limit=hint)
+
+    def _get_remote_id(self, response) -> Optional[str]:
+        return None
+
+    def _get_rate_limit_hint(self, response) -> Optional[RateLimitHint]:
+        if isinstance(response, requests.Response):
+            return parse_rate_limit_headers(response.status_code, response.headers)
+        return None
 
     def _preprocess_message(self, message: str):
         return message
@@ -111,8 +206,45 @@ class AbstractPlatform(ABC, LoggerMixin, ConfLoaderMixin):
         """
         raise NotImplementedError  # pragma: no cover
 
+    async def async_send(
+        self,
+        message: str,
+        event: Optional[MobilizonEvent] = None,
+        idempotency_key: Optional[str] = None,
+        media: Optional[Media] = None,
+    ) -> SendResult:
+        """
+        Sends a message to the target channel without blocking the event loop. Platforms with a native async
+        client can override it, by default ``send`` is run in a thread.
+        """
+        return await run_in_thread(self.send, message, event, idempotency_key, media)
+
+    async def async_validate_credentials(self) -> None:
+        """
+        Validates credentials without blocking the event loop, see ``async_send``.
+        """
+        await run_in_thread(self.validate_credentials)
+
+
+def get_event_fingerprint(event: MobilizonEvent) -> str:
+    """
+    Identifies the content of the event: events that can be told apart produce different messages.
+    """
+    return json.dumps(asdict(event), sort_keys=True, default=str)
+
+
+RECAP_SEPARATOR = "\n\n"
+
 
 class AbstractEventFormatter(LoggerMixin, ConfLoaderMixin):
+    # the format the HTML of the names and descriptions of the events is converted to
+    dialect: Dialect = Dialect.PLAINTEXT
+
+    def __init__(self):
+        # messages already rendered by the formatter, by template and event fingerprint: a formatter lives as
+        # long as the run it's used by, so that validating and sending render each message once
+        self._rendered: dict[tuple[str, str], str] = {}
+
     @abstractmethod
     def _validate_event(self, event: MobilizonEvent) -> None:
         """
@@ -135,45 +267,103 @@ class AbstractEventFormatter(LoggerMixin, ConfLoaderMixin):
         self._validate_event(event)
         self._validate_message(self.get_message_from_event(event))
 
-    def _preprocess_event(self, event):
+    def _preprocess_event(self, event: MobilizonEvent) -> MobilizonEvent:
         """
-        Allows publishers to preprocess events before feeding them to the template
+        Allows publishers to preprocess events before feeding them to the template. The event must not be
+        modified, a preprocessed copy has to be returned instead.
         """
-        return event
+        return dataclasses.replace(
+            event,
+            description=convert_html(event.description, self.dialect),
+            name=convert_html(event.name, self.dialect),
+        )
+
+    def _render(
+        self, event: MobilizonEvent, get_template: Callable[[], Template]
+    ) -> str:
+        key = (get_template.__name__, get_event_fingerprint(event))
+        if key not in self._rendered:
+            self._rendered[key] = self._preprocess_event(event).format(get_template())
+        return self._rendered[key]
 
     def get_message_from_event(self, event: MobilizonEvent) -> str:
         """
         Retrieves a message from the event itself.
         """
-        event = self._preprocess_event(event)
-        return event.format(self.get_message_template())
+        return self._render(event, self.get_message_template)
+
+    def get_message_template_path(self) -> str:
+        return self.conf.msg_template_path or self.default_template_path
+
+    def get_recap_header_template_path(self) -> str:
+        return (
+            self.conf.recap_header_template_path
+            or self.default_recap_header_template_path
+        )
+
+    def get_recap_fragment_template_path(self) -> str:
+        return self.conf.recap_template_path or self.default_recap_template_path
+
+    def get_template_paths(self) -> List[str]:
+        return [
+            self.get_message_template_path(),
+            self.get_recap_header_template_path(),
+            self.get_recap_fragment_template_path(),
+        ]
 
     def get_message_template(self) -> Template:
         """
         Retrieves publisher's message template.
         """
-        template_path = self.conf.msg_template_path or self.default_template_path
-        return JINJA_ENV.get_template(template_path)
+        return get_template(self.get_message_template_path())
 
     def get_recap_header(self):
-        template_path = (
-            self.conf.recap_header_template_path
-            or self.default_recap_header_template_path
-        )
-        return JINJA_ENV.get_template(template_path).render()
+        return get_template(self.get_recap_header_template_path()).render()
 
     def get_recap_fragment_template(self) -> Template:
-        template_path = (
-            self.conf.recap_template_path or self.default_recap_template_path
-        )
-        return JINJA_ENV.get_template(template_path)
+        return get_template(self.get_recap_fragment_template_path())
 
     def get_recap_fragment(self, event: MobilizonEvent) -> str:
         """
         Retrieves the fragment that describes a single event inside the event recap.
         """
-        event = self._preprocess_event(event)
-        return event.format(self.get_recap_fragment_template())
+        return self._render(event, self.get_recap_fragment_template)
+
+    def _fits(self, parts: List[str]) -> bool:
+        try:
+            self._validate_message(RECAP_SEPARATOR.join(parts))
+        except InvalidMessage:
+            return False
+        return True
+
+    def get_recap_messages(
+        self, events: Iterable[MobilizonEvent], max_fragments: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Packs the header and the fragments of the events in as few messages as the platform accepts, to be sent
+        one after the other. Messages are yielded as soon as they're full, and at most ``max_fragments`` events
+        are recapped. An event whose fragment doesn't fit in a message on its own is left out.
+        """
+        parts = [self.get_recap_header()]
+        # the header isn't sent without any event
+        has_fragments = False
+        for count, event in enumerate(events):
+            if max_fragments is not None and count >= max_fragments:
+                self._log_info(f"Recap limited to the first {max_fragments} events")
+                break
+            fragment = self.get_recap_fragment(event)
+            if self._fits(parts + [fragment]):
+                parts.append(fragment)
+                has_fragments = True
+            elif self._fits([fragment]):
+                # the header is sent on its own if not even the first fragment fits with it
+                yield RECAP_SEPARATOR.join(parts)
+                parts = [fragment]
+                has_fragments = True
+            else:
+                self._log_warning(f"Event {event.name} doesn't fit in a recap message")
+        if has_fragments:
+            yield RECAP_SEPARATOR.join(parts)
 
 
 @dataclass
@@ -195,7 +385,9 @@ class EventPublication(BasePublication):
             get_formatter_class,
         )
 
-        publisher = get_publisher_class(model.publisher.name)()
+        from mobilizon_reshare.publishers.registry import get_platform
+
+        publisher = get_platform(get_publisher_class(model.publisher.name))
         formatter = get_formatter_class(model.publisher.name)()
         return cls(publisher, formatter, event, model.id,)
 
@@ -0,0 +1,124 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import arrow
+
+from mobilizon_reshare.config.config import get_settings
+from mobilizon_reshare.publishers.abstract import AbstractPlatform
+from mobilizon_reshare.publishers.exceptions import (
+    InvalidCredentials,
+    InvalidEvent,
+    InvalidMessage,
+    RateLimited,
+)
+from mobilizon_reshare.publishers.loader import LazyLoader
+from mobilizon_reshare.storage.query.read import get_circuit_breaker_states
+from mobilizon_reshare.storage.query.write import save_circuit_breaker_state
+
+logger = logging.getLogger(__name__)
+
+# errors telling that the platform works, but refused what it was given or how it was asked
+HEALTHY_PLATFORM_ERRORS = (
+    InvalidCredentials,
+    InvalidEvent,
+    InvalidMessage,
+    RateLimited,
+)
+
+
+def is_platform_failure(error: Optional[Exception]) -> bool:
+    """
+    Tells whether an error shows that the platform itself is failing, e.g. it can't be reached or it answers
+    with server errors.
+    """
+    if error is None:
+        return False
+    # the coordinator wraps the validation errors, the first one tells what went wrong
+    cause = error.__cause__ or error
+    return not isinstance(cause, HEALTHY_PLATFORM_ERRORS)
+
+
+@dataclass
+class Circuit:
+    failures: int = 0
+    opened_until: Optional[datetime] = None
+
+
+class CircuitBreaker:
+    """
+    Skips the platforms that failed ``failure_threshold`` times in a row, so that a platform that's down doesn't
+    cost a timeout to every run. After ``cooldown`` seconds the platform is tried again once: if it works it's
+    used again, otherwise it's skipped for another ``cooldown``. The state is kept in the database, so that it
+    spans several runs.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._circuits: LazyLoader[dict[str, Circuit]] = LazyLoader(self._load)
+        # platforms that are being tried again after their cooldown
+        self._probing: set[str] = set()
+
+    async def _load(self) -> dict[str, Circuit]:
+        return {
+            state.key: Circuit(state.failures, state.opened_until)
+            for state in await get_circuit_breaker_states()
+        }
+
+    async def _get_circuit(self, key: str) -> Circuit:
+        return (await self._circuits.get()).setdefault(key, Circuit())
+
+    async def get_skip_reason(self, platform: AbstractPlatform) -> Optional[str]:
+        """
+        Returns why the platform has to be skipped, None if it can be used.
+        """
+        key = platform.name
+        circuit = await self._get_circuit(key)
+        if circuit.opened_until is None:
+            return None
+        failed = f"{key} failed {circuit.failures} times in a row"
+        if key in self._probing:
+            # a single publication is enough to find out whether the platform is back
+            return f"Skipped: {failed}, it's being tried again with another publication"
+        opened_until = arrow.get(circuit.opened_until)
+        if arrow.utcnow() >= opened_until:
+            logger.info(f"Trying {key} again after its cooldown")
+            self._probing.add(key)
+            return None
+        return f"Skipped: {failed}, it will be tried again after {opened_until.isoformat()}"
+
+    async def record(
+        self, platform: AbstractPlatform, error: Optional[Exception]
+    ) -> None:
+        """
+        Records the outcome of using the platform, ``error`` being None if it succeeded.
+        """
+        key = platform.name
+        circuit = await self._get_circuit(key)
+        probing = key in self._probing
+        if is_platform_failure(error):
+            circuit.failures += 1
+            if probing or circuit.failures >= self.failure_threshold:
+                circuit.opened_until = (
+                    arrow.utcnow().shift(seconds=self.cooldown).datetime
+                )
+                logger.warning(
+                    f"{key} failed {circuit.failures} times in a row, skipping it for {self.cooldown} seconds"
+                )
+        elif circuit.failures or circuit.opened_until:
+            circuit.failures = 0
+            circuit.opened_until = None
+        else:
+            # nothing changed, the state isn't written
+            return
+        self._probing.discard(key)
+        await save_circuit_breaker_state(key, circuit.failures, circuit.opened_until)
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    settings = get_settings()["circuit_breaker"]
+    return CircuitBreaker(
+        failure_threshold=settings["failure_threshold"], cooldown=settings["cooldown"]
+    )
@@ -0,0 +1,87 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from mobilizon_reshare.config.config import get_settings
+from mobilizon_reshare.publishers.exceptions import PlatformTimeout
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass
+class TaskOutcome:
+    result: Any = None
+    error: Optional[Exception] = None
+    # wall-clock seconds between the start of the task and its end or its timeout
+    elapsed: float = 0.0
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the pool the blocking calls to the platforms are run in, sized like the publishing workers so that
+    calls abandoned after a timeout can't pile up threads.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings()["publishing"]["max_workers"],
+            thread_name_prefix="platform",
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """
+    Drops the calls that haven't started yet, without waiting for the running ones.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_thread(function: Callable, *args) -> Any:
+    """
+    Runs a blocking call in the pool returned by ``get_executor``, without blocking the event loop.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), functools.partial(context.run, function, *args)
+    )
+
+
+async def run_concurrently(
+    function: Callable[[Any], Awaitable[Any]],
+    items: Sequence[Any],
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[TaskOutcome]:
+    """
+    Awaits ``function`` on every item, running at most ``max_workers`` calls at the same time, and returns their
+    outcomes in the order of ``items``.
+
+    A call running for more than ``timeout`` seconds is cancelled and fails with ``PlatformTimeout``.
+    """
+    semaphore = asyncio.Semaphore(max_workers or len(items) or 1)
+
+    async def task(item) -> TaskOutcome:
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                outcome = TaskOutcome(
+                    result=await asyncio.wait_for(function(item), timeout)
+                )
+            except asyncio.TimeoutError:
+                outcome = TaskOutcome(
+                    error=PlatformTimeout(f"Timed out after {timeout} seconds")
+                )
+            except Exception as e:
+                outcome = TaskOutcome(error=e)
+            outcome.elapsed = time.monotonic() - start
+            return outcome
+
+    return list(await asyncio.gather(*(task(item) for item in items)))
@@ -1,20 +1,47 @@
 import logging
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional, Tuple
 
+from mobilizon_reshare.event.event import MobilizonEvent
+from mobilizon_reshare.models.notification import Notification
 from mobilizon_reshare.models.publication import PublicationStatus
-from mobilizon_reshare.publishers import get_active_notifiers
 from mobilizon_reshare.publishers.abstract import (
     EventPublication,
     AbstractPlatform,
     RecapPublication,
+    SendResult,
 )
-from mobilizon_reshare.publishers.exceptions import PublisherError
+from mobilizon_reshare.publishers.concurrency import run_concurrently
+from mobilizon_reshare.publishers.exceptions import (
+    InvalidCredentials,
+    InvalidMessage,
+    PlatformTimeout,
+    PublisherError,
+    UnknownOutcome,
+)
+from mobilizon_reshare.publishers.media import Media
 from mobilizon_reshare.publishers.platforms.platform_mapping import get_notifier_class
+from mobilizon_reshare.publishers.registry import get_platform
 
 logger = logging.getLogger(__name__)
 
 
+async def send_message(
+    platform: AbstractPlatform,
+    message: str,
+    event: Optional[MobilizonEvent] = None,
+    rate_limiter=None,
+    idempotency_key: Optional[str] = None,
+    media: Optional[Media] = None,
+) -> SendResult:
+    """
+    Sends the message through the platform, within its rate limit if a ``RateLimiter`` is given.
+    """
+    if rate_limiter is None:
+        return await platform.async_send(message, event, idempotency_key, media)
+    return await rate_limiter.send(platform, message, event, idempotency_key, media)
+
+
 @dataclass
 class BasePublicationReport:
     status: PublicationStatus
@@ -34,6 +61,22 @@ class BasePublicationReport:
 @dataclass
 class EventPublicationReport(BasePublicationReport):
     publication: EventPublication
+    # wall-clock seconds spent publishing
+    elapsed: Optional[float] = None
+    # the platform wasn't even tried, because its circuit breaker is open
+    skipped: bool = False
+    # id of the post on the platform
+    remote_id: Optional[str] = None
+    # the send timed out, so that the event might have been posted anyway
+    outcome_unknown: bool = False
+
+    @property
+    def retriable(self) -> bool:
+        """
+        Whether publishing again can't post the event twice: only platforms supporting idempotency keys ignore
+        the repeated request of a send whose outcome is unknown.
+        """
+        return not self.outcome_unknown or self.publication.publisher.idempotent
 
     def get_failure_message(self):
 
@@ -64,133 +107,246 @@ class PublisherCoordinatorReport(BaseCoordinatorReport):
 
 
 class PublisherCoordinator:
-    def __init__(self, publications: List[EventPublication]):
+    """
+    Publishes an event to several platforms at the same time, ``max_workers`` at most (all of them by default).
+    Every platform validates and then publishes on its own: a platform that fails validation is skipped without
+    holding back the others, and one that is still validating doesn't delay posting to those that are done.
+    Validating and publishing to a single platform fails if it takes longer than ``timeout`` seconds.
+    Credentials found valid in ``credentials_cache``, a ``CredentialsCache``, aren't validated again.
+    Messages are sent within the limits of ``rate_limiter``, a ``RateLimiter``.
+    Platforms that ``circuit_breaker``, a ``CircuitBreaker``, deems down are skipped.
+    A platform timing out while sending might have posted the event anyway: its report isn't ``retriable`` unless the
+    platform is ``idempotent``.
+    The image of the event is fetched through ``media_cache``, a ``MediaCache``, and attached to the posts of the
+    platforms supporting it. Without it, or if the image can't be fetched, the event is published without image.
+    ``on_published`` is awaited with every publication and its ``SendResult`` as soon as it's posted, so that it can
+    be recorded before anything else can go wrong.
+    """
+
+    def __init__(
+        self,
+        publications: List[EventPublication],
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        credentials_cache=None,
+        rate_limiter=None,
+        circuit_breaker=None,
+        media_cache=None,
+        on_published: Optional[
+            Callable[[EventPublication, SendResult], Awaitable[None]]
+        ] = None,
+    ):
         self.publications = publications
-
-    def run(self) -> PublisherCoordinatorReport:
-        errors = self._validate()
-        if errors:
-            return PublisherCoordinatorReport(
-                reports=errors, publications=self.publications
-            )
-
-        return self._post()
-
-    def _post(self):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.credentials_cache = credentials_cache
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.media_cache = media_cache
+        self.on_published = on_published
+        # ids of the publications whose message started being sent
+        self._sent = set()
+
+    async def run(self) -> PublisherCoordinatorReport:
         reports = []
 
-        for publication in self.publications:
-
-            try:
-                logger.info(f"Publishing to {publication.publisher.name}")
-                message = publication.formatter.get_message_from_event(
-                    publication.event
+        skip_reasons = [
+            await self.circuit_breaker.get_skip_reason(publication.publisher)
+            if self.circuit_breaker
+            else None
+            for publication in self.publications
+        ]
+        outcomes = iter(
+            await run_concurrently(
+                self._validate_and_publish,
+                [
+                    publication
+                    for publication, skip_reason in zip(self.publications, skip_reasons)
+                    if skip_reason is None
+                ],
+                self.max_workers,
+                self.timeout,
+            )
+        )
+        for publication, skip_reason in zip(self.publications, skip_reasons):
+            if skip_reason:
+                logger.warning(skip_reason)
+                reports.append(
+                    EventPublicationReport(
+                        status=PublicationStatus.FAILED,
+                        reason=skip_reason,
+                        publication=publication,
+                        skipped=True,
+                    )
                 )
-                publication.publisher.send(message, publication.event)
+                continue
+
+            outcome = next(outcomes)
+            if self.circuit_breaker:
+                await self.circuit_breaker.record(publication.publisher, outcome.error)
+            if outcome.error is None:
                 reports.append(
                     EventPublicationReport(
                         status=PublicationStatus.COMPLETED,
                         publication=publication,
                         reason=None,
+                        elapsed=outcome.elapsed,
+                        remote_id=outcome.result.remote_id,
                     )
                 )
-            except PublisherError as e:
-                logger.error(str(e))
+            elif isinstance(outcome.error, PublisherError):
+                error = outcome.error
+                if isinstance(error, PlatformTimeout) and publication.id in self._sent:
+                    error = UnknownOutcome(
+                        f"{error} while sending, check whether the event was posted"
+                    )
+                logger.error(str(error))
                 reports.append(
                     EventPublicationReport(
                         status=PublicationStatus.FAILED,
-                        reason=str(e),
+                        reason=str(error),
                         publication=publication,
+                        elapsed=outcome.elapsed,
+                        outcome_unknown=isinstance(error, UnknownOutcome),
                     )
                 )
+            else:
+                raise outcome.error
 
         return PublisherCoordinatorReport(
             publications=self.publications, reports=reports
         )
 
-    def _safe_run(self, reasons, f, *args, **kwargs):
-        try:
-            f(*args, **kwargs)
-            return reasons
-        except Exception as e:
-            return reasons + [str(e)]
-
-    def _validate(self):
-        errors = []
+    async def _validate_and_publish(self, publication: EventPublication) -> SendResult:
+        errors = await self._validate(publication)
+        if errors:
+            # the first error tells whether the platform or the event is at fault
+            raise PublisherError(", ".join(map(str, errors))) from errors[0]
 
-        for publication in self.publications:
-            reasons = []
-            reasons = self._safe_run(
-                reasons,
-                publication.publisher.validate_credentials,
-            )
-            reasons = self._safe_run(
-                reasons, publication.formatter.validate_event, publication.event
+        logger.info(f"Publishing to {publication.publisher.name}")
+        message = publication.formatter.get_message_from_event(publication.event)
+        media = await self._get_media(publication)
+        self._sent.add(publication.id)
+        try:
+            result = await send_message(
+                publication.publisher,
+                message,
+                publication.event,
+                self.rate_limiter,
+                # the same publication is never posted twice by platforms supporting it, even when retried
+                idempotency_key=str(publication.id),
+                media=media,
             )
-
-            if len(reasons) > 0:
-                errors.append(
-                    EventPublicationReport(
-                        status=PublicationStatus.FAILED,
-                        reason=", ".join(reasons),
-                        publication=publication,
-                    )
-                )
-
+        except InvalidCredentials:
+            if self.credentials_cache:
+                await self.credentials_cache.invalidate(publication.publisher)
+            raise
+        if self.on_published:
+            await self.on_published(publication, result)
+        return result
+
+    async def _get_media(self, publication: EventPublication) -> Optional[Media]:
+        thumbnail_link = publication.event.thumbnail_link
+        if not (
+            self.media_cache and thumbnail_link and publication.publisher.supports_media
+        ):
+            return None
+        return await self.media_cache.get(thumbnail_link)
+
+    async def _validate(self, publication: EventPublication) -> List[Exception]:
+        errors = []
+        try:
+            await self._validate_credentials(publication.publisher)
+        except Exception as e:
+            errors.append(e)
+        try:
+            publication.formatter.validate_event(publication.event)
+        except Exception as e:
+            errors.append(e)
         return errors
 
-
-class AbstractCoordinator:
-    def __init__(self, message: str, platforms: List[AbstractPlatform] = None):
-        self.message = message
-        self.platforms = platforms
-
-    def send_to_all(self):
-        for platform in self.platforms:
+    async def _validate_credentials(self, publisher: AbstractPlatform) -> None:
+        cache = self.credentials_cache
+        if cache and await cache.is_valid(publisher):
+            logger.debug(f"Credentials of {publisher.name} were validated recently")
+            return
+        await publisher.async_validate_credentials()
+        if cache:
+            await cache.store(publisher)
+
+
+class StoredNotificationsCoordinator:
+    """
+    Sends stored notifications, each one through the notifier it's addressed to.
+    """
+
+    def __init__(self, notifications: List[Notification], rate_limiter=None):
+        self.notifications = notifications
+        self.rate_limiter = rate_limiter
+
+    async def run(self) -> Tuple[List[Notification], List[Notification]]:
+        """
+        Returns the notifications that were sent and the ones that failed.
+        """
+        notifiers = {}
+        sent, failed = [], []
+        for notification in self.notifications:
+            name = notification.target.name
             try:
-                platform.send(self.message)
+                if name not in notifiers:
+                    notifiers[name] = get_platform(get_notifier_class(name))
+                await send_message(
+                    notifiers[name],
+                    notification.message,
+                    rate_limiter=self.rate_limiter,
+                )
+                sent.append(notification)
             except Exception as e:
-                logger.critical(f"Notifier failed to send message:\n{self.message}")
+                logger.error(
+                    f"Notifier {name} failed to send notification {notification.id}"
+                )
                 logger.exception(e)
-
-
-class AbstractNotifiersCoordinator(AbstractCoordinator):
-    def __init__(self, message: str, notifiers: List[AbstractPlatform] = None):
-        platforms = notifiers or [
-            get_notifier_class(notifier)() for notifier in get_active_notifiers()
-        ]
-        super(AbstractNotifiersCoordinator, self).__init__(message, platforms)
-
-
-class PublicationFailureNotifiersCoordinator(AbstractNotifiersCoordinator):
-    def __init__(self, report: BasePublicationReport, platforms=None):
-        self.report = report
-        super(PublicationFailureNotifiersCoordinator, self).__init__(
-            message=report.get_failure_message(), notifiers=platforms
-        )
-
-    def notify_failure(self):
-        logger.info("Sending failure notifications")
-        if self.report.status == PublicationStatus.FAILED:
-            self.send_to_all()
+                failed.append(notification)
+        return sent, failed
 
 
 class RecapCoordinator:
-    def __init__(self, recap_publications: List[RecapPublication]):
+    """
+    Sends the recap of the events to every platform, split in as many messages as its limits require. Only the
+    first ``max_fragments`` events are recapped, all of them by default.
+    """
+
+    def __init__(
+        self,
+        recap_publications: List[RecapPublication],
+        rate_limiter=None,
+        max_fragments: Optional[int] = None,
+    ):
         self.recap_publications = recap_publications
+        self.rate_limiter = rate_limiter
+        self.max_fragments = max_fragments
 
-    def run(self) -> BaseCoordinatorReport:
+    async def run(self) -> BaseCoordinatorReport:
         reports = []
         for recap_publication in self.recap_publications:
             try:
-
-                fragments = [recap_publication.formatter.get_recap_header()]
-                for event in recap_publication.events:
-                    fragments.append(
-                        recap_publication.formatter.get_recap_fragment(event)
+                sent = 0
+                # every message is rendered right before it's sent
+                for message in recap_publication.formatter.get_recap_messages(
+                    recap_publication.events, self.max_fragments
+                ):
+                    await send_message(
+                        recap_publication.publisher,
+                        message,
+                        rate_limiter=self.rate_limiter,
+                    )
+                    sent += 1
+                if not sent and recap_publication.events:
+                    raise InvalidMessage("None of the events fits in a recap message")
+                if sent > 1:
+                    logger.info(
+                        f"Recap sent to {recap_publication.publisher.name} in {sent} messages"
                     )
-                message = "\n\n".join(fragments)
-                recap_publication.publisher.send(message)
                 reports.append(
                     BasePublicationReport(
                         status=PublicationStatus.COMPLETED, reason=None,
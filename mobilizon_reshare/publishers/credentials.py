@@ -0,0 +1,82 @@
+import hashlib
+import json
+import logging
+from typing import Optional
+
+import arrow
+
+from mobilizon_reshare.publishers.abstract import AbstractPlatform
+from mobilizon_reshare.publishers.exceptions import InvalidAttribute
+from mobilizon_reshare.publishers.loader import LazyLoader
+from mobilizon_reshare.storage.query.read import get_credential_validations
+from mobilizon_reshare.storage.query.write import (
+    delete_credential_validations,
+    save_credential_validation,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_credentials_fingerprint(platform: AbstractPlatform) -> Optional[str]:
+    """
+    Hashes the settings of the platform, credentials included. Returns None for platforms without settings.
+    """
+    try:
+        conf = platform.conf.to_dict()
+    except InvalidAttribute:
+        return None
+    return hashlib.sha256(
+        json.dumps([platform._conf, conf], sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def get_platform_key(platform: AbstractPlatform) -> str:
+    # publishers and notifiers of the same service have separate credentials
+    return ".".join(platform._conf) or platform.name
+
+
+class CredentialsCache:
+    """
+    Remembers for ``ttl`` seconds that the credentials of a platform were valid, so that they aren't validated
+    again on every run. Entries are kept in the database, keyed by platform and credentials fingerprint.
+    With ``revalidate`` the stored entries are ignored, but fresh validations are still stored.
+    """
+
+    def __init__(self, ttl: float, revalidate: bool = False):
+        self.ttl = ttl
+        self.revalidate = revalidate
+        self._valid: LazyLoader[set[tuple[str, str]]] = LazyLoader(self._load)
+
+    async def _load(self) -> set[tuple[str, str]]:
+        since = arrow.now().shift(seconds=-self.ttl)
+        return set(
+            (validation.platform, validation.fingerprint)
+            for validation in await get_credential_validations(since)
+        )
+
+    async def is_valid(self, platform: AbstractPlatform) -> bool:
+        if self.revalidate or self.ttl <= 0:
+            return False
+        fingerprint = get_credentials_fingerprint(platform)
+        return (
+            fingerprint is not None
+            and (get_platform_key(platform), fingerprint) in await self._valid.get()
+        )
+
+    async def store(self, platform: AbstractPlatform) -> None:
+        fingerprint = get_credentials_fingerprint(platform)
+        if self.ttl <= 0 or fingerprint is None:
+            return
+        key = get_platform_key(platform)
+        await save_credential_validation(key, fingerprint)
+        if self._valid.value is not None:
+            self._valid.value.add((key, fingerprint))
+
+    async def invalidate(self, platform: AbstractPlatform) -> None:
+        logger.info(f"Forgetting the validation of the credentials of {platform.name}")
+        key = get_platform_key(platform)
+        await delete_credential_validations(key)
+        if self._valid.value is not None:
+            self._valid.value.difference_update(
+                [entry for entry in self._valid.value if entry[0] == key]
+            )
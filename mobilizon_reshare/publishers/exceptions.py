@@ -38,3 +38,28 @@ class ZulipError(PublisherError):
 
 class HTTPResponseError(PublisherError):
     """ Publisher receives a HTTP error"""
+
+
+class RejectedCredentials(HTTPResponseError, InvalidCredentials):
+    """ Publisher's credentials are rejected by its service """
+
+
+class RateLimited(PublisherError):
+    """ Publisher is throttled by its service, or would have to wait too long not to be """
+
+    def __init__(self, message, hint=None):
+        super().__init__(message)
+        # the ``RateLimitHint`` given by the service, if any
+        self.hint = hint
+
+
+class PlatformUnavailable(PublisherError):
+    """ Publisher can't reach its service """
+
+
+class PlatformTimeout(PublisherError):
+    """ Publisher doesn't complete an operation within the configured timeout """
+
+
+class UnknownOutcome(PlatformTimeout):
+    """ Publisher times out while sending, so that the message might have been posted anyway """
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyLoader(Generic[T]):
+    """
+    Loads a state from the database the first time it's needed and keeps it for the following uses.
+    The whole state is loaded at once, so that the number of queries doesn't grow with the number of platforms.
+    """
+
+    def __init__(self, load: Callable[[], Awaitable[T]]):
+        self._load = load
+        self._value: Optional[T] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def value(self) -> Optional[T]:
+        """
+        The loaded state, None if it wasn't loaded yet.
+        """
+        return self._value
+
+    async def get(self) -> T:
+        async with self._lock:
+            if self._value is None:
+                self._value = await self._load()
+        return self._value
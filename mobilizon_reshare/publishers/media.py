@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import mimetypes
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from mobilizon_reshare.config.config import get_settings
+
+try:
+    from PIL import Image
+except ImportError:
+    # images are published as they are downloaded
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Media:
+    """
+    An image ready to be uploaded to the platforms.
+    """
+
+    path: Path
+    content_type: str
+
+    @property
+    def filename(self) -> str:
+        return self.path.name
+
+
+def _write_atomically(path: Path, content: bytes) -> None:
+    # runs sharing the cache never see a partially written file
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=".")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def resize_image(content: bytes, max_size: int) -> bytes:
+    """
+    Scales the image down to fit a ``max_size`` pixels square, keeping its format. Without Pillow the image is
+    returned as it is.
+    """
+    if Image is None:
+        return content
+    with Image.open(io.BytesIO(content)) as image:
+        if max(image.size) <= max_size:
+            return content
+        image_format = image.format
+        image.thumbnail((max_size, max_size))
+        output = io.BytesIO()
+        image.save(output, format=image_format)
+        return output.getvalue()
+
+
+class MediaCache:
+    """
+    Downloads and scales the images of the events, at most ``max_workers`` at the same time, and keeps them in
+    ``cache_dir``.
+
+    Images are stored once, named after the hash of the downloaded content. The url of every image is indexed
+    together with its ETag, so that the following runs only ask the server whether the image changed. Within a run
+    every url is fetched once, however many platforms use it.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size: int,
+        max_bytes: int,
+        max_workers: int,
+        timeout: float,
+    ):
+        self.objects_dir = Path(cache_dir) / "objects"
+        self.urls_dir = Path(cache_dir) / "urls"
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="media"
+        )
+        self._session = requests.Session()
+        self._fetched: Dict[str, asyncio.Future] = {}
+
+    async def get(self, url: str) -> Optional[Media]:
+        """
+        Returns the image at ``url``, or None if it can't be fetched.
+        """
+        if url not in self._fetched:
+            self._fetched[url] = asyncio.wrap_future(
+                self._executor.submit(self._fetch, url)
+            )
+        # a platform timing out doesn't cancel the download the others are waiting for
+        return await asyncio.shield(self._fetched[url])
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    def _get_index_path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.urls_dir / f"{digest}.json"
+
+    def _get_media(self, entry: dict) -> Media:
+        return Media(self.objects_dir / entry["object"], entry["content_type"])
+
+    def _read_index(self, url: str) -> Optional[dict]:
+        try:
+            entry = json.loads(self._get_index_path(url).read_text())
+        except (OSError, ValueError):
+            return None
+        if not (self.objects_dir / entry["object"]).exists():
+            return None
+        return entry
+
+    def _fetch(self, url: str) -> Optional[Media]:
+        try:
+            return self._download(url)
+        except Exception as e:
+            # the event is published without its image
+            logger.warning(f"Can't fetch the image {url}: {e}")
+            return None
+
+    def _download(self, url: str) -> Media:
+        entry = self._read_index(url)
+        headers = {}
+        if entry:
+            if not (entry.get("etag") or entry.get("last_modified")):
+                # the server can't tell whether the image changed
+                return self._get_media(entry)
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self._session.get(
+            url, headers=headers, timeout=self.timeout, stream=True
+        ) as response:
+            if entry and response.status_code == 304:
+                logger.debug(f"Image {url} didn't change")
+                return self._get_media(entry)
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "").split(";")[0]
+            if not content_type.startswith("image/"):
+                raise ValueError(
+                    f"{content_type or 'unknown content type'} isn't an image"
+                )
+            content = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                content += chunk
+                if len(content) > self.max_bytes:
+                    raise ValueError(f"the image is bigger than {self.max_bytes} bytes")
+            content = bytes(content)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        digest = hashlib.sha256(content).hexdigest()
+        name = f"{digest}{mimetypes.guess_extension(content_type) or ''}"
+        path = self.objects_dir / name
+        # the same image at a different url is already there
+        if not path.exists():
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomically(path, resize_image(content, self.max_size))
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "object": name,
+            "content_type": content_type,
+        }
+        self.urls_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomically(self._get_index_path(url), json.dumps(entry).encode("utf-8"))
+        return self._get_media(entry)
+
+
+def get_media_cache() -> Optional[MediaCache]:
+    """
+    Returns None if the images of the events aren't published.
+    """
+    settings = get_settings()["media"]
+    if not settings["active"]:
+        return None
+    return MediaCache(
+        cache_dir=settings["cache_dir"],
+        max_size=settings["max_size"],
+        max_bytes=settings["max_bytes"],
+        max_workers=settings["max_workers"],
+        timeout=settings["timeout"],
+    )
@@ -11,7 +11,14 @@ from mobilizon_reshare.publishers.abstract import (
 from mobilizon_reshare.publishers.exceptions import (
     InvalidCredentials,
     InvalidEvent,
+    RateLimited,
 )
+from mobilizon_reshare.publishers.media import Media
+from mobilizon_reshare.publishers.rate_limit import DEFAULT_RETRY_AFTER, RateLimitHint
+
+# https://developers.facebook.com/docs/graph-api/guides/error-handling
+ACCESS_TOKEN_ERROR_CODE = 190
+RATE_LIMIT_ERROR_CODES = (4, 17, 32, 613)
 
 
 class FacebookFormatter(AbstractEventFormatter):
@@ -44,19 +51,57 @@ class FacebookPlatform(AbstractPlatform):
     """
 
     name = "facebook"
+    _account_fields = ("page_access_token",)
+    supports_media = True
+
+    _api: Optional[facebook.GraphAPI] = None
 
-    def _get_api(self):
-        return facebook.GraphAPI(
-            access_token=self.conf["page_access_token"], version="8.0"
-        )
-
-    def _send(self, message: str, event: Optional[MobilizonEvent] = None):
-        self._get_api().put_object(
-            parent_object="me",
-            connection_name="feed",
-            message=message,
-            link=event.mobilizon_link if event else None,
-        )
+    def _get_api(self) -> facebook.GraphAPI:
+        if self._api is None:
+            self._api = facebook.GraphAPI(
+                access_token=self.conf["page_access_token"],
+                version="8.0",
+                session=self.session,
+            )
+        return self._api
+
+    def close(self) -> None:
+        self._api = None
+        super().close()
+
+    def _send(
+        self,
+        message: str,
+        event: Optional[MobilizonEvent] = None,
+        media: Optional[Media] = None,
+    ):
+        try:
+            if media:
+                # photos can't have a link attached, it's added to the message
+                if event:
+                    message = f"{message}\n\n{event.mobilizon_link}"
+                with open(media.path, "rb") as image:
+                    return self._get_api().put_photo(image=image, message=message)
+            return self._get_api().put_object(
+                parent_object="me",
+                connection_name="feed",
+                message=message,
+                link=event.mobilizon_link if event else None,
+            )
+        except facebook.GraphAPIError as e:
+            if e.code in RATE_LIMIT_ERROR_CODES:
+                # the Graph API doesn't tell when the limit is reset
+                raise RateLimited(
+                    f"Rate limited by {self.name}: {e}",
+                    RateLimitHint(retry_after=DEFAULT_RETRY_AFTER),
+                )
+            if e.code != ACCESS_TOKEN_ERROR_CODE:
+                raise
+            self._log_error(str(e), raise_error=InvalidCredentials)
+
+    def _get_remote_id(self, response: dict) -> Optional[str]:
+        # photos are published in a post of their own
+        return response.get("post_id") or response["id"]
 
     def validate_credentials(self):
 
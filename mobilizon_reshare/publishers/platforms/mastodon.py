@@ -9,14 +9,17 @@ from mobilizon_reshare.event.event import MobilizonEvent
 from mobilizon_reshare.publishers.abstract import (
     AbstractPlatform,
     AbstractEventFormatter,
+    AUTH_ERROR_STATUS_CODES,
 )
 from mobilizon_reshare.publishers.exceptions import (
     InvalidBot,
+    RejectedCredentials,
     InvalidEvent,
     InvalidResponse,
     HTTPResponseError,
     InvalidMessage,
 )
+from mobilizon_reshare.publishers.media import Media
 
 
 class MastodonFormatter(AbstractEventFormatter):
@@ -52,19 +55,48 @@ class MastodonPlatform(AbstractPlatform):
     _conf = ("publisher", "mastodon")
     api_uri = "api/v1/"
     name = "mastodon"
-
-    def _send(self, message: str, event: Optional[MobilizonEvent] = None) -> Response:
+    _account_fields = ("instance", "token")
+    # https://docs.joinmastodon.org/methods/statuses/#create
+    idempotent = True
+    supports_media = True
+
+    def _send(
+        self,
+        message: str,
+        event: Optional[MobilizonEvent] = None,
+        idempotency_key: Optional[str] = None,
+        media: Optional[Media] = None,
+    ) -> Response:
         """
         Send messages
         """
-        return requests.post(
+        headers = {"Authorization": f"Bearer {self.conf.token}"}
+        data = {"status": message, "visibility": "public"}
+        if media:
+            data["media_ids[]"] = [self._upload_media(media)]
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        return self.session.post(
             url=urljoin(self.conf.instance, self.api_uri) + "statuses",
-            headers={"Authorization": f"Bearer {self.conf.token}"},
-            data={"status": message, "visibility": "public"},
+            headers=headers,
+            data=data,
         )
 
+    def _upload_media(self, media: Media) -> str:
+        # https://docs.joinmastodon.org/methods/media/#v1
+        with open(media.path, "rb") as file:
+            res = self.session.post(
+                url=urljoin(self.conf.instance, self.api_uri) + "media",
+                headers={"Authorization": f"Bearer {self.conf.token}"},
+                files={"file": (media.filename, file, media.content_type)},
+            )
+        return self._validate_response(res)["id"]
+
+    def _get_remote_id(self, response: Response) -> Optional[str]:
+        return response.json()["id"]
+
     def validate_credentials(self):
-        res = requests.get(
+        res = self.session.get(
             headers={"Authorization": f"Bearer {self.conf.token}"},
             url=urljoin(self.conf.instance, self.api_uri) + "apps/verify_credentials",
         )
@@ -84,7 +116,10 @@ class MastodonPlatform(AbstractPlatform):
         except requests.exceptions.HTTPError as e:
             self._log_debug(str(res))
             self._log_error(
-                str(e), raise_error=HTTPResponseError,
+                str(e),
+                raise_error=RejectedCredentials
+                if res.status_code in AUTH_ERROR_STATUS_CODES
+                else HTTPResponseError,
             )
 
         try:
@@ -1,3 +1,4 @@
+import dataclasses
 import re
 from typing import Optional
 
@@ -6,17 +7,45 @@ import requests
 from requests import Response
 
 from mobilizon_reshare.event.event import MobilizonEvent
-from mobilizon_reshare.formatting.description import html_to_markdown
+from mobilizon_reshare.formatting.converter import Dialect
 from mobilizon_reshare.publishers.abstract import (
     AbstractEventFormatter,
     AbstractPlatform,
+    AUTH_ERROR_STATUS_CODES,
 )
 from mobilizon_reshare.publishers.exceptions import (
     InvalidBot,
+    RejectedCredentials,
     InvalidEvent,
     InvalidResponse,
     InvalidMessage,
 )
+from mobilizon_reshare.publishers.media import Media
+from mobilizon_reshare.publishers.rate_limit import RateLimitHint
+
+
+# Marks the escapes of the markup converted from HTML, that are kept when the message is escaped. Any other
+# backslash is escaped like the rest of the reserved characters.
+ESCAPE_MARK = "\x00"
+CONVERTED_ESCAPE = re.compile(r"\\([\x01-\x7e])")
+
+# https://core.telegram.org/bots/api#markdownv2-style
+# Every token starts with a reserved character, the text between tokens is copied as it is.
+MARKDOWN_V2_TOKEN = re.compile(
+    r"(?=[_*\[\]()~`>#+\-=|{}.!\\\x00])(?:"
+    r"\x00(?P<escaped>[\x01-\x7e])"
+    r"|\[(?P<text>(?:\x00.|[^\[\]\x00\n])+)]\((?P<url>(?:[^()\s\\]|\([^()\s\\]*\))+)\)"
+    r"|\*(?P<bold>\*?)(?=[^\s*])(?P<bold_text>[^\n]*?[^\s*\x00])\*(?P=bold)"
+    r"|_(?<!\w_)(?=[^\s_])(?P<italic_text>[^\n]*?[^\s_\x00])_(?!\w)"
+    # Telegram doesn't use headers so # can be removed
+    r"|#"
+    r"|(?P<reserved>.))"
+)
+# inside the url of a link only these have to be escaped
+URL_ESCAPES = str.maketrans({")": "\\)", "\\": "\\\\"})
+
+# https://core.telegram.org/bots/api#sendphoto
+MAX_CAPTION_LENGTH = 1024
 
 
 class TelegramFormatter(AbstractEventFormatter):
@@ -33,37 +62,43 @@ class TelegramFormatter(AbstractEventFormatter):
     )
 
     _conf = ("publisher", "telegram")
-    _escape_characters = [
-        "-",
-        ".",
-        "(",
-        "!",
-        ")",
-    ]
+    dialect = Dialect.TELEGRAM
 
     @staticmethod
-    def restore_links(message: str) -> str:
-        """The escape_message function should ignore actually valid links that involve square brackets and parenthesis.
-        This function de-escapes actual links without altering other escaped square brackets and parenthesis"""
-
-        def build_link(match):
-            result = match.group(0)
-            for character in TelegramFormatter._escape_characters:
-                result = result.replace("\\" + character, character)
-            return result
-
-        return re.sub(r"\[(\w*)]\\\(([\w\-/\\.:]*)\\\)", build_link, message,)
+    def _escape_token(match: re.Match) -> str:
+        token = match.lastgroup
+        if token == "reserved":
+            return "\\" + match.group("reserved")
+        if token is None:
+            return ""
+        if token == "escaped":
+            return "\\" + match.group("escaped")
+        if token == "url":
+            text = TelegramFormatter.escape_message(match.group("text"))
+            return f"[{text}]({match.group('url').translate(URL_ESCAPES)})"
+        if token == "bold_text":
+            return f"*{TelegramFormatter.escape_message(match.group('bold_text'))}*"
+        return f"_{TelegramFormatter.escape_message(match.group('italic_text'))}_"
 
     @staticmethod
     def escape_message(message: str) -> str:
-        """Escape message to comply with Telegram standards"""
-        for character in TelegramFormatter._escape_characters:
-            message = message.replace(character, "\\" + character)
-
-        # Telegram doesn't use headers so # can be removed
-        message = message.replace("#", r"")
+        """Escape message to comply with Telegram standards.
+        Links, bold and italic text are kept, while every other reserved character is escaped, backslashes
+        included. Only the escapes marked by ``mark_escapes`` are kept as they are."""
+        return MARKDOWN_V2_TOKEN.sub(TelegramFormatter._escape_token, message)
 
-        return TelegramFormatter.restore_links(message)
+    @staticmethod
+    def mark_escapes(text: Optional[str]) -> Optional[str]:
+        """Marks the escapes of text converted by ``TelegramRenderer``, so that ``escape_message`` keeps them."""
+        return CONVERTED_ESCAPE.sub(ESCAPE_MARK + r"\1", text) if text else text
+
+    def _preprocess_event(self, event: MobilizonEvent) -> MobilizonEvent:
+        event = super()._preprocess_event(event)
+        return dataclasses.replace(
+            event,
+            description=self.mark_escapes(event.description),
+            name=self.mark_escapes(event.name),
+        )
 
     def _validate_event(self, event: MobilizonEvent) -> None:
         description = event.description
@@ -74,11 +109,6 @@ class TelegramFormatter(AbstractEventFormatter):
         if len(message) >= 4096:
             self._log_error("Message is too long", raise_error=InvalidMessage)
 
-    def _preprocess_event(self, event: MobilizonEvent):
-        event.description = html_to_markdown(event.description)
-        event.name = html_to_markdown(event.name)
-        return event
-
 
 class TelegramPlatform(AbstractPlatform):
     """
@@ -86,12 +116,14 @@ class TelegramPlatform(AbstractPlatform):
     """
 
     name = "telegram"
+    _account_fields = ("token",)
+    supports_media = True
 
     def _preprocess_message(self, message: str):
         return TelegramFormatter.escape_message(message)
 
     def validate_credentials(self):
-        res = requests.get(f"https://api.telegram.org/bot{self.conf.token}/getMe")
+        res = self.session.get(f"https://api.telegram.org/bot{self.conf.token}/getMe")
         data = self._validate_response(res)
 
         if not self.conf.username == data.get("result", {}).get("username"):
@@ -99,8 +131,26 @@ class TelegramPlatform(AbstractPlatform):
                 "Found a different bot than the expected one", raise_error=InvalidBot,
             )
 
-    def _send(self, message: str, event: Optional[MobilizonEvent] = None) -> Response:
-        return requests.post(
+    def _send(
+        self,
+        message: str,
+        event: Optional[MobilizonEvent] = None,
+        media: Optional[Media] = None,
+    ) -> Response:
+        if media and len(message) <= MAX_CAPTION_LENGTH:
+            with open(media.path, "rb") as photo:
+                return self.session.post(
+                    url=f"https://api.telegram.org/bot{self.conf.token}/sendPhoto",
+                    data={
+                        "chat_id": self.conf.chat_id,
+                        "caption": message,
+                        "parse_mode": "markdownv2",
+                    },
+                    files={"photo": (media.filename, photo, media.content_type)},
+                )
+        if media:
+            self._log_debug("Message too long for a caption, sending it without image")
+        return self.session.post(
             url=f"https://api.telegram.org/bot{self.conf.token}/sendMessage",
             json={
                 "chat_id": self.conf.chat_id,
@@ -109,13 +159,30 @@ class TelegramPlatform(AbstractPlatform):
             },
         )
 
+    def _get_remote_id(self, response: Response) -> Optional[str]:
+        return str(response.json()["result"]["message_id"])
+
+    def _get_rate_limit_hint(self, response: Response) -> Optional[RateLimitHint]:
+        hint = super()._get_rate_limit_hint(response)
+        if response.status_code != 429:
+            return hint
+        # https://core.telegram.org/bots/api#responseparameters
+        try:
+            retry_after = response.json()["parameters"]["retry_after"]
+        except (ValueError, KeyError, TypeError):
+            return hint
+        return RateLimitHint(retry_after=retry_after)
+
     def _validate_response(self, res):
         try:
 
             res.raise_for_status()
         except requests.exceptions.HTTPError as e:
             self._log_error(
-                f"Server returned invalid data: {str(e)}", raise_error=InvalidResponse,
+                f"Server returned invalid data: {str(e)}",
+                raise_error=RejectedCredentials
+                if res.status_code in AUTH_ERROR_STATUS_CODES
+                else InvalidResponse,
             )
 
         try:
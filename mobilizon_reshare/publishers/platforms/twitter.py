@@ -1,7 +1,7 @@
 from typing import Optional
 
 import pkg_resources
-from tweepy import OAuthHandler, API, TweepyException
+from tweepy import OAuthHandler, API, TooManyRequests, TweepyException, Unauthorized
 from tweepy.models import Status
 
 from mobilizon_reshare.event.event import MobilizonEvent
@@ -13,8 +13,10 @@ from mobilizon_reshare.publishers.exceptions import (
     InvalidCredentials,
     InvalidEvent,
     PublisherError,
+    RateLimited,
     InvalidMessage,
 )
+from mobilizon_reshare.publishers.rate_limit import parse_rate_limit_headers
 
 
 class TwitterFormatter(AbstractEventFormatter):
@@ -51,23 +53,37 @@ class TwitterPlatform(AbstractPlatform):
 
     _conf = ("publisher", "twitter")
     name = "twitter"
+    _account_fields = ("api_key", "access_token")
 
-    def _get_api(self):
+    _api: Optional[API] = None
 
-        api_key = self.conf.api_key
-        api_key_secret = self.conf.api_key_secret
-        access_token = self.conf.access_token
-        access_secret = self.conf.access_secret
-        auth = OAuthHandler(api_key, api_key_secret)
-        auth.set_access_token(access_token, access_secret)
-        return API(auth)
+    def _get_api(self) -> API:
+        if self._api is None:
+            auth = OAuthHandler(self.conf.api_key, self.conf.api_key_secret)
+            auth.set_access_token(self.conf.access_token, self.conf.access_secret)
+            self._api = API(auth)
+        return self._api
+
+    def close(self) -> None:
+        if self._api is not None:
+            self._api.session.close()
+            self._api = None
+        super().close()
 
     def _send(self, message: str, event: Optional[MobilizonEvent] = None) -> Status:
         try:
             return self._get_api().update_status(message)
+        except Unauthorized as e:
+            self._log_error(e.args[0], raise_error=InvalidCredentials)
+        except TooManyRequests as e:
+            hint = parse_rate_limit_headers(e.response.status_code, e.response.headers)
+            raise RateLimited(f"Rate limited by {self.name}: {e}", hint)
         except TweepyException as e:
             self._log_error(e.args[0], raise_error=PublisherError)
 
+    def _get_remote_id(self, response: Status) -> Optional[str]:
+        return response.id_str
+
     def validate_credentials(self):
         if not self._get_api().verify_credentials():
             self._log_error(
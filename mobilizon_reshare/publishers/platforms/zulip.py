@@ -7,13 +7,15 @@ from requests import Response
 from requests.auth import HTTPBasicAuth
 
 from mobilizon_reshare.event.event import MobilizonEvent
-from mobilizon_reshare.formatting.description import html_to_markdown
+from mobilizon_reshare.formatting.converter import Dialect
 from mobilizon_reshare.publishers.abstract import (
     AbstractPlatform,
     AbstractEventFormatter,
+    AUTH_ERROR_STATUS_CODES,
 )
 from mobilizon_reshare.publishers.exceptions import (
     InvalidBot,
+    RejectedCredentials,
     InvalidEvent,
     InvalidResponse,
     ZulipError,
@@ -25,6 +27,7 @@ from mobilizon_reshare.publishers.exceptions import (
 class ZulipFormatter(AbstractEventFormatter):
 
     _conf = ("publisher", "zulip")
+    dialect = Dialect.ZULIP
     default_template_path = pkg_resources.resource_filename(
         "mobilizon_reshare.publishers.templates", "zulip.tmpl.j2"
     )
@@ -46,11 +49,6 @@ class ZulipFormatter(AbstractEventFormatter):
         if len(message.encode("utf-8")) >= 10000:
             self._log_error("Message is too long", raise_error=InvalidMessage)
 
-    def _preprocess_event(self, event: MobilizonEvent):
-        event.description = html_to_markdown(event.description)
-        event.name = html_to_markdown(event.name)
-        return event
-
 
 class ZulipPlatform(AbstractPlatform):
     """
@@ -60,6 +58,7 @@ class ZulipPlatform(AbstractPlatform):
     _conf = ("publisher", "zulip")
     api_uri = "api/v1/"
     name = "zulip"
+    _account_fields = ("instance", "bot_email")
 
     def _send_private(
         self, message: str, event: Optional[MobilizonEvent] = None
@@ -67,7 +66,7 @@ class ZulipPlatform(AbstractPlatform):
         """
         Send private messages
         """
-        return requests.post(
+        return self.session.post(
             url=urljoin(self.conf.instance, self.api_uri) + "messages",
             auth=HTTPBasicAuth(self.conf.bot_email, self.conf.bot_token),
             data={"type": "private", "to": f"[{self.user_id}]", "content": message},
@@ -77,7 +76,7 @@ class ZulipPlatform(AbstractPlatform):
         """
         Send stream messages
         """
-        return requests.post(
+        return self.session.post(
             url=urljoin(self.conf.instance, self.api_uri) + "messages",
             auth=HTTPBasicAuth(self.conf.bot_email, self.conf.bot_token),
             data={
@@ -88,10 +87,13 @@ class ZulipPlatform(AbstractPlatform):
             },
         )
 
+    def _get_remote_id(self, response: Response) -> Optional[str]:
+        return str(response.json()["id"])
+
     def validate_credentials(self):
         conf = self.conf
 
-        res = requests.get(
+        res = self.session.get(
             auth=HTTPBasicAuth(self.conf.bot_email, self.conf.bot_token),
             url=urljoin(self.conf.instance, self.api_uri) + "users/me",
         )
@@ -116,7 +118,10 @@ class ZulipPlatform(AbstractPlatform):
         except requests.exceptions.HTTPError as e:
             self._log_debug(str(res))
             self._log_error(
-                str(e), raise_error=HTTPResponseError,
+                str(e),
+                raise_error=RejectedCredentials
+                if res.status_code in AUTH_ERROR_STATUS_CODES
+                else HTTPResponseError,
             )
 
         # See https://zulip.com/api/rest-error-handling
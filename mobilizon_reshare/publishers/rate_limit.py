@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Mapping, Optional
+
+import arrow
+
+from mobilizon_reshare.config.config import get_settings
+from mobilizon_reshare.event.event import MobilizonEvent
+from mobilizon_reshare.publishers.exceptions import InvalidAttribute, RateLimited
+from mobilizon_reshare.publishers.loader import LazyLoader
+from mobilizon_reshare.publishers.media import Media
+
+if TYPE_CHECKING:
+    # abstract imports this module for the rate limit hints of the responses
+    from mobilizon_reshare.publishers.abstract import AbstractPlatform, SendResult
+
+logger = logging.getLogger(__name__)
+
+# seconds to wait after being throttled by a platform that doesn't tell for how long
+DEFAULT_RETRY_AFTER = 60
+
+
+@dataclass
+class RateLimitHint:
+    """
+    What a platform told about its rate limit in a response.
+    """
+
+    # seconds to wait before the next request, when the request was throttled
+    retry_after: Optional[float] = None
+    # requests left in the current window, and seconds before the window is reset
+    remaining: Optional[int] = None
+    reset_after: Optional[float] = None
+
+
+def _parse_seconds_or_date(value: str, now: float) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: str, now: float) -> Optional[float]:
+    # an epoch timestamp (Zulip, Twitter) or an ISO 8601 date (Mastodon)
+    try:
+        timestamp = float(value)
+    except ValueError:
+        try:
+            timestamp = arrow.get(value).timestamp()
+        except ValueError:
+            return None
+    return max(0.0, timestamp - now)
+
+
+def _get_header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        if name in headers:
+            return headers[name]
+    return None
+
+
+def parse_rate_limit_headers(
+    status_code: int, headers: Mapping[str, str], now: Optional[float] = None
+) -> Optional[RateLimitHint]:
+    """
+    Reads the standard ``Retry-After`` header and the ``X-RateLimit-*`` family of headers. ``headers`` has to be
+    case insensitive, as the headers of a ``requests`` response. Returns None if the response tells nothing.
+    """
+    now = time.time() if now is None else now
+    hint = RateLimitHint()
+
+    remaining = _get_header(headers, "X-RateLimit-Remaining", "X-Rate-Limit-Remaining")
+    if remaining is not None and remaining.isdigit():
+        hint.remaining = int(remaining)
+    reset = _get_header(headers, "X-RateLimit-Reset", "X-Rate-Limit-Reset")
+    if reset is not None:
+        hint.reset_after = _parse_reset(reset, now)
+
+    if status_code == 429:
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            hint.retry_after = _parse_seconds_or_date(retry_after, now)
+        if hint.retry_after is None:
+            hint.retry_after = (
+                hint.reset_after
+                if hint.reset_after is not None
+                else DEFAULT_RETRY_AFTER
+            )
+
+    if hint == RateLimitHint():
+        return None
+    return hint
+
+
+@dataclass
+class TokenBucket:
+    """
+    Allows ``capacity`` requests every ``period`` seconds, in bursts of at most ``capacity`` requests. A bucket
+    without capacity doesn't limit requests by itself, but still honours the waits asked by the platform.
+    """
+
+    capacity: Optional[int]
+    period: Optional[float]
+    tokens: float = math.inf
+    # epoch seconds
+    updated_at: float = 0.0
+    blocked_until: float = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.capacity is None:
+            self.tokens = math.inf
+        else:
+            elapsed = max(0.0, now - self.updated_at)
+            self.tokens = min(
+                self.capacity, self.tokens + elapsed * self.capacity / self.period
+            )
+        self.updated_at = now
+
+    def get_wait(self, now: float) -> float:
+        """
+        Returns the seconds to wait before the next request can be made.
+        """
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) * self.period / self.capacity)
+        return wait
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def apply(self, hint: RateLimitHint, now: float) -> None:
+        """
+        Adjusts the bucket to what the platform told about its limit.
+        """
+        self._refill(now)
+        if hint.retry_after is not None:
+            self.blocked_until = max(self.blocked_until, now + hint.retry_after)
+            self.tokens = min(self.tokens, 0)
+        elif hint.remaining is not None:
+            self.tokens = min(self.tokens, hint.remaining)
+            if hint.remaining == 0 and hint.reset_after is not None:
+                self.blocked_until = max(self.blocked_until, now + hint.reset_after)
+
+
+def get_rate_limit_key(platform: "AbstractPlatform") -> Optional[str]:
+    """
+    Identifies the account the platform acts as, i.e. a publisher and a notifier using the same bot share their
+    rate limit. Returns None for platforms without settings.
+    """
+    if not platform._account_fields:
+        return None
+    try:
+        conf = platform.conf
+    except InvalidAttribute:
+        return None
+    account = json.dumps([conf.get(field) for field in platform._account_fields])
+    return f"{platform.name}:{hashlib.sha256(account.encode('utf-8')).hexdigest()[:16]}"
+
+
+class RateLimiter:
+    """
+    Keeps the requests to each platform account within the limits configured in ``limits``, a mapping from the
+    name of a platform to its ``requests`` and ``period``, and within the ones told by the platform itself.
+    A request that would have to wait more than ``max_wait`` seconds fails with ``RateLimited``.
+    The state of the limits is kept in the database, so that it's respected by the following runs.
+    """
+
+    def __init__(self, limits: dict, max_wait: float):
+        self.limits = limits
+        self.max_wait = max_wait
+        self._buckets: LazyLoader[dict[str, TokenBucket]] = LazyLoader(self._load)
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _build_bucket(self, platform_name: str) -> TokenBucket:
+        limit = self.limits.get(platform_name)
+        if not limit:
+            return TokenBucket(capacity=None, period=None)
+        return TokenBucket(capacity=limit["requests"], period=limit["period"])
+
+    async def _load(self) -> dict[str, TokenBucket]:
+        # imported here to avoid circular dependencies
+        from mobilizon_reshare.storage.query.read import get_rate_limit_states
+
+        buckets = {}
+        for state in await get_rate_limit_states():
+            platform = state.key.split(":")[0]
+            bucket = self._build_bucket(platform)
+            if state.tokens is not None and bucket.capacity is not None:
+                bucket.tokens = state.tokens
+            bucket.updated_at = state.updated_at.timestamp()
+            if state.blocked_until:
+                bucket.blocked_until = state.blocked_until.timestamp()
+            buckets[state.key] = bucket
+        return buckets
+
+    async def _get_bucket(self, key: str, platform_name: str) -> TokenBucket:
+        buckets = await self._buckets.get()
+        if key not in buckets:
+            buckets[key] = self._build_bucket(platform_name)
+        return buckets[key]
+
+    async def _save(self, key: str, bucket: TokenBucket) -> None:
+        # imported here to avoid circular dependencies
+        from mobilizon_reshare.storage.query.write import save_rate_limit_state
+
+        await save_rate_limit_state(
+            key,
+            None if math.isinf(bucket.tokens) else bucket.tokens,
+            arrow.get(bucket.updated_at).datetime,
+            arrow.get(bucket.blocked_until).datetime if bucket.blocked_until else None,
+        )
+
+    async def send(
+        self,
+        platform: "AbstractPlatform",
+        message: str,
+        event: Optional[MobilizonEvent] = None,
+        idempotency_key: Optional[str] = None,
+        media: Optional[Media] = None,
+    ) -> "SendResult":
+        """
+        Sends the message through the platform once its rate limit allows it.
+        """
+        key = get_rate_limit_key(platform)
+        if key is None:
+            return await platform.async_send(message, event, idempotency_key, media)
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            bucket = await self._get_bucket(key, platform.name)
+            wait = bucket.get_wait(time.time())
+            if wait > self.max_wait:
+                raise RateLimited(
+                    f"Rate limited by {platform.name}, retry in {wait:.0f} seconds"
+                )
+            if wait:
+                logger.info(f"Waiting {wait:.1f} seconds for {platform.name}")
+                await asyncio.sleep(wait)
+            bucket.take(time.time())
+
+        hint = None
+        try:
+            result = await platform.async_send(message, event, idempotency_key, media)
+            hint = result.rate_limit
+            return result
+        except RateLimited as e:
+            hint = e.hint
+            raise
+        finally:
+            if hint:
+                bucket.apply(hint, time.time())
+            await self._save(key, bucket)
+
+
+def get_rate_limiter() -> RateLimiter:
+    settings = get_settings()["rate_limit"]
+    return RateLimiter(
+        limits={
+            name: limit
+            for name, limit in settings.items()
+            if isinstance(limit, dict) and limit
+        },
+        max_wait=settings["max_wait"],
+    )
@@ -0,0 +1,40 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, Type
+
+from mobilizon_reshare.publishers.abstract import AbstractPlatform
+from mobilizon_reshare.publishers.concurrency import shutdown_executor
+
+_platforms: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "_platforms", default=None
+)
+
+
+def get_platform(platform_class: Type[AbstractPlatform]) -> AbstractPlatform:
+    """
+    Returns the instance of ``platform_class`` shared by the current run, so that validating, publishing and
+    notifying reuse its connections. Outside a run, a new instance is returned every time.
+    """
+    platforms = _platforms.get()
+    if platforms is None:
+        return platform_class()
+    if platform_class not in platforms:
+        platforms[platform_class] = platform_class().open()
+    return platforms[platform_class]
+
+
+@contextmanager
+def platforms_run():
+    """
+    Scopes the platform instances returned by ``get_platform``: they are closed when the context is exited,
+    together with the pool their calls are run in.
+    """
+    token = _platforms.set({})
+    try:
+        yield
+    finally:
+        platforms = _platforms.get()
+        _platforms.reset(token)
+        shutdown_executor()
+        for platform in platforms.values():
+            platform.close()
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from arrow import Arrow
+
+from mobilizon_reshare.config.config import get_settings
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int
+    # seconds before the first retry, doubled at every following one
+    backoff: float
+
+    def next_attempt(self, attempts: int, now: Arrow) -> Optional[datetime]:
+        """
+        Returns when a publication that failed ``attempts`` times should be retried, None if it shouldn't.
+        """
+        if attempts >= self.max_attempts:
+            return None
+        return now.to("utc").shift(seconds=self.backoff * 2 ** (attempts - 1)).datetime
+
+
+def get_retry_policy() -> RetryPolicy:
+    settings = get_settings()["publishing"]["retry"]
+    return RetryPolicy(
+        max_attempts=settings["max_attempts"], backoff=settings["backoff"]
+    )
@@ -0,0 +1,66 @@
+import logging
+from pathlib import Path
+from typing import Iterable, Optional
+
+from jinja2 import (
+    BytecodeCache,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    TemplateError,
+)
+
+from mobilizon_reshare.config.config import get_settings
+from mobilizon_reshare.publishers.exceptions import InvalidSettings
+
+logger = logging.getLogger(__name__)
+
+_env: Optional[Environment] = None
+
+
+def build_bytecode_cache(cache_dir: Optional[str]) -> Optional[BytecodeCache]:
+    if not cache_dir:
+        return None
+    try:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Compiled templates won't be cached: {e}")
+        return None
+    return FileSystemBytecodeCache(cache_dir)
+
+
+def build_template_env(cache_dir: Optional[str], auto_reload: bool) -> Environment:
+    """
+    Templates are loaded by their absolute path. Compiled templates are kept in memory for the whole run and
+    stored in ``cache_dir``, so that following runs don't compile them again unless they change. Without
+    ``auto_reload`` a loaded template isn't checked for changes anymore.
+    """
+    return Environment(
+        loader=FileSystemLoader("/"),
+        auto_reload=auto_reload,
+        bytecode_cache=build_bytecode_cache(cache_dir),
+    )
+
+
+def get_template_env() -> Environment:
+    global _env
+    if _env is None:
+        settings = get_settings()["templates"]
+        _env = build_template_env(settings["cache_dir"], settings["auto_reload"])
+    return _env
+
+
+def get_template(path: str) -> Template:
+    return get_template_env().get_template(path)
+
+
+def precompile_templates(paths: Iterable[str]) -> None:
+    """
+    Compiles the templates up front, so that a broken template is found at startup instead of while publishing.
+    """
+    for path in paths:
+        try:
+            get_template(path)
+        except TemplateError as e:
+            raise InvalidSettings(f"Template {path} can't be loaded: {e!r}") from e
@@ -1,43 +1,283 @@
+import hashlib
+import importlib
+import inspect
 import logging
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional, Type
 
 from tortoise import Tortoise
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.backends.base.config_generator import expand_db_url
+from tortoise.exceptions import OperationalError
+from tortoise.fields import Field
+from tortoise.models import Model
+from tortoise.transactions import get_connection as get_tortoise_connection
+from tortoise.transactions import in_transaction
+from tortoise.utils import generate_schema_for_client
 
 from mobilizon_reshare.config.publishers import publisher_names
+from mobilizon_reshare.models.metadata import Metadata
+from mobilizon_reshare.storage.instrumentation import instrument
+from mobilizon_reshare.storage.query import CONNECTION_NAME
 from mobilizon_reshare.storage.query.write import update_publishers
 
 logger = logging.getLogger(__name__)
 
+MODELS = [
+    "mobilizon_reshare.models.circuit_breaker",
+    "mobilizon_reshare.models.credential_validation",
+    "mobilizon_reshare.models.event",
+    "mobilizon_reshare.models.metadata",
+    "mobilizon_reshare.models.notification",
+    "mobilizon_reshare.models.publication",
+    "mobilizon_reshare.models.publisher",
+    "mobilizon_reshare.models.rate_limit",
+]
+
+# Maps the keys of the ``db_pool`` settings section to the names understood by Tortoise's asyncpg client
+POOL_OPTIONS = {
+    "min_size": "minsize",
+    "max_size": "maxsize",
+    "statement_cache_size": "statement_cache_size",
+    "max_inactive_connection_lifetime": "max_inactive_connection_lifetime",
+}
+
+FINGERPRINT_KEY = "fingerprint"
+
+
+def get_db_url(settings) -> str:
+    """
+    Returns the url of the database. ``db_url`` takes precedence over ``db_path``, that is kept for
+    backward compatibility with SQLite-only configurations.
+    """
+    return settings.get("db_url") or f"sqlite:///{settings.db_path}"
+
+
+def build_connection_config(
+    db_url: str, pool_options: Optional[dict] = None, read_only: bool = False
+) -> dict:
+    connection = expand_db_url(db_url)
+    credentials = connection["credentials"]
+    if connection["engine"] == "tortoise.backends.asyncpg":
+        for key, value in (pool_options or {}).items():
+            if key not in POOL_OPTIONS:
+                raise ValueError(f"Unknown connection pool option: {key}")
+            credentials[POOL_OPTIONS[key]] = value
+        if read_only:
+            credentials["server_settings"] = {"default_transaction_read_only": "on"}
+    elif read_only:
+        # Tortoise's SQLite client runs every unknown credential as a PRAGMA on connection
+        credentials["query_only"] = "ON"
+    return connection
+
 
 class MoReDB:
-    def __init__(self, path: Path):
-        self.path = path
-        # TODO: Check if DB is openable/"queriable"
-        self.is_init = self.path.exists() and (not self.path.is_dir())
-        if not self.is_init:
-            self.path.parent.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        db_url: str,
+        pool_options: Optional[dict] = None,
+        slow_query_threshold: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        """
+        A read-only database rejects every write and is never initialized: it's meant for commands that only
+        inspect the database, so that they don't compete for locks with publishing commands.
+        """
+        self.connection = build_connection_config(db_url, pool_options, read_only)
+        self.slow_query_threshold = slow_query_threshold
+        self.read_only = read_only
+        self.is_sqlite = self.connection["engine"] == "tortoise.backends.sqlite"
+        if self.is_sqlite:
+            self.path = Path(self.connection["credentials"]["file_path"])
+            # TODO: Check if DB is openable/"queriable"
+            self.is_init = self.path.exists() and (not self.path.is_dir())
+            if not self.is_init:
+                if read_only:
+                    raise FileNotFoundError(
+                        f"Database {self.path} doesn't exist. Run any other command to initialize it."
+                    )
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            # Server databases can't be checked before connecting: whether they are up to date is known only from
+            # the fingerprint stored in them.
+            self.path = None
+            self.is_init = False
 
     async def setup(self):
         await Tortoise.init(
-            db_url=f"sqlite:///{self.path}",
-            modules={
-                "models": [
-                    "mobilizon_reshare.models.event",
-                    "mobilizon_reshare.models.notification",
-                    "mobilizon_reshare.models.publication",
-                    "mobilizon_reshare.models.publisher",
-                ]
-            },
-            # always store UTC time in database
-            use_tz=True,
+            config={
+                "connections": {"default": self.connection},
+                "apps": {"models": {"models": MODELS, "default_connection": "default"}},
+                # always store UTC time in database
+                "use_tz": True,
+            }
         )
+        instrument(get_connection(), self.slow_query_threshold)
+        if self.read_only:
+            return
+
+        # a new SQLite file is known to be empty, any other database could already be up to date
+        await update_database(check=self.is_init or not self.is_sqlite)
         if not self.is_init:
-            await Tortoise.generate_schemas()
             self.is_init = True
-            logger.info(f"Successfully initialized database at {self.path}")
+            logger.info("Successfully initialized database")
+
+
+async def update_database(check: bool = True) -> bool:
+    """
+    Creates the missing tables, columns and publishers, unless the fingerprint stored in the database shows that
+    there are none. Returns whether the database was updated.
+    """
+    fingerprint = compute_fingerprint(publisher_names)
+    if check and await get_stored_fingerprint() == fingerprint:
+        logger.debug("Database is up to date")
+        return False
+
+    await generate_schema_for_client(get_connection(), safe=True)
+    await add_missing_columns()
+    await update_publishers(publisher_names)
+    await Metadata.update_or_create(
+        key=FINGERPRINT_KEY, defaults={"value": fingerprint}
+    )
+    return True
+
+
+def get_models() -> list[Type[Model]]:
+    return [
+        model
+        for module_name in MODELS
+        for model in vars(importlib.import_module(module_name)).values()
+        if inspect.isclass(model)
+        and issubclass(model, Model)
+        and model.__module__ == module_name
+    ]
+
+
+async def get_table_columns(table: str) -> set[str]:
+    connection = get_connection()
+    if connection.capabilities.dialect == "sqlite":
+        rows = await connection.execute_query_dict(f'PRAGMA table_info("{table}")')
+    else:
+        rows = await connection.execute_query_dict(
+            "SELECT column_name AS name FROM information_schema.columns"
+            " WHERE table_name = $1",
+            [table],
+        )
+    return set(row["name"] for row in rows)
+
+
+def get_column_definition(field: Field, dialect: str) -> str:
+    sql_type = field.get_for_dialect(dialect, "SQL_TYPE")
+    if field.null:
+        return sql_type
+    default = field.default
+    if isinstance(default, (int, float)) and not isinstance(default, bool):
+        return f"{sql_type} NOT NULL DEFAULT {default}"
+    if isinstance(default, str):
+        escaped = default.replace("'", "''")
+        return f"{sql_type} NOT NULL DEFAULT '{escaped}'"
+    raise ValueError(
+        f"Can't add the column of the field {field.model_field_name}: it's neither nullable nor has a constant "
+        "default"
+    )
+
+
+async def add_missing_columns() -> None:
+    """
+    Adds to the existing tables the columns of the fields that were added to the models after the tables were
+    created. Only nullable fields and fields with a constant default can be added this way, since the existing rows
+    have no value for them.
+    """
+    connection = get_connection()
+    dialect = connection.capabilities.dialect
+    for model in get_models():
+        table = model._meta.db_table
+        columns = await get_table_columns(table)
+        for field_name, column in model._meta.fields_db_projection.items():
+            if column in columns:
+                continue
+            field = model._meta.fields_map[field_name]
+            logger.info(f"Adding column {column} to table {table}")
+            await connection.execute_script(
+                f'ALTER TABLE "{table}" ADD COLUMN "{column}"'
+                f" {get_column_definition(field, dialect)}"
+            )
+
+
+def compute_fingerprint(names) -> str:
+    """
+    Summarizes the state the database is expected to be in: the schema of the models and the configured
+    publishers. When the fingerprint stored in the database matches, the setup has nothing to do.
+    """
+    # generating the DDL would take longer than the setup it's meant to skip: the columns are enough
+    schema = [
+        f"{model._meta.db_table}.{column}:{type(field).__name__}"
+        f":{field.null}:{field.unique}:{field.index}"
+        for model in get_models()
+        for field_name, column in model._meta.fields_db_projection.items()
+        for field in [model._meta.fields_map[field_name]]
+    ]
+    return hashlib.sha256(
+        "\n".join(sorted(schema) + sorted(set(names))).encode("utf-8")
+    ).hexdigest()
+
 
-        await update_publishers(publisher_names)
+async def get_stored_fingerprint() -> Optional[str]:
+    try:
+        metadata = await Metadata.get_or_none(key=FINGERPRINT_KEY)
+    except OperationalError:
+        # the database predates the metadata table
+        return None
+    return metadata.value if metadata else None
 
 
 async def tear_down():
     return await Tortoise.close_connections()
+
+
+@asynccontextmanager
+async def snapshot():
+    """
+    Runs the enclosed queries in a single transaction, so that they all see the database as it was at its
+    beginning, regardless of concurrent writes.
+    """
+    async with in_transaction(CONNECTION_NAME) as connection:
+        if connection.capabilities.dialect == "postgres":
+            # the default isolation level of PostgreSQL gives every statement its own snapshot
+            await connection.execute_script(
+                "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"
+            )
+        # SQLite transactions are always serializable, and in WAL mode readers don't block the writer
+        yield connection
+
+
+def get_connection() -> BaseDBAsyncClient:
+    return get_tortoise_connection(CONNECTION_NAME)
+
+
+def get_db_file_size() -> Optional[int]:
+    """
+    Returns the size in bytes of the SQLite database file, including its write-ahead log.
+    Returns None for in-memory and server databases.
+    """
+    connection = get_connection()
+    if connection.capabilities.dialect != "sqlite" or connection.filename == ":memory:":
+        return None
+    return sum(
+        os.path.getsize(path)
+        for path in (connection.filename, f"{connection.filename}-wal")
+        if os.path.exists(path)
+    )
+
+
+async def compact() -> None:
+    """
+    Gives back to the filesystem the space left free by deleted rows. Only SQLite databases are compacted: on
+    PostgreSQL this is left to autovacuum.
+    """
+    connection = get_connection()
+    if connection.capabilities.dialect == "sqlite":
+        await connection.execute_script("VACUUM")
+        await connection.execute_script("PRAGMA wal_checkpoint(TRUNCATE)")
@@ -0,0 +1,113 @@
+import contextvars
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+logger = logging.getLogger(__name__)
+
+EXECUTE_METHODS = (
+    "execute_insert",
+    "execute_query",
+    "execute_query_dict",
+    "execute_many",
+    "execute_script",
+)
+
+# Some clients implement an execute method on top of another one: only the outermost call is measured.
+_in_query = contextvars.ContextVar("_in_query", default=False)
+_collectors: list["QueryStats"] = []
+_slow_query_threshold: Optional[float] = None
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    # seconds spent waiting for the database
+    total_time: float = 0.0
+    slow_queries: int = 0
+    # the statements themselves are kept only on request, i.e. to debug tests
+    queries: Optional[list[str]] = None
+
+    def record(self, query: str, elapsed: float, slow: bool) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.slow_queries += slow
+        if self.queries is not None:
+            self.queries.append(query)
+
+    def __str__(self):
+        return (
+            f"{self.count} queries in {self.total_time * 1000:.1f}ms"
+            f" ({self.slow_queries} slow)"
+        )
+
+
+def _record(query: str, elapsed: float) -> None:
+    slow = _slow_query_threshold is not None and elapsed * 1000 >= _slow_query_threshold
+    if slow:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f}ms): {query}")
+    else:
+        logger.debug(f"Query ({elapsed * 1000:.1f}ms): {query}")
+    for stats in _collectors:
+        stats.record(query, elapsed, slow)
+
+
+def _instrumented(method):
+    @functools.wraps(method)
+    async def wrapper(self, query, *args, **kwargs):
+        if _in_query.get():
+            return await method(self, query, *args, **kwargs)
+
+        token = _in_query.set(True)
+        start = time.perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            _record(query, time.perf_counter() - start)
+            _in_query.reset(token)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def _instrument_class(client_class: type) -> None:
+    for name in EXECUTE_METHODS:
+        method = getattr(client_class, name)
+        if not getattr(method, "__instrumented__", False):
+            setattr(client_class, name, _instrumented(method))
+
+
+def instrument(
+    connection: BaseDBAsyncClient, slow_query_threshold: Optional[float] = None
+) -> None:
+    """
+    Measures every statement executed through the connection, both inside and outside transactions.
+    Statements taking at least ``slow_query_threshold`` milliseconds are logged as warnings.
+    Instrumenting the same kind of connection more than once has no further effect.
+    The execute methods of the clients aren't a public hook of Tortoise: pyproject.toml pins the release line
+    they were checked against.
+    """
+    global _slow_query_threshold
+    _slow_query_threshold = slow_query_threshold
+
+    _instrument_class(type(connection))
+    # transactions run their statements through a wrapper that can override the execute methods
+    _instrument_class(type(connection._in_transaction().connection))
+
+
+@contextmanager
+def collect_query_stats(keep_queries: bool = False) -> Iterator[QueryStats]:
+    """
+    Collects the statements executed by the instrumented connections until the context is exited.
+    """
+    stats = QueryStats(queries=[] if keep_queries else None)
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
@@ -1,13 +1,19 @@
-from typing import Iterable, Optional
+from typing import AsyncIterator, Iterable, Optional
 from uuid import UUID
 
 from arrow import Arrow
+from tortoise.expressions import Subquery
+from tortoise.query_utils import Q
 from tortoise.queryset import QuerySet
 from tortoise.transactions import atomic
 
 from mobilizon_reshare.event.event import MobilizonEvent, EventPublicationStatus
+from mobilizon_reshare.models.circuit_breaker import CircuitBreakerState
+from mobilizon_reshare.models.credential_validation import CredentialValidation
 from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.models.notification import Notification, NotificationStatus
 from mobilizon_reshare.models.publication import Publication, PublicationStatus
+from mobilizon_reshare.models.rate_limit import RateLimitState
 from mobilizon_reshare.publishers import get_active_publishers
 from mobilizon_reshare.publishers.abstract import EventPublication
 from mobilizon_reshare.storage.query import CONNECTION_NAME
@@ -66,6 +72,84 @@ async def get_all_events(
     )
 
 
+async def iter_events(
+    status: Optional[list[EventPublicationStatus]] = None,
+    from_date: Optional[Arrow] = None,
+    to_date: Optional[Arrow] = None,
+    page_size: int = 100,
+) -> AsyncIterator[MobilizonEvent]:
+    """
+    Streams the events with the given status, ordered by ``begin_datetime``. Events are read from the DB one page
+    at a time, so that memory usage doesn't depend on the number of stored events. The status is filtered by the
+    query, so that only the matching events are read.
+    """
+    if status is not None and not status:
+        return
+    query = _add_date_window(Event.all(), "begin_datetime", from_date, to_date)
+    if status is not None:
+        query = query.filter(
+            Q(*(_event_status_filter(s) for s in status), join_type="OR")
+        )
+    async for event in iter_event_models(query, page_size=page_size):
+        yield MobilizonEvent.from_model(event)
+
+
+def _has_publication_with_status(status: PublicationStatus) -> Q:
+    return Q(id__in=Subquery(Publication.filter(status=status).values("event_id")))
+
+
+def _event_status_filter(status: EventPublicationStatus) -> Q:
+    """
+    The query counterpart of ``MobilizonEvent.compute_status``: publications still in progress don't count.
+    """
+    completed = _has_publication_with_status(PublicationStatus.COMPLETED)
+    failed = _has_publication_with_status(PublicationStatus.FAILED)
+    return {
+        EventPublicationStatus.WAITING: ~completed & ~failed,
+        EventPublicationStatus.COMPLETED: completed & ~failed,
+        EventPublicationStatus.FAILED: failed & ~completed,
+        EventPublicationStatus.PARTIAL: completed & failed,
+    }[status]
+
+
+async def iter_event_models(
+    queryset: QuerySet[Event], page_size: int = 100
+) -> AsyncIterator[Event]:
+    async for page in iter_event_model_pages(queryset, page_size=page_size):
+        for event in page:
+            yield event
+
+
+async def iter_event_model_pages(
+    queryset: QuerySet[Event], page_size: int = 100
+) -> AsyncIterator[list[Event]]:
+    """
+    Keyset pagination over ``(begin_datetime, id)``: every page starts right after the last event of the previous
+    one, so that reading a page costs the same no matter how deep into the table it is. Since the next page is
+    located by key, the events of a page can be safely deleted before requesting the next one.
+    """
+    last_event = None
+    while True:
+        page_query = queryset
+        if last_event:
+            page_query = page_query.filter(
+                Q(begin_datetime__gt=last_event.begin_datetime)
+                | Q(begin_datetime=last_event.begin_datetime, id__gt=last_event.id)
+            )
+        page = (
+            await page_query.prefetch_related("publications__publisher")
+            .order_by("begin_datetime", "id")
+            .limit(page_size)
+            .distinct()
+        )
+        if page:
+            yield page
+
+        if len(page) < page_size:
+            return
+        last_event = page[-1]
+
+
 async def prefetch_event_relations(queryset: QuerySet[Event]) -> list[Event]:
     return (
         await queryset.prefetch_related("publications__publisher")
@@ -143,11 +227,46 @@ async def get_unpublished_events(
     return _remove_duplicated_events(all_unpublished_events)
 
 
-@atomic(CONNECTION_NAME)
-async def build_publications(event: MobilizonEvent) -> list[EventPublication]:
-    event_model = await Event.filter(mobilizon_id=event.mobilizon_id).first()
-    models = [
-        await event_model.build_publication_by_publisher_name(name)
-        for name in get_active_publishers()
+async def build_retry_publications(now: Arrow) -> list[EventPublication]:
+    """
+    Returns the failed publications to active publishers that are due to be retried. Events that have already
+    begun aren't published anymore.
+    """
+    publications = (
+        await Publication.filter(
+            status=PublicationStatus.FAILED,
+            next_attempt__lte=now.to("utc").datetime,
+            publisher__name__in=get_active_publishers(),
+            event__begin_datetime__gt=now.to("utc").datetime,
+        )
+        .prefetch_related("publisher", "event__publications__publisher")
+        .order_by("next_attempt")
+    )
+    return [
+        EventPublication.from_orm(
+            publication, MobilizonEvent.from_model(publication.event)
+        )
+        for publication in publications
     ]
-    return list(EventPublication.from_orm(m, event) for m in models)
+
+
+async def get_pending_notifications() -> list[Notification]:
+    return (
+        await Notification.filter(status=NotificationStatus.WAITING)
+        .prefetch_related("target")
+        .order_by("id")
+    )
+
+
+async def get_credential_validations(since: Arrow) -> list[CredentialValidation]:
+    return await CredentialValidation.filter(
+        validated_at__gte=since.to("utc").datetime
+    )
+
+
+async def get_circuit_breaker_states() -> list[CircuitBreakerState]:
+    return await CircuitBreakerState.all()
+
+
+async def get_rate_limit_states() -> list[RateLimitState]:
+    return await RateLimitState.all()
@@ -0,0 +1,90 @@
+from typing import Optional
+
+from mobilizon_reshare.models.publication import PublicationStatus
+from mobilizon_reshare.storage.db import get_connection
+
+# The few expressions that SQLite and PostgreSQL spell differently. Timestamps are compared in UTC.
+DIALECT_EXPRESSIONS = {
+    "sqlite": {
+        "day": "date({column})",
+        "seconds_between": "(julianday({end}) - julianday({start})) * 86400",
+    },
+    "postgres": {
+        "day": "to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD')",
+        "seconds_between": "extract(epoch FROM {end} - {start})",
+    },
+}
+
+
+def _expression(name: str, **kwargs) -> str:
+    dialect = get_connection().capabilities.dialect
+    return DIALECT_EXPRESSIONS[dialect][name].format(**kwargs)
+
+
+async def _query(sql: str) -> list[dict]:
+    return await get_connection().execute_query_dict(sql)
+
+
+async def count_publications_by_day() -> list[dict]:
+    """
+    Counts the publications for each publisher, status and day.
+    """
+    day = _expression("day", column="publication.timestamp")
+    rows = await _query(
+        f"SELECT publisher.name AS publisher, publication.status AS status, {day} AS day,"
+        " count(*) AS count"
+        " FROM publication JOIN publisher ON publisher.id = publication.publisher_id"
+        f" GROUP BY publisher.name, publication.status, {day}"
+        " ORDER BY day, publisher, status"
+    )
+    return [{**row, "status": PublicationStatus(row["status"]).name} for row in rows]
+
+
+async def count_publications_by_publisher() -> list[dict]:
+    """
+    Counts the publications for each publisher, together with the share of them that succeeded.
+    """
+    rows = await _query(
+        "SELECT publisher.name AS publisher, count(*) AS count,"
+        f" sum(CASE WHEN publication.status = {PublicationStatus.COMPLETED.value}"
+        " THEN 1 ELSE 0 END) AS completed"
+        " FROM publication JOIN publisher ON publisher.id = publication.publisher_id"
+        " GROUP BY publisher.name ORDER BY publisher"
+    )
+    return [
+        {**row, "success_rate": round(row["completed"] / row["count"], 4)}
+        for row in rows
+    ]
+
+
+async def top_failure_reasons(limit: int = 10) -> list[dict]:
+    rows = await _query(
+        "SELECT publisher.name AS publisher, publication.reason AS reason, count(*) AS count"
+        " FROM publication JOIN publisher ON publisher.id = publication.publisher_id"
+        f" WHERE publication.status = {PublicationStatus.FAILED.value}"
+        " GROUP BY publisher.name, publication.reason"
+        f" ORDER BY count DESC, publisher, reason LIMIT {int(limit)}"
+    )
+    return rows
+
+
+async def median_time_to_publication() -> Optional[float]:
+    """
+    Returns the median of the seconds elapsed between the moment an event was first seen and its first successful
+    publication, or None if no event with a known ingestion time was published.
+    """
+    delay = _expression(
+        "seconds_between", start="event.created_at", end="min(publication.timestamp)"
+    )
+    rows = await _query(
+        f"WITH delays AS (SELECT {delay} AS delay"
+        " FROM event JOIN publication ON publication.event_id = event.id"
+        f" WHERE publication.status = {PublicationStatus.COMPLETED.value}"
+        " AND event.created_at IS NOT NULL GROUP BY event.id, event.created_at)"
+        # the average of the middle value, or of the two middle values when there is an even number of them
+        " SELECT avg(delay) AS median FROM (SELECT delay FROM delays ORDER BY delay"
+        " LIMIT 2 - (SELECT count(*) FROM delays) % 2"
+        " OFFSET ((SELECT count(*) FROM delays) - 1) / 2) AS middle"
+    )
+    median = rows[0]["median"] if rows else None
+    return float(median) if median is not None else None
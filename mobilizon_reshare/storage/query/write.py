@@ -1,40 +1,264 @@
 import logging
+from datetime import datetime
 from typing import Iterable, Optional
+from uuid import UUID
 
 import arrow
+from arrow import Arrow
+from tortoise.expressions import F
 from tortoise.transactions import atomic
 
 from mobilizon_reshare.event.event import MobilizonEvent
+from mobilizon_reshare.models.circuit_breaker import CircuitBreakerState
+from mobilizon_reshare.models.credential_validation import CredentialValidation
 from mobilizon_reshare.models.event import Event
-from mobilizon_reshare.models.publication import Publication
+from mobilizon_reshare.models.notification import Notification, NotificationStatus
+from mobilizon_reshare.models.publication import Publication, PublicationStatus
 from mobilizon_reshare.models.publisher import Publisher
-from mobilizon_reshare.publishers.coordinator import PublisherCoordinatorReport
+from mobilizon_reshare.models.rate_limit import RateLimitState
+from mobilizon_reshare.publishers import get_active_publishers
+from mobilizon_reshare.publishers.abstract import EventPublication
+from mobilizon_reshare.publishers.coordinator import (
+    BasePublicationReport,
+    EventPublicationReport,
+    PublisherCoordinatorReport,
+)
+from mobilizon_reshare.publishers.platforms.platform_mapping import (
+    name_to_publisher_class,
+)
+from mobilizon_reshare.publishers.retry import RetryPolicy
 from mobilizon_reshare.storage.query import CONNECTION_NAME
 from mobilizon_reshare.storage.query.read import events_without_publications
+from mobilizon_reshare.storage.serialization import dict_to_event, dict_to_publication
+
+
+async def _get_foreign_keys(
+    publications: Iterable[EventPublication],
+) -> tuple[dict[UUID, int], dict[str, int]]:
+    """
+    Maps the events of the publications to their ids, and their publishers to theirs.
+    """
+    publications = list(publications)
+    event_ids = {
+        event.mobilizon_id: event.id
+        for event in await Event.filter(
+            mobilizon_id__in=set(p.event.mobilizon_id for p in publications)
+        )
+    }
+    publisher_ids = {
+        publisher.name: publisher.id
+        for publisher in await Publisher.filter(
+            name__in=set(p.publisher.name for p in publications)
+        )
+    }
+    return event_ids, publisher_ids
+
+
+async def create_pending_publications(
+    event: MobilizonEvent,
+) -> list[EventPublication]:
+    """
+    Stores a waiting publication of the event for every active publisher, before publishing it: a run
+    interrupted while publishing doesn't leave the event looking as never published.
+    """
+    event_model = await Event.filter(mobilizon_id=event.mobilizon_id).first()
+    publishers = {
+        publisher.name: publisher
+        for publisher in await Publisher.filter(name__in=get_active_publishers())
+    }
+    models = [
+        event_model.build_publication(publishers[name], PublicationStatus.WAITING)
+        for name in get_active_publishers()
+    ]
+    timestamp = arrow.utcnow().datetime
+    for model in models:
+        model.timestamp = timestamp
+    await Publication.bulk_create(models)
+    return [EventPublication.from_orm(model, event) for model in models]
+
+
+async def set_publications_pending(publications: list[EventPublication]) -> None:
+    """
+    Marks stored publications as waiting before publishing them again.
+    """
+    await Publication.filter(id__in=[p.id for p in publications]).update(
+        status=PublicationStatus.WAITING, timestamp=arrow.utcnow().datetime
+    )
+
+
+async def save_published_publication(publication_id: UUID, remote_id: Optional[str]):
+    """
+    Records that the publication was posted, as soon as it is.
+    """
+    await Publication.filter(id=publication_id).update(
+        status=PublicationStatus.COMPLETED,
+        reason=None,
+        timestamp=arrow.utcnow().datetime,
+        next_attempt=None,
+        remote_id=remote_id,
+    )
+
+
+@atomic(CONNECTION_NAME)
+async def recover_interrupted_publications(
+    stale_before: Arrow, notifier_names: Iterable[str] = ()
+) -> int:
+    """
+    Settles the publications left waiting since before ``stale_before`` by a run that was interrupted. The ones
+    that were posted are completed, the others are failed. Only the ones to platforms supporting idempotency keys
+    are retried right away, since those won't post them twice: for each of the others a notification is stored for
+    every notifier, to check by hand whether they were posted. Returns the number of failed publications.
+    """
+    interrupted = Publication.filter(
+        status=PublicationStatus.WAITING, timestamp__lt=stale_before.to("utc").datetime
+    )
+    await interrupted.filter(remote_id__isnull=False).update(
+        status=PublicationStatus.COMPLETED, reason=None, next_attempt=None
+    )
+    publications = await interrupted.values_list("id", "publisher__name")
+    if not publications:
+        return 0
+    now = arrow.utcnow().datetime
+    reason = "Interrupted before the outcome of the publication was stored"
+    retried_ids = [
+        publication_id
+        for publication_id, name in publications
+        if getattr(name_to_publisher_class.get(name), "idempotent", False)
+    ]
+    unknown = [
+        (publication_id, name)
+        for publication_id, name in publications
+        if publication_id not in retried_ids
+    ]
+    if retried_ids:
+        await Publication.filter(id__in=retried_ids).update(
+            status=PublicationStatus.FAILED,
+            reason=reason,
+            timestamp=now,
+            next_attempt=now,
+        )
+    if not unknown:
+        return len(publications)
+
+    reason = f"{reason}, check whether it was posted"
+    await Publication.filter(id__in=[id_ for id_, _ in unknown]).update(
+        status=PublicationStatus.FAILED, reason=reason, timestamp=now, next_attempt=None
+    )
+    notifier_names = set(notifier_names)
+    if notifier_names:
+        await update_publishers(notifier_names)
+        notifiers = await Publisher.filter(name__in=notifier_names)
+        await Notification.bulk_create(
+            [
+                Notification(
+                    status=NotificationStatus.WAITING,
+                    message=f"Publication {publication_id} failed with status: {PublicationStatus.FAILED}.\n"
+                    f"Reason: {reason}\n"
+                    f"Publisher: {name}",
+                    target_id=notifier.id,
+                    publication_id=publication_id,
+                )
+                for publication_id, name in unknown
+                for notifier in notifiers
+            ]
+        )
+    return len(publications)
 
 
 @atomic(CONNECTION_NAME)
 async def save_publication_report(
     coordinator_report: PublisherCoordinatorReport,
+    retry_policy: Optional[RetryPolicy] = None,
 ) -> None:
     """
-    Store a publication process outcome
-    """
-    for publication_report in coordinator_report.reports:
-        event = await Event.filter(
-            mobilizon_id=publication_report.publication.event.mobilizon_id
-        ).first()
-        publisher = await Publisher.filter(
-            name=publication_report.publication.publisher.name
-        ).first()
-        await Publication.create(
-            id=publication_report.publication.id,
-            event_id=event.id,
-            publisher_id=publisher.id,
-            status=publication_report.status,
-            reason=publication_report.reason,
-            timestamp=arrow.now().datetime,
+    Store a publication process outcome. Failed publications are scheduled for a retry according to
+    ``retry_policy``, if any, unless retrying could post them twice. Publications stored as pending are updated,
+    the others are created.
+    """
+    reports = coordinator_report.reports
+    now = arrow.now()
+
+    def get_fields(report: EventPublicationReport) -> dict:
+        return dict(
+            status=report.status,
+            reason=report.reason,
+            timestamp=now.datetime,
+            remote_id=report.remote_id,
+            next_attempt=retry_policy.next_attempt(1, now)
+            if retry_policy and not report.succesful and report.retriable
+            else None,
+        )
+
+    pending_ids = set(
+        await Publication.filter(
+            id__in=[r.publication.id for r in reports]
+        ).values_list("id", flat=True)
+    )
+    for report in reports:
+        if report.publication.id in pending_ids:
+            await Publication.filter(id=report.publication.id).update(
+                **get_fields(report)
+            )
+
+    new_reports = [r for r in reports if r.publication.id not in pending_ids]
+    if not new_reports:
+        return
+    event_ids, publisher_ids = await _get_foreign_keys(
+        r.publication for r in new_reports
+    )
+    await Publication.bulk_create(
+        [
+            Publication(
+                id=report.publication.id,
+                event_id=event_ids[report.publication.event.mobilizon_id],
+                publisher_id=publisher_ids[report.publication.publisher.name],
+                **get_fields(report),
+            )
+            for report in new_reports
+        ]
+    )
+
+
+@atomic(CONNECTION_NAME)
+async def save_retry_report(
+    coordinator_report: PublisherCoordinatorReport, retry_policy: RetryPolicy
+) -> list[EventPublicationReport]:
+    """
+    Stores the outcome of retrying failed publications, counting an attempt for each of them. Returns the reports
+    of the publications that failed and won't be retried anymore, either because they were attempted too many
+    times or because retrying could post them twice.
+    """
+    # publications skipped by the circuit breaker weren't attempted, they stay due
+    skipped = [r.publication.id for r in coordinator_report.reports if r.skipped]
+    if skipped:
+        await Publication.filter(id__in=skipped).update(status=PublicationStatus.FAILED)
+    reports = [report for report in coordinator_report.reports if not report.skipped]
+    attempts = {
+        publication.id: publication.attempts + 1
+        for publication in await Publication.filter(
+            id__in=[r.publication.id for r in reports]
+        )
+    }
+    now = arrow.now()
+    exhausted = []
+    for report in reports:
+        publication_id = report.publication.id
+        next_attempt = (
+            None
+            if report.succesful or not report.retriable
+            else retry_policy.next_attempt(attempts[publication_id], now)
+        )
+        if not report.succesful and next_attempt is None:
+            exhausted.append(report)
+        await Publication.filter(id=publication_id).update(
+            status=report.status,
+            reason=report.reason,
+            timestamp=now.datetime,
+            attempts=attempts[publication_id],
+            next_attempt=next_attempt,
+            remote_id=report.remote_id,
         )
+    return exhausted
 
 
 @atomic(CONNECTION_NAME)
@@ -58,8 +282,11 @@ async def create_unpublished_events(
         )
     )
 
-    for event in new_unpublished_events:
-        await event.to_model().save()
+    created_at = arrow.now().datetime
+    new_event_models = [event.to_model() for event in new_unpublished_events]
+    for event_model in new_event_models:
+        event_model.created_at = created_at
+    await Event.bulk_create(new_event_models)
 
     return await events_without_publications()
 
@@ -74,6 +301,169 @@ async def update_publishers(
 ) -> None:
     names = set(names)
     known_publisher_names = set(p.name for p in await Publisher.all())
-    for name in names.difference(known_publisher_names):
+    new_publisher_names = names.difference(known_publisher_names)
+    for name in new_publisher_names:
         logging.info(f"Creating {name} publisher")
-        await create_publisher(name)
+    await Publisher.bulk_create([Publisher(name=name) for name in new_publisher_names])
+
+
+@atomic(CONNECTION_NAME)
+async def delete_events(events: list[Event]) -> None:
+    """
+    Deletes the given events together with their publications and the notifications about them.
+    Publications have to be prefetched.
+    """
+    publication_ids = [
+        publication.id for event in events for publication in event.publications
+    ]
+    await Notification.filter(publication_id__in=publication_ids).delete()
+    await Publication.filter(id__in=publication_ids).delete()
+    await Event.filter(id__in=[event.id for event in events]).delete()
+
+
+@atomic(CONNECTION_NAME)
+async def import_events(events: list[dict]) -> tuple[int, int]:
+    """
+    Stores serialized events together with their publications, skipping the events whose ``mobilizon_id`` and the
+    publications whose ``id`` are already known, so that importing the same events again has no effect.
+    Missing publishers are created.
+
+    Returns the number of created events and publications.
+    """
+    event_ids = {
+        event.mobilizon_id: event.id
+        for event in await Event.filter(
+            mobilizon_id__in=set(UUID(event["mobilizon_id"]) for event in events)
+        )
+    }
+    new_events = []
+    for event in map(dict_to_event, events):
+        if event.mobilizon_id not in event_ids:
+            event_ids[event.mobilizon_id] = event.id
+            new_events.append(event)
+    await Event.bulk_create(new_events)
+
+    publications = [
+        (UUID(event["mobilizon_id"]), publication)
+        for event in events
+        for publication in event["publications"]
+    ]
+    publisher_names = set(publication["publisher"] for _, publication in publications)
+    await update_publishers(publisher_names)
+    publishers = {
+        publisher.name: publisher
+        for publisher in await Publisher.filter(name__in=publisher_names)
+    }
+    known_publication_ids = set(
+        await Publication.filter(
+            id__in=[UUID(publication["id"]) for _, publication in publications]
+        ).values_list("id", flat=True)
+    )
+    new_publications = {}
+    for mobilizon_id, publication in publications:
+        publication = dict_to_publication(
+            publication, event_ids[mobilizon_id], publishers[publication["publisher"]]
+        )
+        if publication.id not in known_publication_ids:
+            new_publications[publication.id] = publication
+    await Publication.bulk_create(list(new_publications.values()))
+
+    return len(new_events), len(new_publications)
+
+
+@atomic(CONNECTION_NAME)
+async def create_failure_notifications(
+    reports: Iterable[BasePublicationReport], notifier_names: Iterable[str]
+) -> None:
+    """
+    Stores a notification for each failed report and each notifier, to be sent by ``send_pending_notifications``.
+    Publications skipped by the circuit breaker aren't notified: the failures that opened it already were.
+    """
+    failed_reports = [
+        report
+        for report in reports
+        if not report.succesful
+        and not (isinstance(report, EventPublicationReport) and report.skipped)
+    ]
+    notifier_names = set(notifier_names)
+    if not failed_reports or not notifier_names:
+        return
+
+    await update_publishers(notifier_names)
+    notifiers = await Publisher.filter(name__in=notifier_names)
+    await Notification.bulk_create(
+        [
+            Notification(
+                status=NotificationStatus.WAITING,
+                message=report.get_failure_message(),
+                target_id=notifier.id,
+                publication_id=report.publication.id
+                if isinstance(report, EventPublicationReport)
+                else None,
+            )
+            for report in failed_reports
+            for notifier in notifiers
+        ]
+    )
+
+
+@atomic(CONNECTION_NAME)
+async def save_notification_attempts(
+    sent: Iterable[Notification], failed: Iterable[Notification], max_attempts: int
+) -> None:
+    """
+    Counts an attempt for each of the given notifications. The failed ones stay waiting to be retried until they
+    reach ``max_attempts``.
+    """
+    last_attempt = arrow.now().datetime
+    sent_ids = [notification.id for notification in sent]
+    failed_ids = [notification.id for notification in failed]
+    if sent_ids:
+        await Notification.filter(id__in=sent_ids).update(
+            status=NotificationStatus.COMPLETED,
+            attempts=F("attempts") + 1,
+            last_attempt=last_attempt,
+        )
+    if failed_ids:
+        await Notification.filter(id__in=failed_ids).update(
+            attempts=F("attempts") + 1, last_attempt=last_attempt
+        )
+        await Notification.filter(id__in=failed_ids, attempts__gte=max_attempts).update(
+            status=NotificationStatus.FAILED
+        )
+
+
+async def save_credential_validation(platform: str, fingerprint: str) -> None:
+    await CredentialValidation.update_or_create(
+        platform=platform,
+        fingerprint=fingerprint,
+        defaults={"validated_at": arrow.now().datetime},
+    )
+
+
+async def delete_credential_validations(platform: str) -> None:
+    await CredentialValidation.filter(platform=platform).delete()
+
+
+async def save_circuit_breaker_state(
+    key: str, failures: int, opened_until: Optional[datetime]
+) -> None:
+    await CircuitBreakerState.update_or_create(
+        key=key, defaults={"failures": failures, "opened_until": opened_until},
+    )
+
+
+async def save_rate_limit_state(
+    key: str,
+    tokens: Optional[float],
+    updated_at: datetime,
+    blocked_until: Optional[datetime],
+) -> None:
+    await RateLimitState.update_or_create(
+        key=key,
+        defaults={
+            "tokens": tokens,
+            "updated_at": updated_at,
+            "blocked_until": blocked_until,
+        },
+    )
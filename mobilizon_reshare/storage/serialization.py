@@ -0,0 +1,150 @@
+import itertools
+from typing import Iterable, Iterator
+from uuid import UUID
+
+import arrow
+
+from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.models.publication import Publication, PublicationStatus
+from mobilizon_reshare.models.publisher import Publisher
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def publication_to_dict(publication: Publication) -> dict:
+    return {
+        "id": str(publication.id),
+        "publisher": publication.publisher.name,
+        "status": publication.status.name,
+        "reason": publication.reason,
+        "timestamp": _isoformat(publication.timestamp),
+        "attempts": publication.attempts,
+        "next_attempt": _isoformat(publication.next_attempt),
+        "remote_id": publication.remote_id,
+    }
+
+
+def event_to_dict(event: Event) -> dict:
+    """
+    Serializes an event together with its publications. Publications and their publishers have to be prefetched.
+    """
+    return {
+        "id": str(event.id),
+        "mobilizon_id": str(event.mobilizon_id),
+        "name": event.name,
+        "description": event.description,
+        "mobilizon_link": event.mobilizon_link,
+        "thumbnail_link": event.thumbnail_link,
+        "location": event.location,
+        "begin_datetime": _isoformat(event.begin_datetime),
+        "end_datetime": _isoformat(event.end_datetime),
+        "created_at": _isoformat(event.created_at),
+        "publications": [
+            publication_to_dict(publication) for publication in event.publications
+        ],
+    }
+
+
+def _parse_datetime(value):
+    return arrow.get(value).datetime if value else None
+
+
+def dict_to_event(event: dict) -> Event:
+    return Event(
+        id=UUID(event["id"]),
+        mobilizon_id=UUID(event["mobilizon_id"]),
+        name=event["name"],
+        description=event["description"],
+        mobilizon_link=event["mobilizon_link"],
+        thumbnail_link=event["thumbnail_link"],
+        location=event["location"],
+        begin_datetime=_parse_datetime(event["begin_datetime"]),
+        end_datetime=_parse_datetime(event["end_datetime"]),
+        # missing from files exported before it was recorded
+        created_at=_parse_datetime(event.get("created_at")),
+    )
+
+
+def dict_to_publication(
+    publication: dict, event_id: UUID, publisher: Publisher
+) -> Publication:
+    return Publication(
+        id=UUID(publication["id"]),
+        status=PublicationStatus[publication["status"]],
+        reason=publication["reason"],
+        timestamp=_parse_datetime(publication["timestamp"]),
+        # missing from files exported before they were recorded
+        attempts=int(publication.get("attempts") or 1),
+        next_attempt=_parse_datetime(publication.get("next_attempt")),
+        remote_id=publication.get("remote_id"),
+        event_id=event_id,
+        publisher_id=publisher.id,
+    )
+
+
+EVENT_CSV_FIELDS = [
+    "id",
+    "mobilizon_id",
+    "name",
+    "description",
+    "mobilizon_link",
+    "thumbnail_link",
+    "location",
+    "begin_datetime",
+    "end_datetime",
+    "created_at",
+]
+PUBLICATION_CSV_FIELDS = [
+    "id",
+    "publisher",
+    "status",
+    "reason",
+    "timestamp",
+    "attempts",
+    "next_attempt",
+    "remote_id",
+]
+CSV_FIELDS = EVENT_CSV_FIELDS + [
+    f"publication_{field}" for field in PUBLICATION_CSV_FIELDS
+]
+
+
+def event_dict_to_rows(event: dict) -> Iterator[dict]:
+    """
+    Flattens a serialized event to CSV rows, one for each publication. The event's fields are repeated on every row,
+    an event without publications takes a single row with empty publication fields.
+    """
+    event_fields = {field: event[field] for field in EVENT_CSV_FIELDS}
+    if not event["publications"]:
+        yield event_fields
+    for publication in event["publications"]:
+        yield {
+            **event_fields,
+            **{
+                f"publication_{field}": publication[field]
+                for field in PUBLICATION_CSV_FIELDS
+            },
+        }
+
+
+def rows_to_event_dicts(rows: Iterable[dict]) -> Iterator[dict]:
+    """
+    Inverse of ``event_dict_to_rows``: the rows of an event have to be consecutive. CSV doesn't tell empty strings
+    from missing values, so empty fields are read as None.
+    """
+    for _, event_rows in itertools.groupby(rows, key=lambda row: row["id"]):
+        event_rows = [
+            {key: value or None for key, value in row.items()} for row in event_rows
+        ]
+        event = {field: event_rows[0].get(field) for field in EVENT_CSV_FIELDS}
+        event["publications"] = [
+            {
+                field: row.get(f"publication_{field}")
+                for field in PUBLICATION_CSV_FIELDS
+            }
+            for row in event_rows
+            if row["publication_id"]
+        ]
+        yield event
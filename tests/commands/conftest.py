@@ -6,8 +6,11 @@ from click.testing import CliRunner
 
 import mobilizon_reshare.publishers
 import mobilizon_reshare.storage.query.read
+import mobilizon_reshare.storage.query.write
 from mobilizon_reshare.models.publisher import Publisher
+import mobilizon_reshare.main.notify
 import mobilizon_reshare.main.recap
+import mobilizon_reshare.main.start
 from mobilizon_reshare.publishers import coordinator
 from tests import today
 
@@ -71,6 +74,9 @@ async def mock_publisher_config(monkeypatch, publisher_class, mock_formatter_cla
     monkeypatch.setattr(
         mobilizon_reshare.storage.query.read, "get_active_publishers", _mock_active_pub
     )
+    monkeypatch.setattr(
+        mobilizon_reshare.storage.query.write, "get_active_publishers", _mock_active_pub
+    )
 
     monkeypatch.setattr(
         mobilizon_reshare.main.recap, "get_active_publishers", _mock_active_pub
@@ -110,7 +116,12 @@ async def mock_notifier_config(monkeypatch, publisher_class, mock_formatter_clas
         _mock_format_class,
     )
 
-    monkeypatch.setattr(coordinator, "get_active_notifiers", _mock_active_notifier)
+    monkeypatch.setattr(
+        mobilizon_reshare.main.start, "get_active_notifiers", _mock_active_notifier
+    )
+    monkeypatch.setattr(
+        mobilizon_reshare.main.notify, "get_active_notifiers", _mock_active_notifier
+    )
 
 
 @pytest.fixture
@@ -0,0 +1,56 @@
+import gzip
+import json
+
+import pytest
+
+import mobilizon_reshare.main.archive
+from mobilizon_reshare.main.archive import archive
+from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.models.notification import Notification
+from mobilizon_reshare.models.publication import Publication
+from tests.storage import complete_specification
+
+
+@pytest.fixture
+def mock_archive_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        mobilizon_reshare.main.archive, "get_archive_dir", lambda: tmp_path
+    )
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_archive(generate_models, mock_archive_dir, notification_model_generator):
+    await generate_models(complete_specification)
+    publication = await Publication.first()
+    await notification_model_generator(publication_id=publication.id).save()
+
+    report = await archive(retention_days=0, page_size=3)
+
+    assert report.events == 4
+    assert report.publications == 6
+    assert report.path.parent == mock_archive_dir
+
+    # the database is left empty
+    assert await Event.all().count() == 0
+    assert await Publication.all().count() == 0
+    assert await Notification.all().count() == 0
+
+    with gzip.open(report.path, "rt") as f:
+        archived_events = [json.loads(line) for line in f]
+    assert [e["name"] for e in archived_events] == [f"event_{i}" for i in range(4)]
+    assert archived_events[0]["publications"][0]["publisher"] == "telegram"
+    assert archived_events[0]["publications"][0]["status"] == "COMPLETED"
+
+
+@pytest.mark.asyncio
+async def test_archive_nothing_to_archive(generate_models, mock_archive_dir):
+    await generate_models(complete_specification)
+
+    report = await archive(retention_days=100000)
+
+    assert report.events == 0
+    assert report.path is None
+    assert str(report) == "No event to archive."
+    assert await Event.all().count() == 4
+    assert not list(mock_archive_dir.iterdir())
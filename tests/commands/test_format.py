@@ -1,4 +1,5 @@
 import uuid
+from uuid import UUID
 
 import pytest
 
@@ -7,6 +8,7 @@ from mobilizon_reshare.publishers.platforms.platform_mapping import (
     get_formatter_class,
     name_to_formatter_class,
 )
+from tests.storage import complete_specification
 
 
 @pytest.mark.parametrize("publisher_name", name_to_formatter_class.keys())
@@ -33,3 +35,11 @@ async def test_format_event_missing(runner, capsys):
         capsys.readouterr().out.strip()
         == f"Event with mobilizon_id {event_id} not found."
     )
+
+
+@pytest.mark.asyncio
+async def test_format_event_query_count(generate_models, assert_max_queries):
+    await generate_models(complete_specification)
+
+    with assert_max_queries(3):
+        await format_event(event_id=str(UUID(int=0)), publisher_name="telegram")
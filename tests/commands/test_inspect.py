@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from mobilizon_reshare.cli.commands.inspect.inspect_event import (
+    inspect_events,
+    show_events,
+)
+from mobilizon_reshare.event.event import EventPublicationStatus
+from mobilizon_reshare.storage.db import snapshot
+from mobilizon_reshare.storage.query.read import iter_events
+from tests.storage import complete_specification
+
+
+@pytest.mark.asyncio
+async def test_inspect_all_events(generate_models, capsys):
+    await generate_models(complete_specification)
+
+    await inspect_events()
+
+    output = capsys.readouterr().out.strip().split("\n")
+    assert [line.split("|")[0] for line in output] == [f"event_{i}" for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_inspect_events_with_status(generate_models, capsys):
+    await generate_models(complete_specification)
+
+    await inspect_events(EventPublicationStatus.PARTIAL)
+
+    output = capsys.readouterr().out.strip().split("\n")
+    assert len(output) == 1
+    assert output[0].startswith("event_1|")
+    assert "PARTIAL" in output[0]
+
+
+@pytest.mark.asyncio
+async def test_inspect_events_in_snapshot(generate_models, capsys):
+    await generate_models(complete_specification)
+
+    # events are read in the pager thread while the snapshot holds the connection
+    async with snapshot():
+        events = iter_events(page_size=1)
+        await asyncio.wait_for(show_events(await events.__anext__(), events), 5)
+
+    output = capsys.readouterr().out.strip().split("\n")
+    assert [line.split("|")[0] for line in output] == [f"event_{i}" for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_inspect_no_events(capsys):
+    await inspect_events(EventPublicationStatus.COMPLETED)
+
+    assert (
+        capsys.readouterr().out.strip()
+        == f"No event found with status: {EventPublicationStatus.COMPLETED}"
+    )
+
+
+@pytest.mark.parametrize(
+    "status",
+    [
+        None,
+        EventPublicationStatus.WAITING,
+        EventPublicationStatus.COMPLETED,
+        EventPublicationStatus.PARTIAL,
+    ],
+)
+@pytest.mark.asyncio
+async def test_inspect_query_count(generate_models, assert_max_queries, status):
+    await generate_models(complete_specification)
+
+    with assert_max_queries(6):
+        await inspect_events(status)
@@ -0,0 +1,146 @@
+import pytest
+
+from mobilizon_reshare.main import notify
+from mobilizon_reshare.main.notify import (
+    send_pending_notifications,
+    store_failure_notifications,
+)
+from mobilizon_reshare.models.notification import Notification, NotificationStatus
+from mobilizon_reshare.models.publication import Publication, PublicationStatus
+from mobilizon_reshare.publishers import coordinator
+from mobilizon_reshare.publishers.abstract import AbstractPlatform
+from mobilizon_reshare.publishers.coordinator import (
+    BasePublicationReport,
+    EventPublicationReport,
+)
+from mobilizon_reshare.publishers.exceptions import InvalidResponse
+from tests.storage import complete_specification
+
+
+@pytest.fixture
+def failing_notifiers():
+    return set()
+
+
+@pytest.fixture
+def mock_notifiers(monkeypatch, message_collector, failing_notifiers):
+    def _notifier_class(notifier_name):
+        class MockNotifier(AbstractPlatform):
+            name = notifier_name
+
+            def _send(self, message, event=None):
+                if self.name not in failing_notifiers:
+                    message_collector.append(f"{self.name}: {message}")
+
+            def _validate_response(self, response):
+                if self.name in failing_notifiers:
+                    raise InvalidResponse("notifier down")
+
+            def validate_credentials(self):
+                pass
+
+        return MockNotifier
+
+    monkeypatch.setattr(coordinator, "get_notifier_class", _notifier_class)
+    monkeypatch.setattr(notify, "get_active_notifiers", lambda: ["telegram", "zulip"])
+
+
+@pytest.fixture
+async def failure_reports(generate_models):
+    await generate_models(complete_specification)
+    publication = await Publication.get(
+        status=PublicationStatus.FAILED
+    ).prefetch_related("publisher")
+    return [
+        EventPublicationReport(
+            status=PublicationStatus.FAILED,
+            reason="some error",
+            publication=publication,
+        ),
+        BasePublicationReport(status=PublicationStatus.FAILED, reason="recap error"),
+        BasePublicationReport(status=PublicationStatus.COMPLETED, reason=None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_store_failure_notifications(failure_reports, mock_notifiers):
+    await store_failure_notifications(failure_reports)
+
+    notifications = await Notification.all().prefetch_related("target")
+    # 2 failed reports * 2 notifiers
+    assert len(notifications) == 4
+    assert all(n.status == NotificationStatus.WAITING for n in notifications)
+    assert sorted(n.target.name for n in notifications) == [
+        "telegram",
+        "telegram",
+        "zulip",
+        "zulip",
+    ]
+    assert sorted(str(n.publication_id) for n in notifications) == sorted(
+        2 * [str(failure_reports[0].publication.id), "None"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_pending_notifications(
+    failure_reports, mock_notifiers, message_collector
+):
+    await store_failure_notifications(failure_reports)
+
+    await send_pending_notifications()
+
+    assert len(message_collector) == 4
+    assert "telegram: Publication failed with status: 0.\nReason: recap error" in (
+        message_collector
+    )
+    assert all(
+        n.status == NotificationStatus.COMPLETED and n.attempts == 1
+        for n in await Notification.all()
+    )
+
+    # sent notifications aren't sent again
+    await send_pending_notifications()
+    assert len(message_collector) == 4
+
+
+@pytest.mark.asyncio
+async def test_send_pending_notifications_retry(
+    failure_reports, mock_notifiers, message_collector, failing_notifiers
+):
+    failing_notifiers.add("zulip")
+    await store_failure_notifications(failure_reports)
+
+    for attempt in range(1, 5):
+        await send_pending_notifications()
+
+        zulip_notifications = await Notification.filter(target__name="zulip")
+        assert all(n.attempts == attempt for n in zulip_notifications)
+        assert all(n.status == NotificationStatus.WAITING for n in zulip_notifications)
+        assert all(n.last_attempt is not None for n in zulip_notifications)
+
+    # the last attempt
+    await send_pending_notifications()
+    zulip_notifications = await Notification.filter(target__name="zulip")
+    assert all(n.status == NotificationStatus.FAILED for n in zulip_notifications)
+    assert all(n.attempts == 5 for n in zulip_notifications)
+
+    # only the telegram notifications were sent, once
+    assert len(message_collector) == 2
+    assert all(m.startswith("telegram: ") for m in message_collector)
+
+
+@pytest.mark.asyncio
+async def test_lost_notifications_are_retried(
+    failure_reports, mock_notifiers, message_collector, failing_notifiers
+):
+    failing_notifiers.add("zulip")
+    await store_failure_notifications(failure_reports)
+    await send_pending_notifications()
+    failing_notifiers.clear()
+
+    await send_pending_notifications()
+
+    assert len(message_collector) == 4
+    assert all(
+        n.status == NotificationStatus.COMPLETED for n in await Notification.all()
+    )
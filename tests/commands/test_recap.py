@@ -39,3 +39,26 @@ event_1
 
 event_2"""
         assert message_collector == [recap_message]
+
+
+@pytest.mark.parametrize(
+    "publisher_class", [pytest.lazy_fixture("mock_publisher_class")]
+)
+@pytest.mark.parametrize("num_events", [3, 10])
+@pytest.mark.asyncio
+async def test_recap_query_count(
+    mock_publisher_config, mock_now, generate_models, assert_max_queries, num_events
+):
+    await generate_models(
+        {
+            "event": num_events,
+            "publications": [
+                {"event_idx": i, "publisher_idx": 0} for i in range(num_events)
+            ],
+            "publisher": ["zulip"],
+        }
+    )
+
+    # the last one looks for pending notifications
+    with assert_max_queries(4):
+        await recap()
@@ -1,12 +1,14 @@
 from logging import DEBUG
 
+import arrow
 import pytest
 
 from tests.commands.conftest import simple_event_element
 from mobilizon_reshare.event.event import MobilizonEvent, EventPublicationStatus
 from mobilizon_reshare.main.start import start
 from mobilizon_reshare.models.event import Event
-from mobilizon_reshare.models.publication import PublicationStatus
+from mobilizon_reshare.models.publication import Publication, PublicationStatus
+from mobilizon_reshare.models.publisher import Publisher
 
 
 @pytest.mark.asyncio
@@ -179,3 +181,114 @@ async def test_start_publisher_failure(
             MobilizonEvent.from_model(event_model).status
             == EventPublicationStatus.FAILED
         )
+
+
+@pytest.mark.parametrize(
+    "publisher_class", [pytest.lazy_fixture("mock_publisher_class")]
+)
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "elements",
+    [[simple_event_element()], [simple_event_element() for _ in range(10)]],
+)
+@pytest.mark.parametrize("publication_window", [(0, 24)])
+async def test_start_query_count(
+    mock_mobilizon_success_answer,
+    mobilizon_answer,
+    mock_publisher_config,
+    mock_publication_window,
+    assert_max_queries,
+):
+    # the number of queries mustn't grow with the number of events
+    with assert_max_queries(16):
+        await start()
+
+
+@pytest.fixture
+async def failed_publication(
+    mock_publisher_config, event_model_generator, publication_model_generator
+):
+    event = event_model_generator(begin_date=arrow.utcnow().shift(days=1).datetime)
+    await event.save()
+    publication = publication_model_generator(
+        status=PublicationStatus.FAILED,
+        event_id=event.id,
+        publisher_id=(await Publisher.get(name="mock")).id,
+    )
+    publication.next_attempt = arrow.utcnow().shift(minutes=-1).datetime
+    await publication.save()
+    return publication
+
+
+@pytest.mark.parametrize(
+    "publisher_class", [pytest.lazy_fixture("mock_publisher_class")]
+)
+@pytest.mark.asyncio
+@pytest.mark.parametrize("elements", [[]])
+async def test_start_retry(
+    mock_mobilizon_success_answer,
+    mobilizon_answer,
+    failed_publication,
+    message_collector,
+):
+    await start()
+
+    assert message_collector == ["event_1|desc_1"]
+    publication = await Publication.get(id=failed_publication.id)
+    assert publication.status == PublicationStatus.COMPLETED
+    assert publication.attempts == 2
+    assert publication.next_attempt is None
+    assert await Publication.all().count() == 1
+
+
+@pytest.mark.parametrize(
+    "publisher_class", [pytest.lazy_fixture("mock_publisher_invalid_class")]
+)
+@pytest.mark.asyncio
+@pytest.mark.parametrize("elements", [[]])
+@pytest.mark.parametrize("attempts, exhausted", [[1, False], [4, True]])
+async def test_start_retry_failure(
+    mock_mobilizon_success_answer,
+    mobilizon_answer,
+    failed_publication,
+    mock_notifier_config,
+    message_collector,
+    attempts,
+    exhausted,
+):
+    await Publication.filter(id=failed_publication.id).update(attempts=attempts)
+
+    await start()
+
+    publication = await Publication.get(id=failed_publication.id)
+    assert publication.status == PublicationStatus.FAILED
+    assert publication.attempts == attempts + 1
+    if exhausted:
+        assert publication.next_attempt is None
+        # giving up is notified
+        assert len(message_collector) == 2
+    else:
+        # the second retry waits twice as long as the first one
+        assert arrow.get(publication.next_attempt) > arrow.now().shift(seconds=1000)
+        assert not message_collector
+
+
+@pytest.mark.parametrize(
+    "publisher_class", [pytest.lazy_fixture("mock_publisher_class")]
+)
+@pytest.mark.asyncio
+@pytest.mark.parametrize("elements", [[]])
+async def test_start_retry_not_due(
+    mock_mobilizon_success_answer,
+    mobilizon_answer,
+    failed_publication,
+    message_collector,
+):
+    await Publication.filter(id=failed_publication.id).update(
+        next_attempt=arrow.utcnow().shift(minutes=1).datetime
+    )
+
+    await start()
+
+    assert not message_collector
+    assert (await Publication.get(id=failed_publication.id)).attempts == 1
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from mobilizon_reshare.cli.commands.stats.main import main
+from tests.storage import complete_specification
+
+
+@pytest.mark.asyncio
+async def test_stats_table(generate_models, capsys):
+    await generate_models(complete_specification)
+
+    assert await main() == 0
+
+    output = capsys.readouterr().out
+    assert (
+        "Publications by publisher\npublisher  count  completed  success_rate\n"
+        in output
+    )
+    assert "telegram   2      1          0.5\n" in output
+    assert "Median time to first publication: unknown" in output
+
+
+@pytest.mark.asyncio
+async def test_stats_json(generate_models, capsys):
+    await generate_models(complete_specification)
+
+    assert await main("json") == 0
+
+    stats = json.loads(capsys.readouterr().out)
+    assert [row["publisher"] for row in stats["publishers"]] == [
+        "mastodon",
+        "telegram",
+        "twitter",
+    ]
+    assert stats["failure_reasons"] == [
+        {"publisher": "telegram", "reason": None, "count": 1}
+    ]
+    assert stats["median_seconds_to_publication"] is None
+
+
+@pytest.mark.asyncio
+async def test_stats_no_publications(capsys):
+    await main()
+
+    assert "Publications by day\nNo publication found.\n" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+import io
+import json
+
+import arrow
+import pytest
+
+from mobilizon_reshare.main.transfer import export_database, import_database
+from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.models.publication import Publication
+from mobilizon_reshare.models.publisher import Publisher
+from mobilizon_reshare.storage.query.read import iter_event_models
+from mobilizon_reshare.storage.serialization import event_to_dict
+from tests.storage import complete_specification
+
+
+async def dump_events():
+    return [event_to_dict(event) async for event in iter_event_models(Event.all())]
+
+
+@pytest.mark.parametrize("file_format", ["ndjson", "csv"])
+@pytest.mark.asyncio
+async def test_export_import(generate_models, file_format):
+    await generate_models(complete_specification)
+    publication = await Publication.all().order_by("id").first()
+    publication.attempts = 3
+    publication.next_attempt = arrow.get("2021-06-01T10:00:00+00:00").datetime
+    publication.remote_id = "42"
+    await publication.save()
+    expected = await dump_events()
+    file = io.StringIO()
+
+    report = await export_database(file, file_format, page_size=3)
+
+    assert report.events == 4
+    assert report.publications == 6
+
+    await Publication.all().delete()
+    await Event.all().delete()
+    await Publisher.all().delete()
+    file.seek(0)
+    report = await import_database(file, file_format, batch_size=3)
+
+    assert report.events == 4
+    assert report.publications == 6
+    assert await dump_events() == expected
+    imported = await Publication.get(id=publication.id)
+    assert imported.attempts == 3
+    assert imported.next_attempt == publication.next_attempt
+    assert imported.remote_id == "42"
+
+
+@pytest.mark.parametrize("file_format", ["ndjson", "csv"])
+@pytest.mark.asyncio
+async def test_import_is_idempotent(generate_models, file_format):
+    await generate_models(complete_specification)
+    file = io.StringIO()
+    await export_database(file, file_format)
+    expected = await dump_events()
+
+    file.seek(0)
+    report = await import_database(file, file_format)
+
+    assert report.events == 0
+    assert report.publications == 0
+    assert await dump_events() == expected
+
+
+@pytest.mark.asyncio
+async def test_import_known_mobilizon_id(generate_models):
+    await generate_models(complete_specification)
+    event = (await dump_events())[3]
+    # the same Mobilizon event, stored with another id on another host
+    imported_id = "00000000-0000-0000-0000-000000000099"
+    publication = {
+        "id": "00000000-0000-0000-0000-000000000098",
+        "publisher": "zulip",
+        "status": "COMPLETED",
+        "reason": None,
+        "timestamp": "2021-06-01T10:00:00+00:00",
+    }
+    file = io.StringIO(
+        json.dumps({**event, "id": imported_id, "publications": [publication]})
+    )
+
+    report = await import_database(file)
+
+    assert report.events == 0
+    assert report.publications == 1
+    assert await Event.all().count() == 4
+    imported = await Publication.get(id=publication["id"]).prefetch_related(
+        "event", "publisher"
+    )
+    assert str(imported.event.id) == event["id"]
+    assert imported.publisher.name == "zulip"
@@ -1,6 +1,7 @@
 import importlib.resources
 import os
 from collections import UserList
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Union
 from uuid import UUID
@@ -22,6 +23,8 @@ from mobilizon_reshare.publishers.abstract import (
     AbstractEventFormatter,
 )
 from mobilizon_reshare.publishers.exceptions import PublisherError, InvalidResponse
+from mobilizon_reshare.storage.db import get_connection
+from mobilizon_reshare.storage.instrumentation import instrument, collect_query_stats
 from tests import today
 
 
@@ -45,11 +48,14 @@ def generate_notification_status(published):
 def set_dynaconf_environment(request) -> None:
     os.environ["ENV_FOR_DYNACONF"] = "testing"
     os.environ["FORCE_ENV_FOR_DYNACONF"] = "testing"
+    # compiled templates aren't stored by tests
+    os.environ["MOBILIZON_RESHARE_TEMPLATES__cache_dir"] = "@none"
 
     yield None
 
     os.environ["ENV_FOR_DYNACONF"] = ""
     os.environ["FORCE_ENV_FOR_DYNACONF"] = ""
+    del os.environ["MOBILIZON_RESHARE_TEMPLATES__cache_dir"]
 
 
 @pytest.fixture
@@ -107,10 +113,14 @@ def initialize_db_tests() -> None:
     db_url = os.environ.get("TORTOISE_TEST_DB", "sqlite://:memory:")
     initializer(
         [
+            "mobilizon_reshare.models.circuit_breaker",
+            "mobilizon_reshare.models.credential_validation",
             "mobilizon_reshare.models.event",
+            "mobilizon_reshare.models.metadata",
             "mobilizon_reshare.models.notification",
             "mobilizon_reshare.models.publication",
             "mobilizon_reshare.models.publisher",
+            "mobilizon_reshare.models.rate_limit",
         ],
         db_url=db_url,
         app_label="models",
@@ -320,6 +330,9 @@ def mock_formatter_class():
         def validate_message(self, event) -> None:
             pass
 
+        def _validate_message(self, message) -> None:
+            pass
+
         def get_recap_fragment(self, event):
             return event.name
 
@@ -357,3 +370,23 @@ def mock_publisher_invalid_class(message_collector):
 def mock_publisher_invalid(mock_publisher_invalid_class):
 
     return mock_publisher_invalid_class()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fails the test when the code run inside the returned context manager executes more than ``max_queries``
+    statements, i.e. when a query is run for every row instead of once.
+    """
+    instrument(get_connection())
+
+    @contextmanager
+    def _assert_max_queries(max_queries: int):
+        with collect_query_stats(keep_queries=True) as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Expected at most {max_queries} queries, {stats.count} were executed:\n"
+            + "\n".join(stats.queries)
+        )
+
+    return _assert_max_queries
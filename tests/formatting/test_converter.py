@@ -0,0 +1,74 @@
+import pytest
+
+from mobilizon_reshare.formatting.converter import Dialect, convert_html, parse
+from mobilizon_reshare.publishers.platforms.telegram import TelegramFormatter
+
+DESCRIPTION = (
+    "<h3>Program</h3><p>Hi <strong>everyone </strong>! snake_case 1.5<br>second line</p><p></p>"
+    "<ul><li><p>one</p></li><li><p>two <a href='https://example.org/a_(b)'>li_nk</a></p>"
+    "<ul><li>nested</li></ul></li></ul><ol><li>first</li><li>second</li></ol>"
+    "<blockquote><p>Quote</p></blockquote><p><em>italic</em> <s>strike</s> <code>c_d</code></p>"
+)
+
+
+@pytest.mark.parametrize(
+    "dialect, expected_output",
+    [
+        [
+            Dialect.PLAINTEXT,
+            "Program\n\nHi everyone ! snake_case 1.5\nsecond line\n\n- one\n- two li_nk\n  - nested\n\n"
+            "1. first\n2. second\n\nQuote\n\nitalic strike c_d",
+        ],
+        [
+            Dialect.MARKDOWN,
+            "### Program\n\nHi **everyone** ! snake\\_case 1.5  \nsecond line\n\n* one\n"
+            "* two [li\\_nk](https://example.org/a_%28b%29)\n  * nested\n\n1. first\n2. second\n\n"
+            "> Quote\n\n*italic* ~~strike~~ `c_d`",
+        ],
+        [
+            Dialect.ZULIP,
+            "### Program\n\nHi **everyone** ! snake\\_case 1.5\nsecond line\n\n* one\n"
+            "* two [li\\_nk](https://example.org/a_%28b%29)\n  * nested\n\n1. first\n2. second\n\n"
+            "> Quote\n\n*italic* ~~strike~~ `c_d`",
+        ],
+        [
+            Dialect.TELEGRAM,
+            "*Program*\n\nHi *everyone* \\! snake\\_case 1\\.5\nsecond line\n\n• one\n"
+            "• two [li\\_nk](https://example.org/a_%28b%29)\n  • nested\n\n1\\. first\n2\\. second\n\n"
+            "\\> Quote\n\n_italic_ strike c\\_d",
+        ],
+    ],
+)
+def test_convert_html(dialect, expected_output):
+    assert convert_html(DESCRIPTION, dialect) == expected_output
+
+
+@pytest.mark.parametrize("content", [None, ""])
+def test_convert_html_empty(content):
+    assert convert_html(content, Dialect.MARKDOWN) == content
+
+
+def test_convert_html_drops_comments_and_scripts():
+    assert (
+        convert_html("<p>a<!-- comment --><script>b</script> c</p>", Dialect.PLAINTEXT)
+        == "a c"
+    )
+
+
+def test_telegram_dialect_escaped_once():
+    message = convert_html(DESCRIPTION, Dialect.TELEGRAM)
+
+    assert (
+        TelegramFormatter.escape_message(TelegramFormatter.mark_escapes(message))
+        == message
+    )
+
+
+def test_parsed_once():
+    content = "<p>Parsed <em>once</em></p>"
+    misses = parse.cache_info().misses
+
+    for dialect in Dialect:
+        convert_html(content, dialect)
+
+    assert parse.cache_info().misses == misses + 1
@@ -1,4 +1,5 @@
 import pytest
+from bs4 import GuessedAtParserWarning
 
 from mobilizon_reshare.formatting.description import html_to_markdown
 
@@ -11,7 +12,7 @@ from mobilizon_reshare.formatting.description import html_to_markdown
         [
             "<p>Some description <em>abc</em></p><p></p><p><strong>Bold</strong></p><p></p>"
             "<p><em>Italic</em></p><p></p><blockquote><p>Quote</p></blockquote>",
-            """Some description *abc*\n\n**Bold**\n\n*Italic*\n\n\n\\> Quote\n\\> \n\\>""",
+            "Some description *abc*\n\n**Bold**\n\n*Italic*\n\n> Quote",
         ],
         [
             "<p><a href='https://some_link.com'>Some Link</a></p>",
@@ -21,3 +22,8 @@ from mobilizon_reshare.formatting.description import html_to_markdown
 )
 def test_html_to_markdown(description, expected_output):
     assert html_to_markdown(description) == expected_output
+
+
+def test_html_to_markdown_no_parser_warning(recwarn):
+    html_to_markdown("<p>Not cached yet</p>")
+    assert not [w for w in recwarn if issubclass(w.category, GuessedAtParserWarning)]
@@ -170,6 +170,11 @@ async def test_mobilizon_event_from_model(
         ),
         ([PublicationStatus.FAILED], EventPublicationStatus.FAILED),
         ([], EventPublicationStatus.WAITING),
+        ([PublicationStatus.WAITING], EventPublicationStatus.WAITING),
+        (
+            [PublicationStatus.COMPLETED, PublicationStatus.WAITING],
+            EventPublicationStatus.COMPLETED,
+        ),
     ],
 )
 @pytest.mark.asyncio
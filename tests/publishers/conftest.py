@@ -6,6 +6,7 @@ import arrow
 import pytest
 
 import mobilizon_reshare.storage.query.read
+import mobilizon_reshare.storage.query.write
 from mobilizon_reshare.event.event import MobilizonEvent
 from mobilizon_reshare.models.publisher import Publisher
 from mobilizon_reshare.publishers.abstract import (
@@ -94,5 +95,10 @@ async def mock_active_publishers_config(monkeypatch):
         "get_active_publishers",
         _mock_active_pub
     )
+    monkeypatch.setattr(
+        mobilizon_reshare.storage.query.write,
+        "get_active_publishers",
+        _mock_active_pub
+    )
 
     return p
@@ -0,0 +1,130 @@
+from uuid import UUID
+
+import arrow
+import pytest
+import requests
+
+from mobilizon_reshare.models.circuit_breaker import CircuitBreakerState
+from mobilizon_reshare.models.publication import PublicationStatus
+from mobilizon_reshare.publishers.abstract import EventPublication
+from mobilizon_reshare.publishers.circuit_breaker import (
+    CircuitBreaker,
+    is_platform_failure,
+)
+from mobilizon_reshare.publishers.coordinator import PublisherCoordinator
+from mobilizon_reshare.publishers.exceptions import (
+    InvalidEvent,
+    PlatformTimeout,
+    PlatformUnavailable,
+    PublisherError,
+    RateLimited,
+    RejectedCredentials,
+)
+
+
+def wrapped(error):
+    try:
+        raise PublisherError(str(error)) from error
+    except PublisherError as e:
+        return e
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        [None, False],
+        [PlatformUnavailable("down"), True],
+        [PlatformTimeout("slow"), True],
+        [PublisherError("server error"), True],
+        [RateLimited("throttled"), False],
+        [RejectedCredentials("rejected"), False],
+        [wrapped(InvalidEvent("invalid")), False],
+        [wrapped(requests.ConnectionError("down")), True],
+    ],
+)
+def test_is_platform_failure(error, expected):
+    assert is_platform_failure(error) == expected
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens(mock_publisher_valid):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+
+    await breaker.record(mock_publisher_valid, PlatformUnavailable("down"))
+    assert await breaker.get_skip_reason(mock_publisher_valid) is None
+    await breaker.record(mock_publisher_valid, PlatformUnavailable("down"))
+
+    # the state is shared with the following runs
+    reason = await CircuitBreaker(2, 60).get_skip_reason(mock_publisher_valid)
+    assert reason.startswith("Skipped: mock failed 2 times in a row")
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_success_resets(mock_publisher_valid):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+
+    await breaker.record(mock_publisher_valid, PlatformUnavailable("down"))
+    await breaker.record(mock_publisher_valid, None)
+    await breaker.record(mock_publisher_valid, PlatformUnavailable("down"))
+
+    assert await breaker.get_skip_reason(mock_publisher_valid) is None
+    assert (await CircuitBreakerState.get(key="mock")).failures == 1
+
+
+@pytest.mark.parametrize(
+    "probe_error, reopened", [[None, False], [PlatformUnavailable("down"), True]]
+)
+@pytest.mark.asyncio
+async def test_circuit_breaker_half_open(mock_publisher_valid, probe_error, reopened):
+    await CircuitBreakerState.create(
+        key="mock", failures=3, opened_until=arrow.utcnow().shift(seconds=-1).datetime
+    )
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+
+    # a single attempt is let through
+    assert await breaker.get_skip_reason(mock_publisher_valid) is None
+    assert "being tried again" in await breaker.get_skip_reason(mock_publisher_valid)
+
+    await breaker.record(mock_publisher_valid, probe_error)
+
+    state = await CircuitBreakerState.get(key="mock")
+    assert (state.opened_until is not None) == reopened
+    assert state.failures == (4 if reopened else 0)
+    assert (await breaker.get_skip_reason(mock_publisher_valid) is not None) == reopened
+
+
+@pytest.mark.asyncio
+async def test_coordinator_skips_open_circuit(
+    mock_publisher_class, mock_formatter_valid, event, message_collector
+):
+    class UnavailablePublisher(mock_publisher_class):
+        name = "unavailable"
+
+        def _send(self, message, event):
+            raise requests.ConnectionError("connection refused")
+
+    publications = [
+        EventPublication(publisher, mock_formatter_valid, event, UUID(int=i))
+        for i, publisher in enumerate([UnavailablePublisher(), mock_publisher_class()])
+    ]
+
+    reports = []
+    for _ in range(2):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+        reports.append(
+            (
+                await PublisherCoordinator(publications, circuit_breaker=breaker).run()
+            ).reports
+        )
+
+    first, second = reports
+    assert first[0].status == PublicationStatus.FAILED
+    assert "Can't reach unavailable" in first[0].reason
+    assert not first[0].skipped
+    assert second[0].status == PublicationStatus.FAILED
+    assert second[0].skipped
+    assert second[0].reason.startswith("Skipped: unavailable failed 1 times in a row")
+    assert [r.status for r in (first[1], second[1])] == [
+        PublicationStatus.COMPLETED
+    ] * 2
+    assert len(message_collector) == 2
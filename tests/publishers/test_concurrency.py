@@ -0,0 +1,145 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from mobilizon_reshare.publishers.concurrency import (
+    get_executor,
+    run_concurrently,
+    run_in_thread,
+    shutdown_executor,
+)
+from mobilizon_reshare.publishers.exceptions import PlatformTimeout
+
+
+@pytest.mark.asyncio
+async def test_run_concurrently_keeps_order():
+    async def f(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    outcomes = await run_concurrently(f, [0.03, 0.01, 0.02])
+
+    assert [o.result for o in outcomes] == [0.03, 0.01, 0.02]
+    assert all(o.error is None for o in outcomes)
+    assert outcomes[0].elapsed >= 0.03
+
+
+@pytest.mark.asyncio
+async def test_run_concurrently_errors():
+    async def f(item):
+        if item == 1:
+            raise ValueError("error")
+        return item
+
+    outcomes = await run_concurrently(f, [0, 1, 2])
+
+    assert [o.result for o in outcomes] == [0, None, 2]
+    assert isinstance(outcomes[1].error, ValueError)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2, 4])
+@pytest.mark.asyncio
+async def test_run_concurrently_max_workers(max_workers):
+    running = []
+    peak = []
+
+    async def f(item):
+        running.append(item)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(item)
+
+    await run_concurrently(f, range(6), max_workers=max_workers)
+
+    assert max(peak) == max_workers
+
+
+@pytest.mark.asyncio
+async def test_run_concurrently_timeout():
+    release = threading.Event()
+
+    async def f(item):
+        if item == "hanging":
+            await run_in_thread(release.wait, 5)
+        return item
+
+    start = time.monotonic()
+    outcomes = await run_concurrently(
+        f, ["hanging", "a", "b"], max_workers=1, timeout=0.05
+    )
+    release.set()
+
+    assert time.monotonic() - start < 1
+    assert isinstance(outcomes[0].error, PlatformTimeout)
+    assert outcomes[0].elapsed >= 0.05
+    # the other items are published once the hanging one is abandoned
+    assert [o.result for o in outcomes[1:]] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_run_in_thread_does_not_block_loop():
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.ensure_future(tick())
+    await run_in_thread(time.sleep, 0.1)
+    ticker.cancel()
+
+    assert len(ticks) > 2
+
+
+@pytest.mark.asyncio
+async def test_run_in_thread_context_and_errors():
+    var = contextvars.ContextVar("var")
+    var.set("value")
+
+    assert await run_in_thread(var.get) == "value"
+    with pytest.raises(ZeroDivisionError):
+        await run_in_thread(lambda: 1 / 0)
+
+
+@pytest.mark.asyncio
+async def test_run_in_thread_bounded():
+    shutdown_executor()
+    max_workers = get_executor()._max_workers
+    release = threading.Event()
+    threads = set()
+
+    def f():
+        threads.add(threading.current_thread())
+        release.wait(5)
+
+    # calls abandoned after a timeout keep their thread, the following ones wait for a free one
+    tasks = [asyncio.ensure_future(run_in_thread(f)) for _ in range(max_workers * 2)]
+    await asyncio.sleep(0.05)
+    assert len(threads) == max_workers
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert len(threads) == max_workers
+
+
+@pytest.mark.asyncio
+async def test_shutdown_executor_cancels_pending_calls():
+    shutdown_executor()
+    max_workers = get_executor()._max_workers
+    release = threading.Event()
+    tasks = [
+        asyncio.ensure_future(run_in_thread(release.wait, 5))
+        for _ in range(max_workers + 1)
+    ]
+    await asyncio.sleep(0.05)
+
+    shutdown_executor()
+    release.set()
+
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(outcome is True for outcome in outcomes[:max_workers])
+    assert isinstance(outcomes[-1], asyncio.CancelledError)
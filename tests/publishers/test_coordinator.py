@@ -1,8 +1,10 @@
-import logging
+import asyncio
+import dataclasses
+import threading
+import time
 from uuid import UUID
 
 import pytest
-from asynctest import MagicMock
 
 from mobilizon_reshare.event.event import MobilizonEvent
 from mobilizon_reshare.models.publication import (
@@ -11,26 +13,17 @@ from mobilizon_reshare.models.publication import (
 )
 from mobilizon_reshare.models.publisher import Publisher
 from mobilizon_reshare.publishers.abstract import EventPublication, RecapPublication
+from mobilizon_reshare.publishers.exceptions import InvalidMessage
+from mobilizon_reshare.publishers.retry import RetryPolicy
+from mobilizon_reshare.storage.query.write import save_publication_report
 from mobilizon_reshare.publishers.coordinator import (
     PublisherCoordinatorReport,
     EventPublicationReport,
     PublisherCoordinator,
-    PublicationFailureNotifiersCoordinator,
     RecapCoordinator,
 )
 
 
-@pytest.fixture()
-def failure_report(mock_publisher_invalid):
-    return EventPublicationReport(
-        status=PublicationStatus.FAILED,
-        reason="some failure",
-        publication=EventPublication(
-            publisher=mock_publisher_invalid, formatter=None, event=None, id=UUID(int=1)
-        ),
-    )
-
-
 @pytest.mark.parametrize(
     "statuses, successful",
     [
@@ -109,11 +102,30 @@ async def test_publication_coordinator_run_success(
     coordinator = PublisherCoordinator(
         publications=mock_publications,
     )
-    report = coordinator.run()
+    report = await coordinator.run()
     assert len(report.reports) == 2
     assert report.successful, "\n".join(map(lambda rep: rep.reason, report.reports))
 
 
+@pytest.mark.parametrize("num_publications", [2])
+@pytest.mark.asyncio
+async def test_publication_coordinator_on_published(
+    mock_publications, mock_publisher_valid
+):
+    mock_publisher_valid._get_remote_id = lambda response: "42"
+    published = []
+
+    async def on_published(publication, result):
+        published.append((publication.id, result.remote_id))
+
+    report = await PublisherCoordinator(
+        mock_publications, on_published=on_published
+    ).run()
+
+    assert sorted(published) == [(p.id, "42") for p in mock_publications]
+    assert [r.remote_id for r in report.reports] == ["42", "42"]
+
+
 @pytest.mark.parametrize("num_publications", [1])
 @pytest.mark.asyncio
 async def test_publication_coordinator_run_failure(
@@ -124,7 +136,7 @@ async def test_publication_coordinator_run_failure(
         pub.formatter = mock_formatter_invalid
     coordinator = PublisherCoordinator(mock_publications)
 
-    report = coordinator.run()
+    report = await coordinator.run()
     assert len(report.reports) == 1
     assert not report.successful
     assert list(report.reports)[0].reason == "credentials error, Invalid event error"
@@ -139,59 +151,225 @@ async def test_publication_coordinator_run_failure_response(
     for pub in mock_publications:
         pub.publisher = mock_publisher_invalid_response
     coordinator = PublisherCoordinator(publications=mock_publications)
-    report = coordinator.run()
+    report = await coordinator.run()
     assert len(report.reports) == 1
     assert not report.successful
     assert list(report.reports)[0].reason == "Invalid response"
 
 
+@pytest.mark.parametrize("num_publications", [2])
 @pytest.mark.asyncio
-async def test_notifier_coordinator_publication_failed(
-    mock_publisher_valid, failure_report
+async def test_recap_coordinator_run_success(
+    mock_recap_publications, message_collector
 ):
-    mock_send = MagicMock()
-    mock_publisher_valid._send = mock_send
-    coordinator = PublicationFailureNotifiersCoordinator(
-        failure_report, [mock_publisher_valid, mock_publisher_valid]
+    coordinator = RecapCoordinator(recap_publications=mock_recap_publications)
+    report = await coordinator.run()
+
+    # one recap per publication
+    assert len(message_collector) == 2
+
+    # check that header is in all messages
+    assert all(("Upcoming" in message) for message in message_collector)
+
+    assert len(report.reports) == 2
+    assert report.successful, "\n".join(map(lambda rep: rep.reason, report.reports))
+
+
+@pytest.fixture
+def short_recap_publication(test_event, mock_publisher_valid, mock_formatter_class):
+    class ShortMessageFormatter(mock_formatter_class):
+        def _validate_message(self, message) -> None:
+            if len(message) >= 20:
+                raise InvalidMessage("Message is too long")
+
+    def _short_recap_publication(names):
+        return RecapPublication(
+            publisher=mock_publisher_valid,
+            formatter=ShortMessageFormatter(),
+            events=[dataclasses.replace(test_event, name=name) for name in names],
+        )
+
+    return _short_recap_publication
+
+
+@pytest.mark.parametrize(
+    "names, max_fragments, expected_messages",
+    [
+        [["event_0"], None, ["Upcoming\n\nevent_0"]],
+        [
+            ["event_0", "event_1", "event_2"],
+            None,
+            ["Upcoming\n\nevent_0", "event_1\n\nevent_2"],
+        ],
+        [["event_0", "event_1", "event_2"], 2, ["Upcoming\n\nevent_0", "event_1"]],
+        # the header is sent on its own if the first event doesn't fit with it
+        [
+            ["a" * 15, "b" * 5, "c" * 5],
+            None,
+            ["Upcoming", "a" * 15, "b" * 5 + "\n\n" + "c" * 5],
+        ],
+        # events that don't fit in a message on their own are left out
+        [["event_0", "a" * 20, "event_2"], None, ["Upcoming\n\nevent_0", "event_2"]],
+    ],
+)
+@pytest.mark.asyncio
+async def test_recap_coordinator_split(
+    short_recap_publication, message_collector, names, max_fragments, expected_messages
+):
+    coordinator = RecapCoordinator(
+        recap_publications=[short_recap_publication(names)],
+        max_fragments=max_fragments,
     )
-    coordinator.notify_failure()
+    report = await coordinator.run()
+
+    assert report.successful
+    assert list(message_collector) == expected_messages
+
 
-    # 4 = 2 reports * 2 notifiers
-    assert mock_send.call_count == 2
+@pytest.mark.asyncio
+async def test_recap_coordinator_nothing_fits(
+    short_recap_publication, message_collector
+):
+    coordinator = RecapCoordinator(
+        recap_publications=[short_recap_publication(["a" * 20])]
+    )
+    report = await coordinator.run()
+
+    assert not report.successful
+    assert report.reports[0].reason == "None of the events fits in a recap message"
+    assert not message_collector
 
 
+@pytest.mark.parametrize("num_publications", [3])
 @pytest.mark.asyncio
-async def test_notifier_coordinator_error(
-    failure_report, mock_publisher_invalid_response, caplog
+async def test_publication_coordinator_run_concurrently(
+    mock_publications, mock_publisher_valid
 ):
-    mock_send = MagicMock()
-    mock_publisher_invalid_response._send = mock_send
+    def slow_send(message, event=None):
+        time.sleep(0.1)
 
-    coordinator = PublicationFailureNotifiersCoordinator(
-        failure_report,
-        [mock_publisher_invalid_response, mock_publisher_invalid_response],
+    mock_publisher_valid._send = slow_send
+    coordinator = PublisherCoordinator(publications=mock_publications)
+
+    start = time.monotonic()
+    report = await coordinator.run()
+
+    assert time.monotonic() - start < 0.25
+    assert report.successful
+    assert [r.publication for r in report.reports] == mock_publications
+    assert all(r.elapsed >= 0.1 for r in report.reports)
+
+
+@pytest.mark.parametrize("num_publications", [2])
+@pytest.mark.asyncio
+async def test_publication_coordinator_run_timeout(
+    mock_publications, mock_publisher_valid
+):
+    release = threading.Event()
+
+    def hanging_send(message, event=None):
+        release.wait(5)
+
+    mock_publisher_valid._send = hanging_send
+    report = await PublisherCoordinator(
+        publications=mock_publications, timeout=0.05
+    ).run()
+    release.set()
+
+    assert [r.status for r in report.reports] == [PublicationStatus.FAILED] * 2
+    assert report.reports[0].reason == (
+        "Timed out after 0.05 seconds while sending, check whether the event was posted"
     )
-    with caplog.at_level(logging.CRITICAL):
-        coordinator.notify_failure()
-        assert "Notifier failed to send" in caplog.text
-        assert failure_report.get_failure_message() in caplog.text
-    # 4 = 2 reports * 2 notifiers
-    assert mock_send.call_count == 2
+
+
+@pytest.mark.parametrize("num_publications", [1])
+@pytest.mark.parametrize("idempotent", [False, True])
+@pytest.mark.asyncio
+async def test_publication_coordinator_timeout_while_sending(
+    mock_publications, mock_publisher_valid, message_collector, idempotent
+):
+    release = threading.Event()
+
+    def hanging_send(message, event=None, **kwargs):
+        release.wait(5)
+        message_collector.append(message)
+
+    mock_publisher_valid._send = hanging_send
+    mock_publisher_valid.idempotent = idempotent
+    await Publisher.create(name="mock")
+    report = await PublisherCoordinator(
+        publications=mock_publications, timeout=0.05
+    ).run()
+    await save_publication_report(report, RetryPolicy(max_attempts=3, backoff=600))
+    # the abandoned send posts the event all the same
+    release.set()
+    while not message_collector:
+        await asyncio.sleep(0.01)
+
+    publication = await PublicationModel.get(id=mock_publications[0].id)
+    assert publication.status == PublicationStatus.FAILED
+    assert report.reports[0].outcome_unknown
+    # only a platform ignoring the repeated request is retried
+    assert report.reports[0].retriable == idempotent
+    assert (publication.next_attempt is not None) == idempotent
+
+
+@pytest.mark.parametrize("num_publications", [1])
+@pytest.mark.asyncio
+async def test_publication_coordinator_timeout_while_validating(
+    mock_publications, mock_publisher_valid, message_collector
+):
+    release = threading.Event()
+
+    def hanging_validate_credentials():
+        release.wait(5)
+
+    mock_publisher_valid.validate_credentials = hanging_validate_credentials
+    report = await PublisherCoordinator(
+        publications=mock_publications, timeout=0.05
+    ).run()
+    release.set()
+
+    # nothing was sent, so that publishing again is safe
+    assert report.reports[0].reason == "Timed out after 0.05 seconds"
+    assert report.reports[0].retriable
 
 
 @pytest.mark.parametrize("num_publications", [2])
 @pytest.mark.asyncio
-async def test_recap_coordinator_run_success(
-    mock_recap_publications, message_collector
+async def test_publication_coordinator_invalid_platform_is_skipped(
+    mock_publications, mock_publisher_invalid, message_collector
 ):
-    coordinator = RecapCoordinator(recap_publications=mock_recap_publications)
-    report = coordinator.run()
+    mock_publications[0].publisher = mock_publisher_invalid
 
-    # one recap per publication
-    assert len(message_collector) == 2
+    report = await PublisherCoordinator(publications=mock_publications).run()
 
-    # check that header is in all messages
-    assert all(("Upcoming" in message) for message in message_collector)
+    assert [r.status for r in report.reports] == [
+        PublicationStatus.FAILED,
+        PublicationStatus.COMPLETED,
+    ]
+    assert report.reports[0].reason == "credentials error"
+    # the valid platform is published to anyway
+    assert len(message_collector) == 1
 
-    assert len(report.reports) == 2
-    assert report.successful, "\n".join(map(lambda rep: rep.reason, report.reports))
+
+@pytest.mark.parametrize("num_publications", [2])
+@pytest.mark.asyncio
+async def test_publication_coordinator_posting_overlaps_validation(
+    mock_publications, mock_publisher_valid, mock_publisher_class
+):
+    validated = threading.Event()
+
+    class SlowPublisher(mock_publisher_class):
+        def validate_credentials(self):
+            # completes only after the other platform has posted
+            validated.wait(5)
+
+    mock_publications[0].publisher = SlowPublisher()
+    mock_publisher_valid._send = lambda message, event=None: validated.set()
+
+    start = time.monotonic()
+    report = await PublisherCoordinator(publications=mock_publications).run()
+
+    assert time.monotonic() - start < 1
+    assert report.successful
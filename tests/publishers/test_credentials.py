@@ -0,0 +1,105 @@
+from uuid import UUID
+
+import arrow
+import pytest
+
+from mobilizon_reshare.models.credential_validation import CredentialValidation
+from mobilizon_reshare.models.publication import PublicationStatus
+from mobilizon_reshare.publishers.abstract import EventPublication
+from mobilizon_reshare.publishers.coordinator import PublisherCoordinator
+from mobilizon_reshare.publishers.credentials import (
+    CredentialsCache,
+    get_credentials_fingerprint,
+)
+from mobilizon_reshare.publishers.exceptions import InvalidCredentials
+
+
+@pytest.fixture
+def validations():
+    return []
+
+
+@pytest.fixture
+def configured_publisher(mock_publisher_class, validations):
+    class ConfiguredPublisher(mock_publisher_class):
+        _conf = ("publisher", "telegram")
+        rejected = False
+
+        def validate_credentials(self):
+            validations.append(self.name)
+
+        def _send(self, message, event):
+            if self.rejected:
+                raise InvalidCredentials("unauthorized")
+            super()._send(message, event)
+
+    return ConfiguredPublisher()
+
+
+@pytest.fixture
+def publish(configured_publisher, mock_formatter_valid, test_event):
+    async def _publish(cache):
+        publication = EventPublication(
+            configured_publisher, mock_formatter_valid, test_event, UUID(int=1)
+        )
+        return await PublisherCoordinator([publication], credentials_cache=cache).run()
+
+    return _publish
+
+
+@pytest.mark.asyncio
+async def test_validation_is_cached(publish, validations):
+    assert (await publish(CredentialsCache(ttl=3600))).successful
+    assert (await publish(CredentialsCache(ttl=3600))).successful
+
+    assert validations == ["mock"]
+    validation = await CredentialValidation.get()
+    assert validation.platform == "publisher.telegram"
+
+
+@pytest.mark.asyncio
+async def test_revalidate(publish, validations):
+    await publish(CredentialsCache(ttl=3600))
+    await publish(CredentialsCache(ttl=3600, revalidate=True))
+
+    assert validations == ["mock", "mock"]
+
+
+@pytest.mark.asyncio
+async def test_expired_validation(publish, validations):
+    await publish(CredentialsCache(ttl=3600))
+    await CredentialValidation.all().update(
+        validated_at=arrow.now().shift(hours=-2).datetime
+    )
+    await publish(CredentialsCache(ttl=3600))
+
+    assert validations == ["mock", "mock"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache(publish, validations):
+    await publish(CredentialsCache(ttl=0))
+    await publish(CredentialsCache(ttl=0))
+
+    assert validations == ["mock", "mock"]
+    assert await CredentialValidation.all().count() == 0
+
+
+@pytest.mark.asyncio
+async def test_auth_error_invalidates(publish, validations, configured_publisher):
+    await publish(CredentialsCache(ttl=3600))
+    configured_publisher.rejected = True
+
+    report = await publish(CredentialsCache(ttl=3600))
+
+    assert report.reports[0].status == PublicationStatus.FAILED
+    assert report.reports[0].reason == "unauthorized"
+    assert await CredentialValidation.all().count() == 0
+
+
+def test_credentials_fingerprint(configured_publisher, mock_publisher_valid):
+    fingerprint = get_credentials_fingerprint(configured_publisher)
+
+    assert fingerprint == get_credentials_fingerprint(type(configured_publisher)())
+    # platforms without settings can't be cached
+    assert get_credentials_fingerprint(mock_publisher_valid) is None
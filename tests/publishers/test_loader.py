@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from mobilizon_reshare.publishers.loader import LazyLoader
+
+
+@pytest.mark.asyncio
+async def test_lazy_loader_loads_once():
+    calls = []
+
+    async def load():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return {"key": "value"}
+
+    loader = LazyLoader(load)
+    assert loader.value is None
+
+    results = await asyncio.gather(loader.get(), loader.get(), loader.get())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert loader.value == {"key": "value"}
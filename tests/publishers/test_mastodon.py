@@ -1,5 +1,6 @@
 import pytest
 import requests
+import responses
 
 from mobilizon_reshare.publishers.exceptions import (
     InvalidEvent,
@@ -67,3 +68,24 @@ def test_validate_response_server_error():
         MastodonPublisher()._validate_response(response)
 
     e.match("500 Server Error")
+
+
+@pytest.fixture
+def mastodon_publisher(monkeypatch):
+    publisher = MastodonPublisher()
+    monkeypatch.setitem(publisher.conf, "instance", "https://mastodon.example")
+    return publisher
+
+
+@responses.activate
+def test_send_idempotency_key(mastodon_publisher):
+    responses.add(
+        responses.POST,
+        "https://mastodon.example/api/v1/statuses",
+        json={"id": "103704874086360371"},
+    )
+
+    result = mastodon_publisher.send("message", idempotency_key="key")
+
+    assert responses.calls[0].request.headers["Idempotency-Key"] == "key"
+    assert result.remote_id == "103704874086360371"
@@ -0,0 +1,118 @@
+import asyncio
+import io
+
+import pytest
+import responses
+
+from mobilizon_reshare.publishers.media import MediaCache, resize_image
+
+IMAGE_URL = "https://mobilizon.example/media/image.jpg"
+# a 1x1 PNG, that Pillow can decode when it's installed
+IMAGE = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde"
+    b"\x00\x00\x00\x0cIDATx\x9cc```\x00\x00\x00\x04\x00\x01\xf6\x178U\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+@pytest.fixture
+def media_cache(tmp_path):
+    caches = []
+
+    def _media_cache():
+        cache = MediaCache(
+            cache_dir=str(tmp_path),
+            max_size=100,
+            max_bytes=1000,
+            max_workers=2,
+            timeout=5,
+        )
+        caches.append(cache)
+        return cache
+
+    yield _media_cache
+    for cache in caches:
+        cache.close()
+
+
+@pytest.fixture(autouse=True)
+def mocked_responses():
+    # activated for the whole test, since the images are downloaded from other threads
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as mock:
+        yield mock
+
+
+def add_image(mock, url=IMAGE_URL, body=IMAGE, **kwargs):
+    mock.add(
+        responses.GET,
+        url,
+        body=body,
+        content_type=kwargs.pop("content_type", "image/png"),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_downloaded_once(media_cache, mocked_responses):
+    add_image(mocked_responses)
+    cache = media_cache()
+
+    first, second = await asyncio.gather(cache.get(IMAGE_URL), cache.get(IMAGE_URL))
+
+    assert first == second
+    assert first.path.read_bytes() == IMAGE
+    assert first.content_type == "image/png"
+    assert len(mocked_responses.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_revalidated_with_etag(media_cache, mocked_responses):
+    add_image(mocked_responses, headers={"ETag": '"v1"'})
+    mocked_responses.add(responses.GET, IMAGE_URL, status=304)
+
+    media = await media_cache().get(IMAGE_URL)
+    # a following run only asks whether the image changed
+    cached = await media_cache().get(IMAGE_URL)
+
+    assert cached == media
+    assert mocked_responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert len(mocked_responses.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_content_addressed(media_cache, mocked_responses):
+    add_image(mocked_responses)
+    add_image(mocked_responses, url="https://other.example/image.jpg")
+    cache = media_cache()
+
+    media = await cache.get(IMAGE_URL)
+    other = await cache.get("https://other.example/image.jpg")
+
+    assert media.path == other.path
+    assert len(list(media.path.parent.iterdir())) == 1
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"body": b"not an image", "content_type": "text/html"},
+        {"body": b"x" * 2000},
+        {"status": 404},
+    ],
+)
+@pytest.mark.asyncio
+async def test_invalid_image(media_cache, mocked_responses, kwargs):
+    add_image(mocked_responses, **kwargs)
+
+    assert await media_cache().get(IMAGE_URL) is None
+
+
+def test_resize_image():
+    image_module = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    image_module.new("RGB", (400, 200)).save(output, format="PNG")
+
+    resized = resize_image(output.getvalue(), 100)
+
+    with image_module.open(io.BytesIO(resized)) as image:
+        assert image.size == (100, 50)
+        assert image.format == "PNG"
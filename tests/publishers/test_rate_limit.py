@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from mobilizon_reshare.models.rate_limit import RateLimitState
+from mobilizon_reshare.publishers.abstract import SendResult
+from mobilizon_reshare.publishers.exceptions import RateLimited
+from mobilizon_reshare.publishers.rate_limit import (
+    DEFAULT_RETRY_AFTER,
+    RateLimitHint,
+    RateLimiter,
+    TokenBucket,
+    get_rate_limit_key,
+    parse_rate_limit_headers,
+)
+
+NOW = 1_600_000_000.0
+
+
+@pytest.mark.parametrize(
+    "status_code, headers, expected",
+    [
+        [200, {}, None],
+        [429, {"Retry-After": "30"}, RateLimitHint(retry_after=30)],
+        [
+            429,
+            {"Retry-After": "Sun, 13 Sep 2020 12:43:20 GMT"},
+            RateLimitHint(retry_after=1000),
+        ],
+        [429, {}, RateLimitHint(retry_after=DEFAULT_RETRY_AFTER)],
+        # Zulip
+        [
+            200,
+            {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": str(NOW + 20)},
+            RateLimitHint(remaining=10, reset_after=20),
+        ],
+        # Mastodon
+        [
+            429,
+            {
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": "2020-09-13T12:26:50.000Z",
+            },
+            RateLimitHint(retry_after=10, remaining=0, reset_after=10),
+        ],
+        # Twitter
+        [200, {"x-rate-limit-remaining": "5"}, RateLimitHint(remaining=5)],
+    ],
+)
+def test_parse_rate_limit_headers(status_code, headers, expected):
+    assert (
+        parse_rate_limit_headers(status_code, CaseInsensitiveDict(headers), now=NOW)
+        == expected
+    )
+
+
+def test_token_bucket():
+    bucket = TokenBucket(capacity=2, period=10)
+
+    for _ in range(2):
+        assert bucket.get_wait(NOW) == 0
+        bucket.take(NOW)
+    assert bucket.get_wait(NOW) == pytest.approx(5)
+    # a token every 5 seconds
+    assert bucket.get_wait(NOW + 5) == 0
+
+
+def test_token_bucket_hints():
+    bucket = TokenBucket(capacity=10, period=10)
+
+    bucket.apply(RateLimitHint(remaining=1), NOW)
+    bucket.take(NOW)
+    assert bucket.get_wait(NOW) == pytest.approx(1)
+
+    bucket.apply(RateLimitHint(retry_after=30), NOW)
+    assert bucket.get_wait(NOW) == 30
+
+
+def test_unlimited_bucket():
+    bucket = TokenBucket(capacity=None, period=None)
+    for _ in range(100):
+        bucket.take(NOW)
+    assert bucket.get_wait(NOW) == 0
+
+    bucket.apply(RateLimitHint(remaining=0, reset_after=10), NOW)
+    assert bucket.get_wait(NOW) == 10
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def limited_publisher(mock_publisher_class, sent):
+    class LimitedPublisher(mock_publisher_class):
+        name = "telegram"
+        _conf = ("publisher", "telegram")
+        _account_fields = ("token",)
+        hint = None
+
+        def send(self, message, event=None, idempotency_key=None, media=None):
+            sent.append(time.monotonic())
+            if self.hint and self.hint.retry_after:
+                raise RateLimited("throttled", self.hint)
+            return SendResult(rate_limit=self.hint)
+
+    return LimitedPublisher()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits(limited_publisher, sent):
+    limiter = RateLimiter({"telegram": {"requests": 2, "period": 0.2}}, max_wait=1)
+
+    await asyncio.gather(*(limiter.send(limited_publisher, "m") for _ in range(3)))
+
+    assert sent[2] - sent[0] >= 0.09
+    state = await RateLimitState.get(key=get_rate_limit_key(limited_publisher))
+    assert state.tokens < 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_max_wait(limited_publisher, sent):
+    limits = {"telegram": {"requests": 1, "period": 60}}
+    await RateLimiter(limits, max_wait=1).send(limited_publisher, "m")
+
+    # the state is shared with the following runs
+    with pytest.raises(RateLimited) as e:
+        await RateLimiter(limits, max_wait=1).send(limited_publisher, "m")
+
+    e.match("retry in 60 seconds")
+    assert len(sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_throttled(limited_publisher, sent):
+    limited_publisher.hint = RateLimitHint(retry_after=120)
+    with pytest.raises(RateLimited):
+        await RateLimiter({}, max_wait=1).send(limited_publisher, "m")
+
+    limited_publisher.hint = None
+    with pytest.raises(RateLimited):
+        await RateLimiter({}, max_wait=1).send(limited_publisher, "m")
+    assert len(sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_unconfigured_platform(
+    mock_publisher_valid, message_collector
+):
+    limiter = RateLimiter({"mock": {"requests": 1, "period": 60}}, max_wait=0)
+
+    for _ in range(2):
+        await limiter.send(mock_publisher_valid, "m")
+
+    assert message_collector == ["m", "m"]
+    assert await RateLimitState.all().count() == 0
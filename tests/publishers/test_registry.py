@@ -0,0 +1,31 @@
+from mobilizon_reshare.publishers.platforms.telegram import TelegramPublisher
+from mobilizon_reshare.publishers.platforms.zulip import ZulipPublisher
+from mobilizon_reshare.publishers.registry import get_platform, platforms_run
+
+
+def test_get_platform_outside_run():
+    assert get_platform(TelegramPublisher) is not get_platform(TelegramPublisher)
+
+
+def test_get_platform_reused_within_run():
+    with platforms_run():
+        telegram = get_platform(TelegramPublisher)
+        session = telegram.session
+
+        assert get_platform(TelegramPublisher) is telegram
+        assert get_platform(ZulipPublisher) is not telegram
+        assert get_platform(TelegramPublisher).session is session
+
+    # the platforms are closed at the end of the run, and a new run gets new ones
+    assert telegram._session is None
+    with platforms_run():
+        assert get_platform(TelegramPublisher) is not telegram
+
+
+def test_platform_lifecycle():
+    with TelegramPublisher() as telegram:
+        session = telegram.session
+        assert telegram.session is session
+
+    assert telegram._session is None
+    assert telegram.session is not session
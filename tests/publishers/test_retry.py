@@ -0,0 +1,19 @@
+import arrow
+import pytest
+
+from mobilizon_reshare.publishers.retry import RetryPolicy
+
+
+@pytest.mark.parametrize(
+    "attempts, delay", [[1, 10], [2, 20], [3, 40], [4, None], [5, None]]
+)
+def test_next_attempt(attempts, delay):
+    now = arrow.get("2021-01-01T10:00:00+01:00")
+
+    next_attempt = RetryPolicy(max_attempts=4, backoff=10).next_attempt(attempts, now)
+
+    if delay is None:
+        assert next_attempt is None
+    else:
+        assert arrow.get(next_attempt) == now.shift(seconds=delay)
+        assert next_attempt.utcoffset().total_seconds() == 0
@@ -1,12 +1,20 @@
 import pytest
 import requests
+import responses
+from jinja2 import Template
+
+import mobilizon_reshare.publishers.abstract
 
 from mobilizon_reshare.publishers.exceptions import (
     InvalidEvent,
     InvalidResponse,
     InvalidMessage,
+    RateLimited,
+    RejectedCredentials,
 )
+from mobilizon_reshare.publishers.media import Media
 from mobilizon_reshare.publishers.platforms.telegram import (
+    MAX_CAPTION_LENGTH,
     TelegramFormatter,
     TelegramPublisher,
 )
@@ -26,6 +34,30 @@ def test_message_length_failure(event):
         TelegramFormatter().validate_event(event)
 
 
+def test_message_rendered_once(event, monkeypatch):
+    calls = []
+
+    def convert_html(content, dialect):
+        calls.append(content)
+        return f"*{content}*"
+
+    monkeypatch.setattr(
+        mobilizon_reshare.publishers.abstract, "convert_html", convert_html
+    )
+    description = event.description
+    formatter = TelegramFormatter()
+
+    formatter.validate_event(event)
+    message = formatter.get_message_from_event(event)
+
+    # the event isn't modified by preprocessing, and name and description are converted once
+    assert event.description == description
+    assert len(calls) == 2
+    assert f"*{description}*" in message
+    event.description = "changed"
+    assert formatter.get_message_from_event(event) != message
+
+
 @pytest.mark.parametrize(
     "message, result",
     [
@@ -41,12 +73,48 @@ def test_message_length_failure(event):
             "[link](https://link.com) [link2](https://link.com)",
             "[link](https://link.com) [link2](https://link.com)",
         ],
+        ["_*[]~>+=|{}`", "\\_\\*\\[\\]\\~\\>\\+\\=\\|\\{\\}\\`"],
+        ["*bold* **bold**", "*bold* *bold*"],
+        ["_italic_ snake_case", "_italic_ snake\\_case"],
+        ["* item", "\\* item"],
+        ["a \x00> b \x00_c", "a \\> b \\_c"],
+        ["C:\\new a\\b", "C:\\\\new a\\\\b"],
+        ["path\\_x", "path\\\\\\_x"],
+        ["*Event (1.0)!*", "*Event \\(1\\.0\\)\\!*"],
+        ["[li\x00_nk.](https://a.b/c_d(e)#f)", "[li\\_nk\\.](https://a.b/c_d(e\\)#f)"],
+        ["[a\\b](https://a.b)", "[a\\\\b](https://a.b)"],
+        ["[link]", "\\[link\\]"],
     ],
 )
 def test_escape_message(message, result):
     assert TelegramFormatter().escape_message(message) == result
 
 
+def test_escape_event_backslashes(event):
+    event.name = "C:\\new"
+    event.location = "a\\b"
+    formatter = TelegramFormatter()
+
+    message = formatter.escape_message(formatter.get_message_from_event(event))
+
+    assert "*C:\\\\new*" in message
+    assert "a\\\\b" in message
+
+
+def test_escape_template_backslashes(event, monkeypatch):
+    formatter = TelegramFormatter()
+    monkeypatch.setattr(
+        formatter,
+        "get_message_template",
+        lambda: Template("\\o/ *{{ name }}* \\_"),
+    )
+    event.name = "a.b"
+
+    message = formatter.escape_message(formatter.get_message_from_event(event))
+
+    assert message == "\\\\o/ *a\\.b* \\\\\\_"
+
+
 def test_event_validation(event):
     event.description = None
     with pytest.raises(InvalidEvent):
@@ -81,6 +149,83 @@ def test_validate_response_invalid_request():
     e.match("400 Client Error")
 
 
+def test_validate_response_rejected_credentials():
+    response = requests.Response()
+    response.status_code = 401
+    response._content = b"""{"ok":false}"""
+    with pytest.raises(RejectedCredentials) as e:
+
+        TelegramPublisher()._validate_response(response)
+
+    e.match("401 Client Error")
+
+
+@responses.activate
+def test_send_rate_limited():
+    responses.add(
+        responses.POST,
+        "https://api.telegram.org/botxxx/sendMessage",
+        json={
+            "ok": False,
+            "error_code": 429,
+            "description": "Too Many Requests: retry after 35",
+            "parameters": {"retry_after": 35},
+        },
+        status=429,
+    )
+
+    with pytest.raises(RateLimited) as e:
+        TelegramPublisher().send("message")
+
+    assert e.value.hint.retry_after == 35
+
+
+@responses.activate
+def test_send_remote_id():
+    responses.add(
+        responses.POST,
+        "https://api.telegram.org/botxxx/sendMessage",
+        json={"ok": True, "result": {"message_id": 1234}},
+    )
+
+    assert TelegramPublisher().send("message").remote_id == "1234"
+
+
+@responses.activate
+def test_send_media(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"image")
+    responses.add(
+        responses.POST,
+        "https://api.telegram.org/botxxx/sendPhoto",
+        json={"ok": True, "result": {"message_id": 1234}},
+    )
+
+    response = TelegramPublisher().send("message", media=Media(path, "image/png"))
+
+    assert response.remote_id == "1234"
+    body = responses.calls[0].request.body
+    assert b'name="caption"\r\n\r\nmessage' in body
+    assert b'filename="image.png"' in body
+
+
+@responses.activate
+def test_send_media_caption_too_long(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"image")
+    responses.add(
+        responses.POST,
+        "https://api.telegram.org/botxxx/sendMessage",
+        json={"ok": True, "result": {"message_id": 1234}},
+    )
+
+    TelegramPublisher().send(
+        "a" * (MAX_CAPTION_LENGTH + 1), media=Media(path, "image/png")
+    )
+
+    assert len(responses.calls) == 1
+
+
 def test_validate_response_invalid_response():
     response = requests.Response()
     response.status_code = 200
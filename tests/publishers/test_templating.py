@@ -0,0 +1,55 @@
+import pytest
+
+from mobilizon_reshare.publishers.exceptions import InvalidSettings
+from mobilizon_reshare.publishers.platforms.platform_mapping import (
+    name_to_formatter_class,
+)
+from mobilizon_reshare.publishers.templating import (
+    build_template_env,
+    get_template_env,
+    precompile_templates,
+)
+
+
+def test_bytecode_cache(tmp_path):
+    template = tmp_path / "message.tmpl.j2"
+    template.write_text("{{ name }}")
+
+    build_template_env(str(tmp_path / "cache"), auto_reload=False).get_template(
+        str(template)
+    )
+
+    # another process loads the compiled template from the cache
+    assert list((tmp_path / "cache").iterdir())
+    env = build_template_env(str(tmp_path / "cache"), auto_reload=False)
+    assert env.get_template(str(template)).render(name="event") == "event"
+
+
+def test_no_auto_reload(tmp_path):
+    template = tmp_path / "message.tmpl.j2"
+    template.write_text("old")
+    env = build_template_env(None, auto_reload=False)
+    env.get_template(str(template))
+
+    template.write_text("new")
+
+    assert env.get_template(str(template)).render() == "old"
+
+
+def test_no_cache_dir():
+    assert get_template_env().bytecode_cache is None
+
+
+@pytest.mark.parametrize("name", name_to_formatter_class.keys())
+def test_precompile_templates(name):
+    precompile_templates(name_to_formatter_class[name]().get_template_paths())
+
+
+def test_precompile_invalid_template(tmp_path):
+    template = tmp_path / "message.tmpl.j2"
+    template.write_text("{% if %}")
+
+    with pytest.raises(InvalidSettings) as e:
+        precompile_templates([str(template)])
+
+    e.match("message.tmpl.j2")
@@ -13,7 +13,7 @@ from mobilizon_reshare.publishers.exceptions import (
     HTTPResponseError,
 )
 from mobilizon_reshare.publishers.platforms.zulip import ZulipFormatter, ZulipPublisher
-from mobilizon_reshare.storage.query.read import build_publications
+from mobilizon_reshare.storage.query.write import create_pending_publications
 
 api_uri = "https://zulip.twc-italia.org/api/v1/"
 users_me = {
@@ -103,13 +103,13 @@ async def setup_db(
 @pytest.mark.asyncio
 async def unsaved_publications(event):
     await event.to_model().save()
-    return await build_publications(event)
+    return await create_pending_publications(event)
 
 
 @pytest.mark.asyncio
 async def test_zulip_publisher(mocked_valid_response, setup_db, unsaved_publications):
 
-    report = PublisherCoordinator(unsaved_publications).run()
+    report = await PublisherCoordinator(unsaved_publications).run()
 
     assert report.reports[0].status == PublicationStatus.COMPLETED
 
@@ -118,7 +118,7 @@ async def test_zulip_publisher(mocked_valid_response, setup_db, unsaved_publicat
 async def test_zulip_publishr_failure_invalid_credentials(
     mocked_credential_error_response, setup_db, unsaved_publications
 ):
-    report = PublisherCoordinator(unsaved_publications).run()
+    report = await PublisherCoordinator(unsaved_publications).run()
     assert report.reports[0].status == PublicationStatus.FAILED
     assert report.reports[0].reason.startswith("403 Client Error: Forbidden for url: ")
 
@@ -127,7 +127,7 @@ async def test_zulip_publishr_failure_invalid_credentials(
 async def test_zulip_publisher_failure_client_error(
     mocked_client_error_response, setup_db, unsaved_publications
 ):
-    report = PublisherCoordinator(unsaved_publications).run()
+    report = await PublisherCoordinator(unsaved_publications).run()
     assert report.reports[0].status == PublicationStatus.FAILED
     assert report.reports[0].reason.startswith("400 Client Error: Bad Request for url:")
 
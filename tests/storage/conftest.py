@@ -1,6 +1,7 @@
 import pytest
 
 import mobilizon_reshare.storage.query.read
+import mobilizon_reshare.storage.query.write
 from mobilizon_reshare.models.publisher import Publisher
 
 
@@ -15,5 +16,8 @@ async def mock_active_publishers(request, monkeypatch):
     monkeypatch.setattr(
         mobilizon_reshare.storage.query.read, "get_active_publishers", _mock_active_pub
     )
+    monkeypatch.setattr(
+        mobilizon_reshare.storage.query.write, "get_active_publishers", _mock_active_pub
+    )
 
     return request.param
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from mobilizon_reshare.models.publisher import Publisher
+from mobilizon_reshare.storage.db import get_connection
+from mobilizon_reshare.storage.instrumentation import (
+    EXECUTE_METHODS,
+    instrument,
+    collect_query_stats,
+)
+from mobilizon_reshare.storage.query.write import update_publishers
+
+
+@pytest.mark.asyncio
+async def test_instrumented_methods_exist():
+    # the instrumentation relies on private parts of Tortoise's clients, that can change with any release
+    connection = get_connection()
+    transaction_connection = connection._in_transaction().connection
+
+    for client in (connection, transaction_connection):
+        for name in EXECUTE_METHODS:
+            assert callable(getattr(type(client), name, None)), name
+
+
+@pytest.mark.asyncio
+async def test_collect_query_stats():
+    instrument(get_connection())
+
+    with collect_query_stats(keep_queries=True) as stats:
+        await Publisher.create(name="telegram")
+        await Publisher.all()
+
+    assert stats.count == 2
+    assert stats.queries[0].startswith("INSERT")
+    assert stats.queries[1].startswith("SELECT")
+    assert stats.total_time > 0
+
+
+@pytest.mark.asyncio
+async def test_collect_query_stats_transaction():
+    instrument(get_connection())
+
+    with collect_query_stats() as stats:
+        # one SELECT and one bulk INSERT, inside a transaction
+        await update_publishers(["telegram", "zulip"])
+
+    assert stats.count == 2
+    assert stats.queries is None
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(caplog):
+    instrument(get_connection(), slow_query_threshold=0)
+    try:
+        with caplog.at_level(logging.WARNING):
+            with collect_query_stats() as stats:
+                await Publisher.all()
+    finally:
+        instrument(get_connection())
+
+    assert stats.slow_queries == 1
+    assert "Slow query" in caplog.text
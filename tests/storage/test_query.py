@@ -12,7 +12,6 @@ from mobilizon_reshare.storage.query.read import (
     events_with_status,
     publications_with_status,
     events_without_publications,
-    build_publications,
 )
 from tests.storage import complete_specification
 from tests.storage import result_publication
@@ -208,46 +207,3 @@ async def test_events_without_publications(spec, expected_events, generate_model
     unpublished_events = list(await events_without_publications())
     assert len(unpublished_events) == len(expected_events)
     assert unpublished_events == expected_events
-
-
-@pytest.mark.asyncio
-@pytest.mark.parametrize(
-    "mock_active_publishers, spec, event, n_publications",
-    [
-        (
-            [],
-            {"event": 2, "publications": [], "publisher": ["zulip"]},
-            event_0,
-            0,
-        ),
-        (
-            ["zulip"],
-            {"event": 2, "publications": [], "publisher": ["zulip"]},
-            event_0,
-            1,
-        ),
-        (
-            ["telegram", "zulip", "mastodon", "facebook"],
-            {
-                "event": 2,
-                "publications": [],
-                "publisher": ["telegram", "zulip", "mastodon", "facebook"],
-            },
-            event_0,
-            4,
-        ),
-    ],
-    indirect=["mock_active_publishers"],
-)
-async def test_build_publications(
-    mock_active_publishers, spec, event, n_publications, generate_models
-):
-    await generate_models(spec)
-
-    publications = list(await build_publications(event))
-
-    assert len(publications) == n_publications
-
-    for p in publications:
-        assert p.event == event
-        assert p.publisher.name in mock_active_publishers
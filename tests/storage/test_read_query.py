@@ -2,10 +2,13 @@ from uuid import UUID
 
 import pytest
 
+from mobilizon_reshare.event.event import EventPublicationStatus
 from mobilizon_reshare.storage.query.read import (
     get_unpublished_events,
     get_all_events,
+    iter_events,
 )
+from tests.storage import complete_specification
 
 
 @pytest.mark.parametrize(
@@ -90,3 +93,59 @@ async def test_get_all_events(event_generator):
         await e.to_model().save()
 
     assert list(await get_all_events()) == all_events
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 100])
+@pytest.mark.asyncio
+async def test_iter_events(event_generator, page_size):
+    # events 0 and 1 share the same begin_datetime, to check that pages don't skip or repeat ties
+    all_events = [
+        event_generator(mobilizon_id=UUID(int=0), published=False),
+        event_generator(mobilizon_id=UUID(int=1), published=False),
+    ] + [
+        event_generator(
+            mobilizon_id=UUID(int=i),
+            begin_date=event_generator().begin_datetime.shift(days=i),
+            published=False,
+        )
+        for i in range(2, 5)
+    ]
+    for e in all_events:
+        await e.to_model().save()
+
+    result = [event async for event in iter_events(page_size=page_size)]
+
+    assert sorted(result, key=lambda e: e.mobilizon_id) == all_events
+    assert [e.begin_datetime for e in result] == sorted(
+        e.begin_datetime for e in all_events
+    )
+
+
+@pytest.mark.parametrize(
+    "status, expected_events_count",
+    [
+        (EventPublicationStatus.COMPLETED, 2),
+        (EventPublicationStatus.PARTIAL, 1),
+        (EventPublicationStatus.WAITING, 1),
+        (EventPublicationStatus.FAILED, 0),
+    ],
+)
+@pytest.mark.asyncio
+async def test_iter_events_with_status(generate_models, status, expected_events_count):
+    await generate_models(complete_specification)
+
+    result = [event async for event in iter_events(status=[status], page_size=1)]
+
+    assert len(result) == expected_events_count
+    assert all(event.status == status for event in result)
+
+
+@pytest.mark.asyncio
+async def test_iter_events_status_matches_computed_status(generate_models):
+    await generate_models(complete_specification)
+    all_events = [event async for event in iter_events()]
+
+    for status in EventPublicationStatus:
+        result = [event async for event in iter_events(status=[status])]
+        assert result == [event for event in all_events if event.status == status]
+    assert [event async for event in iter_events(status=[])] == []
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+
+from mobilizon_reshare.models.event import Event
+from mobilizon_reshare.models.publication import Publication, PublicationStatus
+from mobilizon_reshare.storage.query.stats import (
+    count_publications_by_day,
+    count_publications_by_publisher,
+    median_time_to_publication,
+    top_failure_reasons,
+)
+from tests import today
+
+specification = {
+    "event": 3,
+    "publications": [
+        {"event_idx": 0, "publisher_idx": 0, "timestamp": today},
+        {
+            "event_idx": 0,
+            "publisher_idx": 1,
+            "status": PublicationStatus.FAILED,
+            "timestamp": today + timedelta(hours=1),
+        },
+        {"event_idx": 1, "publisher_idx": 0, "timestamp": today + timedelta(days=1)},
+        {
+            "event_idx": 1,
+            "publisher_idx": 1,
+            "status": PublicationStatus.FAILED,
+            "timestamp": today + timedelta(days=1),
+        },
+        {
+            "event_idx": 2,
+            "publisher_idx": 1,
+            "status": PublicationStatus.FAILED,
+            "timestamp": today + timedelta(days=1),
+        },
+    ],
+    "publisher": ["telegram", "twitter"],
+}
+
+
+@pytest.fixture
+async def stats_models(generate_models):
+    await generate_models(specification)
+    for idx, reason in [(1, "timeout"), (3, "timeout"), (4, "forbidden")]:
+        await Publication.filter(id=UUID(int=idx)).update(reason=reason)
+
+
+@pytest.mark.asyncio
+async def test_count_publications_by_day(stats_models):
+    assert await count_publications_by_day() == [
+        {
+            "publisher": "telegram",
+            "status": "COMPLETED",
+            "day": "2021-06-06",
+            "count": 1,
+        },
+        {"publisher": "twitter", "status": "FAILED", "day": "2021-06-06", "count": 1},
+        {
+            "publisher": "telegram",
+            "status": "COMPLETED",
+            "day": "2021-06-07",
+            "count": 1,
+        },
+        {"publisher": "twitter", "status": "FAILED", "day": "2021-06-07", "count": 2},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_count_publications_by_publisher(stats_models):
+    assert await count_publications_by_publisher() == [
+        {"publisher": "telegram", "count": 2, "completed": 2, "success_rate": 1.0},
+        {"publisher": "twitter", "count": 3, "completed": 0, "success_rate": 0.0},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_top_failure_reasons(stats_models):
+    assert await top_failure_reasons() == [
+        {"publisher": "twitter", "reason": "timeout", "count": 2},
+        {"publisher": "twitter", "reason": "forbidden", "count": 1},
+    ]
+    assert len(await top_failure_reasons(limit=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_median_time_to_publication(stats_models):
+    # events stored before their ingestion time was recorded are ignored
+    assert await median_time_to_publication() is None
+
+    await Event.filter(id=UUID(int=0)).update(created_at=today - timedelta(hours=2))
+    assert await median_time_to_publication() == pytest.approx(2 * 3600)
+
+    await Event.filter(id=UUID(int=1)).update(created_at=today)
+    assert await median_time_to_publication() == pytest.approx(13 * 3600)
@@ -5,6 +5,7 @@ import arrow
 import pytest
 
 from mobilizon_reshare.event.event import MobilizonEvent, EventPublicationStatus
+from mobilizon_reshare.models.notification import Notification
 from mobilizon_reshare.models.publication import PublicationStatus, Publication
 from mobilizon_reshare.models.publisher import Publisher
 from mobilizon_reshare.publishers.abstract import EventPublication
@@ -18,7 +19,10 @@ from mobilizon_reshare.publishers.platforms.telegram import (
 )
 from mobilizon_reshare.storage.query.read import publications_with_status
 from mobilizon_reshare.storage.query.write import (
+    create_pending_publications,
+    recover_interrupted_publications,
     save_publication_report,
+    save_published_publication,
     update_publishers,
 )
 from tests.storage import complete_specification
@@ -131,3 +135,132 @@ async def test_save_publication_report(
         assert publications[i].status == expected_result[i].status
         assert publications[i].reason == expected_result[i].reason
         assert publications[i].timestamp
+
+
+@pytest.mark.asyncio
+async def test_save_publication_report_pending(
+    event_model_generator, publisher_model_generator
+):
+    event_model = event_model_generator()
+    await event_model.save()
+    publisher = publisher_model_generator()
+    await publisher.save()
+    publication = await Publication.create(
+        id=UUID(int=1),
+        status=PublicationStatus.WAITING,
+        event_id=event_model.id,
+        publisher_id=publisher.id,
+    )
+    await save_published_publication(publication.id, "42")
+
+    await save_publication_report(
+        PublisherCoordinatorReport(
+            publications=[],
+            reports=[
+                EventPublicationReport(
+                    status=PublicationStatus.COMPLETED,
+                    reason=None,
+                    publication=EventPublication(
+                        id=publication.id,
+                        formatter=TelegramFormatter(),
+                        event=event_1,
+                        publisher=TelegramPublisher(),
+                    ),
+                    remote_id="42",
+                )
+            ],
+        )
+    )
+
+    # the pending publication is updated, not duplicated
+    publications = await Publication.all()
+    assert len(publications) == 1
+    assert publications[0].status == PublicationStatus.COMPLETED
+    assert publications[0].remote_id == "42"
+
+
+@pytest.mark.parametrize(
+    "publisher_name, retried",
+    [
+        # the idempotency key keeps it from being posted twice
+        ["mastodon", True],
+        ["telegram", False],
+    ],
+)
+@pytest.mark.asyncio
+async def test_recover_interrupted_publications(
+    event_model_generator, publisher_name, retried
+):
+    event_model = event_model_generator()
+    await event_model.save()
+    now = arrow.utcnow()
+    publications = {}
+    for name, remote_id, age in [
+        ["posted", "42", 7200],
+        [publisher_name, None, 7200],
+        ["running", None, 10],
+    ]:
+        publisher = await Publisher.create(name=name)
+        publications[name] = await Publication.create(
+            status=PublicationStatus.WAITING,
+            timestamp=now.shift(seconds=-age).datetime,
+            remote_id=remote_id,
+            event_id=event_model.id,
+            publisher_id=publisher.id,
+        )
+
+    assert await recover_interrupted_publications(now.shift(hours=-1), ["zulip"]) == 1
+
+    for name, status in [
+        ["posted", PublicationStatus.COMPLETED],
+        [publisher_name, PublicationStatus.FAILED],
+        ["running", PublicationStatus.WAITING],
+    ]:
+        publication = await Publication.get(id=publications[name].id)
+        assert publication.status == status
+    publication = await Publication.get(id=publications[publisher_name].id)
+    notifications = await Notification.all()
+    if retried:
+        # retried by the same run
+        assert publication.next_attempt <= arrow.utcnow().datetime
+        assert not notifications
+    else:
+        # checked by hand instead
+        assert publication.next_attempt is None
+        assert len(notifications) == 1
+        assert notifications[0].publication_id == publication.id
+        assert "check whether it was posted" in notifications[0].message
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "mock_active_publishers, spec, n_publications",
+    [
+        ([], {"event": 2, "publications": [], "publisher": ["zulip"]}, 0),
+        (["zulip"], {"event": 2, "publications": [], "publisher": ["zulip"]}, 1),
+        (
+            ["telegram", "zulip", "mastodon", "facebook"],
+            {
+                "event": 2,
+                "publications": [],
+                "publisher": ["telegram", "zulip", "mastodon", "facebook"],
+            },
+            4,
+        ),
+    ],
+    indirect=["mock_active_publishers"],
+)
+async def test_create_pending_publications(
+    mock_active_publishers, spec, n_publications, generate_models
+):
+    await generate_models(spec)
+
+    publications = await create_pending_publications(event_1)
+
+    assert len(publications) == n_publications
+    for p in publications:
+        assert p.event == event_1
+        assert p.publisher.name in mock_active_publishers
+    stored = await Publication.filter(id__in=[p.id for p in publications])
+    assert len(stored) == n_publications
+    assert all(p.status == PublicationStatus.WAITING for p in stored)